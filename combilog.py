@@ -1,11 +1,100 @@
+import argparse
+import asyncio
+import configparser
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import warnings
+from abc import ABC
+from abc import abstractmethod
+from array import array
+from binascii import unhexlify
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date
 from datetime import datetime
+from datetime import timedelta
+from functools import lru_cache
+from itertools import cycle
+from itertools import islice
+from struct import Struct
 from struct import unpack
 from typing import Any
+from typing import AsyncGenerator
+from typing import AsyncIterator
+from typing import Callable
+from typing import Deque
 from typing import Dict
+from typing import Generator
+from typing import IO
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import TypeVar
 from typing import Union
 
 import serial
+from serial.urlhandler import protocol_loop
+try:
+    import numpy  # type: ignore
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+T = TypeVar('T')
+
+# control characters used by the logger to (not) acknowledge a telegram
+ACK = b'\x06'
+NAK = b'\x15'
+
+# the timestamp of an event as returned depending on the time_format
+Timestamp = Union[str, datetime, int]
+TIME_FORMATS = ('str', 'datetime', 'epoch')
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_NUMPY_DTYPES = {'d': 'float64', 'q': 'int64'}
+
+# internal channels "01" to "20" followed by external channels "80" to "BB"
+CHANNEL_NUMBERS = tuple(
+    [f'{i:02d}' for i in range(1, 21)] +
+    [f'{i:02X}' for i in range(0x80, 0xBC)],
+)
+EMPTY_CHANNEL = 'empty channel (EM)'
+# upper bounds in seconds of the latency histogram of ``CommandStats``
+LATENCY_BUCKETS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0,
+)
+# offset of the first value of an event reply after "=", one char and the
+# timestamp followed by ";"
+_EVENT_VALUES = 15
+# first bytes of a capture file and the header of every record
+CAPTURE_MAGIC = b'COMBILOG CAPTURE 1\n'
+_CAPTURE_RECORD = Struct('!ddHH')
+_COPY_ESCAPES = str.maketrans(
+    {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'},
+)
+_OUTCOMES = {ACK: 'ACK', NAK: 'NAK', b'': 'timeout'}
+# commands which need a previous authentication
+_AUTH_COMMANDS = ('W', 'D', 'G', 'Y', 'T', 'C.ALL', 'c.ALL')
+# a lost event is read again with the command repeating the last event
+_REPEAT_COMMANDS = {'E': 'F', 'e': 'f'}
+# irreversible commands which are never sent again implicitly
+_NOT_RETRIED = ('C.ALL', 'c.ALL')
+# setting a pointer back after reading ahead, it often fails the first time
+_RESET_ATTEMPTS = 3
+# events decoded at once when reading into columns
+_BATCH_EVENTS = 256
 
 
 class ChannelNotFoundError(Exception):
@@ -23,6 +112,287 @@ class CallNotSuccessfullError(Exception):
     pass
 
 
+class CallRecord(NamedTuple):
+    '''a command sent by ``Combilog`` as passed to the hooks'''
+    # command letter e.g. "E"
+    command: str
+    bytes_sent: int
+    bytes_received: int
+    # telegrams sent including retries and authenticating again
+    attempts: int
+    # opening the port if no session was open
+    open_seconds: float
+    # writing and waiting for the reply including timeouts
+    io_seconds: float
+    parse_seconds: float
+    # "ACK", "NAK", "reply", "timeout" or "error" if an exception was raised
+    outcome: str
+
+
+class CommandStats():
+    '''the aggregated ``CallRecord`` of one command'''
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.attempts = 0
+        self.open_seconds = 0.0
+        self.io_seconds = 0.0
+        self.parse_seconds = 0.0
+        # number of calls per bucket of LATENCY_BUCKETS, the last bucket
+        # counts the calls slower than the last bound
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        outcome = record.outcome
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.bytes_sent += record.bytes_sent
+        self.bytes_received += record.bytes_received
+        self.attempts += record.attempts
+        self.open_seconds += record.open_seconds
+        self.io_seconds += record.io_seconds
+        self.parse_seconds += record.parse_seconds
+        latency = record.open_seconds + record.io_seconds
+        latency += record.parse_seconds
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'outcomes': dict(self.outcomes),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'attempts': self.attempts,
+            'open_seconds': self.open_seconds,
+            'io_seconds': self.io_seconds,
+            'parse_seconds': self.parse_seconds,
+            'histogram': list(self.histogram),
+        }
+
+
+class Instrumentation():
+    '''
+    count and time every command sent by a ``Combilog`` and pass a
+    ``CallRecord`` of it to the hooks
+
+        instrumentation = Instrumentation(hooks=[print])
+        logger = Combilog(..., instrumentation=instrumentation)
+        logger.read_logger(pointer=1)
+        instrumentation.stats()['E']['io_seconds']
+
+    :hooks list: callables called with the ``CallRecord`` of every command.
+        An exception in a hook is issued as a ``RuntimeWarning``
+    '''
+
+    def __init__(
+            self,
+            hooks: Sequence[Callable[[CallRecord], Any]] = (),
+    ) -> None:
+        self.hooks = list(hooks)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, CommandStats] = {}
+
+    def add_hook(self, hook: Callable[[CallRecord], Any]) -> None:
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[CallRecord], Any]) -> None:
+        self.hooks.remove(hook)
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            stats = self._stats.get(record.command)
+            if stats is None:
+                stats = self._stats[record.command] = CommandStats()
+            stats.add(record)
+        for hook in self.hooks:
+            # a broken hook must neither fail the command nor replace the
+            # error the command raised
+            try:
+                hook(record)
+            except Exception as e:
+                warnings.warn(
+                    f'instrumentation hook {hook!r} failed: {e!r}',
+                    RuntimeWarning,
+                )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        '''the counters per command letter (see ``CommandStats``)'''
+        with self._lock:
+            return {
+                command: stats.as_dict()
+                for command, stats in sorted(self._stats.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class RetryPolicy():
+    '''
+    retry a command if the reply was lost or incomplete, the logger did not
+    acknowledge a command known to fail once in a while (e.g. setting a
+    pointer) or a command needing authentication was sent after the
+    authentication was lost. A lost reply to reading an event is retried by
+    repeating the read of the event so no event is skipped
+    :attempts int: number of attempts of a command including the first one
+    :backoff float: seconds to wait before the first retry
+    :factor float: the wait is multiplied by this factor for every retry
+    :max_backoff float: maximum seconds to wait before a retry
+    :commands dict: number of attempts per command letter e.g. {"E": 5}
+    :retry_nak tuple: commands which are retried after a NAK
+    :reauthenticate bool: authenticate again with the last password used
+        with ``authenticate`` if a command needing authentication got a NAK
+    Deleting the memory is never retried
+    '''
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        factor: float = 2.0,
+        max_backoff: float = 2.0,
+        commands: Optional[Dict[str, int]] = None,
+        retry_nak: Tuple[str, ...] = ('C', 'c'),
+        reauthenticate: bool = True,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f'attempts must be at least 1, not {attempts}')
+        self.attempts = attempts
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.commands = commands or {}
+        self.retry_nak = retry_nak
+        self.reauthenticate = reauthenticate
+
+    def attempts_for(self, command: str) -> int:
+        if command in _NOT_RETRIED:
+            return 1
+        return self.commands.get(command[:1], self.attempts)
+
+    def delay(self, retry: int) -> float:
+        '''seconds to wait before the retry-th retry'''
+        return min(self.backoff * self.factor ** (retry - 1), self.max_backoff)
+
+
+class ChannelValue(NamedTuple):
+    '''value of a channel read by ``read_channels`` or the error'''
+    value: Optional[float]
+    error: Optional[Exception]
+
+
+class ChannelCache():
+    '''
+    cache of the channel information of many loggers keyed by the identity
+    and configuration of a logger (see ``Combilog.get_channels``). Entries
+    are kept in memory and optionally in a JSON file so the channel
+    discovery is skipped after a restart as well
+    :path str: path to the JSON file, default is to only cache in memory
+    '''
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        # the file is only read on the first access
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None:
+                try:
+                    with open(self.path) as f:
+                        self._entries = json.load(f)
+                except FileNotFoundError:
+                    pass
+        return self._entries
+
+    def _save(self) -> None:
+        if self.path is not None:
+            _atomic_write_json(self.path, self._load())
+
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, Any]]]:
+        '''the cached channels or None if the key is not cached'''
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, channels: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._load()[key] = channels
+            self._save()
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        '''
+        remove the entry of a logger e.g. after reprogramming a channel
+        without changing the number of channels
+        :key str: key of the logger, default is to clear the whole cache
+        '''
+        with self._lock:
+            if key is None:
+                self._load().clear()
+            else:
+                self._load().pop(key, None)
+            self._save()
+
+
+def read_program(path: str) -> Dict[str, Dict[str, Any]]:
+    '''
+    read the channels of a logger program file (.PRO) written by the logger
+    software into the same structure as ``Combilog.discover_channels``. The
+    channels can be passed to ``Combilog`` to not discover them on the
+    serial line. The section "[KANALn]" is the n-th of ``CHANNEL_NUMBERS``,
+    empty channels are skipped. The program file has no type of calculation
+    so it is unknown for every channel
+    :path str: path to the .PRO file
+    '''
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    # the keys are case sensitive
+    parser.optionxform = str  # type: ignore
+    try:
+        with open(path, encoding='utf-8') as f:
+            parser.read_file(f)
+    except UnicodeDecodeError:
+        # older versions of the logger software write latin-1
+        with open(path, encoding='latin-1') as f:
+            parser.read_file(f)
+    channels: Dict[str, Dict[str, Any]] = {}
+    for section in parser.sections():
+        if not section.startswith('KANAL'):
+            continue
+        try:
+            channel_nr = CHANNEL_NUMBERS[int(section[5:])]
+        except (ValueError, IndexError):
+            raise ValueError(f'{path} has an invalid channel [{section}]')
+        channel = parser[section]
+        channel_type = _channel_type_to_txt(channel.getint('KanalTyp', 0))
+        if channel_type == EMPTY_CHANNEL:
+            continue
+        channels[channel_nr] = {
+            'channel_type': channel_type,
+            'channel_notation': channel.get('KanalBez', '').strip(),
+            'data_format': _data_format_to_txt(
+                channel.getint('FormatTyp', -1),
+            ),
+            'field_length': channel.getint('FormatFeldlaenge', -1),
+            'decimals': channel.getint('FormatDecStellen', -1),
+            # spaces of the unit are saved as "_"
+            'unit': channel.get('FormatEinheit', '').replace('_', ' ').strip(),
+            'host_input': _host_input_possible(
+                channel.getint('FormatDataDirection', -1),
+            ),
+            'type_of_calculation': _channel_calc_to_txt(-1),
+        }
+    return dict(
+        sorted(
+            channels.items(), key=lambda i: CHANNEL_NUMBERS.index(i[0]),
+        ),
+    )
+
+
 class Combilog():
     '''
     :port str: port the logger is connected to e.g. com3 or /dev/ttyACM0
@@ -37,6 +407,13 @@ class Combilog():
     :stopbits int: number of stopbits as specified in the logger settings.
         Must be either 1 or 2
     :timeout float: timeout as specified in the logger settings in seconds
+    :channel_cache ChannelCache: cache for ``get_channels`` so the channels
+        are only discovered again after the logger was reconfigured
+    :retry RetryPolicy: retry failed commands, default is no retries
+    :instrumentation Instrumentation: count and time every command
+    :capture Capture: record every telegram and its raw reply
+    :channels dict: the channel information e.g. from ``read_program``,
+        ``get_channels`` returns it without asking the logger
     '''
 
     def __init__(
@@ -48,114 +425,235 @@ class Combilog():
         parity: str = 'N',
         stopbits: int = 1,
         timeout: float = 1.0,
+        channel_cache: Optional[ChannelCache] = None,
+        retry: Optional[RetryPolicy] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        capture: Optional['Capture'] = None,
+        channels: Optional[Dict[str, Dict[str, Any]]] = None,
     ) -> None:
-        BAUDRATE = (2400, 4800, 9600, 19200, 38400)
-        BYTESIZE = (5, 6, 7, 8)
-        PARITY = ('N', 'E', 'O')
-        STOPBITS = (1, 2)
+        self.logger_addr = _format_addr(logger_addr)
+        self.capture = capture
+        self.channels = channels
+        # the channels last looked up by ``get_channels`` for
+        # ``read_channels``
+        self._snapshot_channels: Optional[Dict[str, Dict[str, Any]]] = None
+        self.channel_cache = channel_cache
+        self.retry = retry
+        self.instrumentation = instrumentation
+        # bytes sent, bytes received, telegrams and seconds opening the port
+        # of the instrumented command in progress
+        self._io: Optional[List[float]] = None
+        # the password is kept to authenticate again if the retry policy
+        # allows it
+        self._passwd: Optional[str] = None
+        # initialze serial object do not open
+        self.ser = _create_serial(
+            port=port,
+            baudrate=baudrate,
+            bytesize=bytesize,
+            parity=parity,
+            stopbits=stopbits,
+            timeout=timeout,
+        )
 
-        # check input
-        if baudrate not in BAUDRATE:
-            raise ValueError(
-                f'baudrate must be {", ".join(str(i) for i in BAUDRATE)}'
-                f', not {baudrate}',
-            )
-        if bytesize not in BYTESIZE:
-            raise ValueError(
-                f'bytesize must be {", ".join(str(i) for i in BYTESIZE)}'
-                f', not {bytesize}',
-            )
-        if parity not in PARITY:
-            raise ValueError(
-                f'parity must be {", ".join(str(i) for i in PARITY)}'
-                f', not {parity}',
-            )
-        if stopbits not in STOPBITS:
-            raise ValueError(
-                f'stopbits must be {", ".join(str(i) for i in STOPBITS)}'
-                f', not {stopbits}',
+    def open(self) -> None:
+        '''
+        open the serial port and keep it open for all following calls until
+        ``close`` is called. This avoids opening and closing the port for
+        every single telegram e.g. when reading many events
+        '''
+        if not self.ser.is_open:
+            self.ser.open()
+
+    def close(self) -> None:
+        '''close the serial port that was opened via ``open``'''
+        self.ser.close()
+
+    @property
+    def is_open(self) -> bool:
+        '''True if a session is open and the port is kept open'''
+        return bool(self.ser.is_open)
+
+    def __enter__(self) -> 'Combilog':
+        self.open()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _request(
+            self,
+            command: str,
+            parse: Callable[..., T],
+            *args: Any,
+    ) -> T:
+        '''
+        send a command and parse the reply with ``parse(resp, *args)``. With
+        ``instrumentation`` the command is counted and timed
+        '''
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return parse(self._exchange(command), *args)
+        io = self._io = [0, 0, 0, 0.0]
+        outcome = 'error'
+        start = time.perf_counter()
+        received: Optional[float] = None
+        try:
+            resp = self._exchange(command)
+            received = time.perf_counter()
+            result = parse(resp, *args)
+            outcome = _OUTCOMES.get(resp, 'reply')
+            return result
+        finally:
+            end = time.perf_counter()
+            if received is None:
+                received = end
+            self._io = None
+            instrumentation.record(
+                CallRecord(
+                    command=command[:1],
+                    bytes_sent=int(io[0]),
+                    bytes_received=int(io[1]),
+                    attempts=int(io[2]),
+                    open_seconds=io[3],
+                    io_seconds=received - start - io[3],
+                    parse_seconds=end - received,
+                    outcome=outcome,
+                ),
             )
-        if not isinstance(timeout, float):
-            raise TypeError(f'timeout must be float, not {type(timeout)}')
 
-        self.logger_addr = str(logger_addr)
-        # add leading 0 if only one digit
-        if len(self.logger_addr) == 1:
-            self.logger_addr = '0' + self.logger_addr
+    def _call(self, command: str) -> bytes:
+        '''
+        send a command to the logger and return the raw reply. The reply is
+        read frame aware: a single ACK or NAK is returned as soon as it
+        arrives, data replies starting with "=" are read until the carriage
+        return. An empty reply (timeout) is returned as b''. With a ``retry``
+        policy failed commands are sent again and CallNotSuccessfullError is
+        raised if there still is no complete reply
+        :command str: the command without address and carriage return
+            e.g. "B01"
+        '''
+        if self.instrumentation is None:
+            return self._exchange(command)
+        return self._request(command, _raw_reply)
 
-        # initialze serial object do not open
-        self.ser = serial.Serial()
-        self.ser.port = port
-        self.ser.baudrate = baudrate
-        self.ser.bytesize = bytesize
-        self.ser.parity = parity
-        self.ser.stopbits = stopbits
-        self.ser.timeout = timeout
+    def _exchange(self, command: str) -> bytes:
+        with self._connection() as ser:
+            resp = self._send(ser, command)
+            if self.retry is None:
+                return resp
+            attempts = self.retry.attempts_for(command)
+            for retry in range(1, attempts):
+                reason = self._retry_reason(command, resp)
+                if reason is None:
+                    return resp
+                elif reason == 'not authenticated':
+                    passwd = f'P{self._passwd}'
+                    if self._send(ser, passwd) != ACK:
+                        return resp
+                else:
+                    time.sleep(self.retry.delay(retry))
+                    # drop the rest of an incomplete reply
+                    ser.reset_input_buffer()
+                resp = self._send(ser, _REPEAT_COMMANDS.get(command, command))
+            reason = self._retry_reason(command, resp)
+            if reason in ('no reply', 'incomplete reply'):
+                raise CallNotSuccessfullError(
+                    f'{reason} to "{command}" after {attempts} attempts',
+                )
+            return resp
+
+    def _send(self, ser: serial.Serial, command: str) -> bytes:
+        telegram = f'${self.logger_addr}{command}\r'.encode('latin-1')
+        capture = self.capture
+        sent = time.monotonic() if capture is not None else 0.0
+        # a late reply to a previous telegram must not be taken as the reply
+        # to this one, opening the port used to clear it
+        ser.reset_input_buffer()
+        ser.write(telegram)
+        resp = _read_reply(ser)
+        if capture is not None:
+            capture.record(sent, telegram, time.monotonic(), resp)
+        if self._io is not None:
+            self._io[0] += len(telegram)
+            self._io[1] += len(resp)
+            self._io[2] += 1
+        return resp
+
+    def _retry_reason(self, command: str, resp: bytes) -> Optional[str]:
+        '''why the command should be sent again or None'''
+        assert self.retry is not None
+        if resp == b'':
+            return 'no reply'
+        elif resp == NAK:
+            if (
+                    self.retry.reauthenticate and
+                    self._passwd is not None and
+                    command.startswith(_AUTH_COMMANDS)
+            ):
+                return 'not authenticated'
+            elif command.startswith(self.retry.retry_nak):
+                return 'NAK'
+        elif resp != ACK and not (resp[:1] == b'=' and resp[-1:] == b'\r'):
+            return 'incomplete reply'
+        return None
+
+    @contextmanager
+    def _connection(self) -> Generator[serial.Serial, None, None]:
+        '''
+        yield the opened serial port. If there is no open session the port
+        is only opened for the duration of this call
+        '''
+        if self.ser.is_open:
+            yield self.ser
+        else:
+            start = time.perf_counter()
+            with self.ser as ser:
+                if self._io is not None:
+                    self._io[3] += time.perf_counter() - start
+                yield ser
 
     def authenticate(self, passwd: str) -> bool:
         '''
         :passwd str: password as specified via the logger's webserver
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}P{passwd}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp == b'\x06':
+        resp = self._call(f'P{passwd}')
+        if resp == ACK:
+            self._passwd = passwd
             return True
         else:
             return False
 
-    def device_id(self) -> Dict[str, str]:
+    def device_id(
+            self,
+            fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, str]:
         '''
         get the device identification containing:
         vendor name (e.g. Friedrichs), model name (e.g. COM1020)
         hw_revision (hardware ver), sw_revission (software/frimware ver)
+        :fields list: only decode these fields, default is all fields
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}V\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        info = resp.decode('latin-1')[1:]
-        dev_id = {
-            'vendor_name': info[0:10],
-            'model_name': info[10:17],
-            'hw_revision': info[18:23],
-            'sw_revision': info[24:28],
-        }
-        return dev_id
+        return self._request('V', _parse_device_id, fields)
 
-    def device_info(self) -> Dict[str, Union[str, int]]:
+    def device_info(
+            self,
+            fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Union[str, int]]:
         '''
         get the device information containing:
         location, serial number, number of channels
+        :fields list: only decode these fields e.g. ["serial_number"],
+            default is all fields
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}S\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        info = resp.decode('latin-1')[1:]
-        dev_info = {
-            'location': info[:20].strip(),
-            'serial_number': int(info[20:26]),
-            'nr_channels': int(info[26:].strip()),
-        }
-        return dev_info
+        return self._request('S', _parse_device_info, fields)
 
     def status_info(self) -> Dict[str, str]:
         '''
         get the device status and see if there are any errors
         read about the codes in the manual pp 124-125
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}Z\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        info = resp.decode('latin-1')[1:]
-        status_info = {
-            'channel_status': info[:8],
-            'module_status': info[9:],
-        }
-        return status_info
+        return self._request('Z', _parse_status_info)
 
     def get_channel_info(self, channel_nr: str) -> Dict[str, str]:
         '''
@@ -164,68 +662,116 @@ class Combilog():
         or '80' to 'BB' (external channels)
         values are hexadecimal in only uppercase
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}B{channel_nr}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-            success = (resp != b'\x15' and resp != b'')
-        if success:
-            info = resp.decode('latin-1')[1:]  # skip '=...'
-            channel_info = {
-                'channel_type': _channel_type_to_txt(int(info[0])),
-                'channel_notation': info[1:20].strip(),
-                'data_format': _data_format_to_txt(int(info[21])),
-                'field_length': int(info[22]),
-                'decimals': int(info[23]),
-                'unit': info[24:29].strip(),
-                'host_input': _host_input_possible(int(info[30])),
-                'type_of_calculation': _channel_calc_to_txt(int(info[31])),
-            }
-            return channel_info
+        return self._request(f'B{channel_nr}', _parse_channel_info, channel_nr)
+
+    def discover_channels(self) -> Dict[str, Dict[str, Any]]:
+        '''
+        probe the internal and external channels and return the information
+        of every configured channel by its channel number. Probing stops as
+        soon as the number of channels from ``device_info`` was found. This
+        always asks the logger, use ``get_channels`` to use the
+        ``channel_cache``
+        '''
+        channels: Dict[str, Dict[str, Any]] = {}
+        with self._connection():
+            device = self.device_info(['nr_channels'])
+            nr_channels = int(device['nr_channels'])
+            for channel_nr in CHANNEL_NUMBERS:
+                if len(channels) >= nr_channels:
+                    break
+                try:
+                    info = self.get_channel_info(channel_nr)
+                except ChannelNotFoundError:
+                    continue
+                if info['channel_type'] != EMPTY_CHANNEL:
+                    channels[channel_nr] = info
+        return channels
+
+    def channel_cache_key(self) -> str:
+        '''
+        identify the logger and its configuration: the serial number, model,
+        software revision and number of channels. This only takes two
+        telegrams and is used to check if the cached channels are stale
+        '''
+        with self._connection():
+            dev_id = self.device_id(['model_name', 'sw_revision'])
+            dev_info = self.device_info(['serial_number', 'nr_channels'])
+        return (
+            f'{dev_info["serial_number"]}:{dev_id["model_name"].strip()}:'
+            f'{dev_id["sw_revision"].strip()}:{dev_info["nr_channels"]}'
+        )
+
+    def get_channels(self, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        '''
+        the information of every channel by its channel number as returned
+        by ``discover_channels``. With a ``channel_cache`` the channels are
+        only discovered if the logger is not cached yet or its configuration
+        changed. Channels passed to ``Combilog`` are returned as they are
+        :refresh bool: discover the channels and update the cache even if
+            the logger is cached or the channels were passed
+        '''
+        if self.channels is not None and not refresh:
+            return self.channels
+        if self.channel_cache is None:
+            channels = self.discover_channels()
         else:
-            raise ChannelNotFoundError(f'channel {channel_nr} was not found')
+            with self._connection():
+                key = self.channel_cache_key()
+                cached = None if refresh else self.channel_cache.get(key)
+                if cached is None:
+                    cached = self.discover_channels()
+                    self.channel_cache.set(key, cached)
+            channels = cached
+        self._snapshot_channels = channels
+        return channels
 
     def get_channel_list(self) -> List[str]:
-        # internal channels
-        INT_CHANNEL = [str(i) for i in list(range(1, 20))]
-        # add leading 0 to channel numbers
-        for i in range(0, 9):
-            INT_CHANNEL[i] = f'0{i+1}'
-        int_channel_list = []
-        for j in INT_CHANNEL:
-            try:
-                info = self.get_channel_info(j)
-                int_channel_list.append(info['channel_notation'])
-            except ChannelNotFoundError:
-                pass
-        # TODO: get external channels
-        # for some reason an empty external channel has len 31 not 32
-        # as specified in the manual so this is broken
-        """
-        EXT_CHANNEL = [str(hex(i))[2:].upper() for i in list(range(128, 188))]
-        ext_channel_list = []
-        for i in EXT_CHANNEL:
-            try:
-                info = self.get_channel_info(i)
-                ext_channel_list.append(info['channel_notation'])
-            except:
-                pass
-        """
-        channel_list = int_channel_list
-        return channel_list
+        '''the notations of all channels (see ``get_channels``)'''
+        channels = self.get_channels()
+        return [info['channel_notation'] for info in channels.values()]
 
     def read_channel(self, channel_nr: str) -> str:
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}R{channel_nr}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        channel = resp.decode('latin-1')[1:]
-        if channel.startswith('E'):
-            raise ChannelError(
-                f'Cannot read channel {channel_nr}, '
-                'the channel indicates an error',
-            )
-        return channel.strip()
+        return self._request(f'R{channel_nr}', _parse_channel, channel_nr)
+
+    def read_channels(
+            self,
+            channel_list: Optional[Sequence[str]] = None,
+    ) -> Dict[str, ChannelValue]:
+        '''
+        read the current value of many channels in one session. An error
+        reading a channel is returned in its ``ChannelValue`` and does not
+        stop reading the other channels. The values are converted using the
+        data format and decimals from ``get_channels``. They are looked up on
+        the first call and reused until ``get_channels`` runs again (e.g.
+        with ``refresh=True``), so every following call only costs one
+        telegram per channel
+        :channel_list list: channel numbers to read, default is all channels
+        '''
+        snapshot: Dict[str, ChannelValue] = {}
+        with self._connection():
+            channels = self.channels
+            if channels is None:
+                channels = self._snapshot_channels
+            if channels is None:
+                channels = self.get_channels()
+            if channel_list is None:
+                channel_list = list(channels)
+            for channel_nr in channel_list:
+                try:
+                    value = _channel_value_to_float(
+                        self.read_channel(channel_nr),
+                        channels.get(channel_nr),
+                    )
+                except (
+                        CallNotSuccessfullError,
+                        ChannelError,
+                        ChannelNotFoundError,
+                        ValueError,
+                ) as e:
+                    snapshot[channel_nr] = ChannelValue(None, e)
+                else:
+                    snapshot[channel_nr] = ChannelValue(value, None)
+        return snapshot
 
     def write_channel(
         self,
@@ -236,17 +782,8 @@ class Combilog():
         Write to a channel --> set the channel to a specific value
         a previous Authentication is required! (self.authenticate(passwd=...))
         '''
-        with self.ser as ser:
-            telegram = (
-                f'${self.logger_addr}W{channel_nr}{channel_value}\r'
-            ).encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                f'Unable write to channel {channel_nr}. '
-                'Did you authenticate and does the channel exist?',
-            )
+        resp = self._call(f'W{channel_nr}{channel_value}')
+        _check_write_channel(resp, channel_nr)
 
     def reset_channel(self, channel_nr: str) -> None:
         '''
@@ -255,96 +792,68 @@ class Combilog():
         :channel_nr: must be from '01' to '20' (internal channels)
         or '80' to 'BB' (external channels)
         '''
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}D{channel_nr}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-            if resp != b'\x06':
-                raise CallNotSuccessfullError(
-                    f'Unable to reset channel {channel_nr}. '
-                    'Did you authenticate and does the channel exist?',
-                )
+        resp = self._call(f'D{channel_nr}')
+        _check_reset_channel(resp, channel_nr)
 
     def pointer_to_start(self, pointer: Union[str, int]) -> None:
         '''sets a pointer to start'''
-        if str(pointer) == '1':
-            call = 'C'
-        elif str(pointer) == '2':
-            call = 'c'
-        else:
-            raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}{call}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                'Unable to set pointer 1. Did you authenticate?',
-            )
+        call = _pointer_call(pointer, 'Cc')
+        resp = self._call(call)
+        _check_pointer_to_start(resp)
 
     def read_event(
         self,
         pointer: Union[str, int],
-    ) -> Dict[str, List[float]]:
+        time_format: str = 'str',
+        decimals: bool = False,
+    ) -> Dict[Timestamp, List[float]]:
         '''
         read the event at the position of the pointer
         returns a dictionary with the timestamp as key
         if there are no events an empty dict is returned
+        :time_format str: type of the timestamp: "str" (default) e.g.
+            "2020-09-04 17:20:00", "datetime" for a datetime.datetime or
+            "epoch" for the seconds since 1970-01-01 as int (the logger's
+            clock is interpreted as UTC)
+        :decimals bool: round every value to the decimals of its channel
+            from ``get_channels`` instead of 2 digits
         '''
-        if str(pointer) == '1':
-            call = 'E'
-        elif str(pointer) == '2':
-            call = 'e'
-        else:
-            raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
-
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}{call}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if len(resp) > 3:
-            events = resp.decode('latin-1')[1:].split(';')
-            # the first char is the address and therefore not needed
-            date = datetime.strptime(events[0][1:], '%y%m%d%H%M%S')
-            # remove carriage return at the end
-            # and convert from IEE Std 754 Short Real Format
-            event = {
-                str(date): [_hexIEE_to_dec(i) for i in events[1:-1]],
-            }
-            return event
-        else:
-            return {}
+        _check_time_format(time_format)
+        return self._read_event(
+            pointer, time_format, self._event_digits(decimals),
+        )
+
+    def _read_event(
+        self,
+        pointer: Union[str, int],
+        time_format: str,
+        digits: Union[int, Sequence[int]],
+    ) -> Dict[Timestamp, List[float]]:
+        call = _pointer_call(pointer, 'Ee')
+        return self._request(call, _parse_event, time_format, digits)
+
+    def _event_digits(self, decimals: bool) -> Union[int, List[int]]:
+        '''the digits the values of an event are rounded to'''
+        if not decimals:
+            return 2
+        return [
+            info['decimals'] if info['decimals'] >= 0 else 2
+            for info in self.get_channels().values()
+        ]
 
     def repeat_read_event(
         self,
         pointer: Union[str, int],
-    ) -> Dict[str, List[float]]:
+        time_format: str = 'str',
+    ) -> Dict[Timestamp, List[float]]:
         '''
         read an event from the logger's storage
+        :time_format str: type of the timestamp "str", "datetime" or "epoch"
+            (see ``read_event``)
         '''
-        if str(pointer) == '1':
-            call = 'F'
-        elif str(pointer) == '2':
-            call = 'f'
-        else:
-            raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
-
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}{call}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if len(resp) > 3:
-            events = resp.decode('latin-1')[1:].split(';')
-            # the first char is the address and therefore not needed
-            date = datetime.strptime(events[0][1:], '%y%m%d%H%M%S')
-            # remove carriage return at the end
-            # and convert from IEE Std 754 Short Real Format
-            event = {
-                str(date): [_hexIEE_to_dec(i) for i in events[1:-1]],
-            }
-            return event
-        else:
-            return {}
+        call = _pointer_call(pointer, 'Ff')
+        _check_time_format(time_format)
+        return self._request(call, _parse_event, time_format)
 
     def pointer_to_date(
         self,
@@ -355,29 +864,10 @@ class Combilog():
         sets pointer 1 to a specific date
         :date: str with Format '%y%m%d%H%M%S' or a datetime.dateime object
         '''
-        if str(pointer) == '1':
-            call = 'C'
-        elif str(pointer) == '2':
-            call = 'c'
-        else:
-            raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
-        if isinstance(date, datetime):
-            date = date.strftime('%y%m%d%H%M%S')
-        if len(date) != 12:
-            raise ValueError(
-                f'date must have len 12, not {len(date)} '
-                'and must have the format %y%m%d%H%M%S',
-            )
-        with self.ser as ser:
-            telegram = f'${self.logger_addr}{call}{date}\r'.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                f'Unable to set pointer 1 to {date}. Did you authenticate? '
-                'has "date" the format %y%m%d%H%M%S or is a datetime.datetime'
-                ' object?',
-            )
+        call = _pointer_call(pointer, 'Cc')
+        date = _date_str(date)
+        resp = self._call(f'{call}{date}')
+        _check_pointer_to_date(resp, date)
 
     def pointer_to_pos(
         self,
@@ -387,22 +877,9 @@ class Combilog():
         '''
         sets pointer 1 to a specific position
         '''
-        if str(pointer) == '1':
-            call = 'C'
-        elif str(pointer) == '2':
-            call = 'c'
-        else:
-            raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
-        with self.ser as ser:
-            telegram_str = f'${self.logger_addr}{call}{position}\r'
-            telegram = telegram_str.encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                f'Unable to set pointer 1 to position {position}. '
-                'Did you authenticate?',
-            )
+        call = _pointer_call(pointer, 'Cc')
+        resp = self._call(f'{call}{position}')
+        _check_pointer_to_pos(resp, position)
 
     def set_datetime(
         self,
@@ -412,45 +889,17 @@ class Combilog():
         Set the logger's clock (default is computer time)
         a previous Authentication is required!
         '''
-        if isinstance(date, datetime):
-            date = date.strftime('%y%m%d%H%M%S')
-        if len(date) != 12:
-            raise ValueError(
-                f'date must have len 12, not {len(date)} '
-                'and must have the format %y%m%d%H%M%S',
-            )
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}G{date}\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                f'Unable to set the date to {date}. '
-                'Did you authenticate?',
-            )
+        date = _date_str(date)
+        resp = self._call(f'G{date}')
+        _check_set_datetime(resp, date)
 
     def read_datetime(self) -> datetime:
         '''read the time and return it as a datetime.datetime object'''
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}H\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        resp_str = resp.decode('latin-1')[1:-1]
-        logger_datetime = datetime.strptime(resp_str, '%y%m%d%H%M%S')
-        return logger_datetime
+        return self._request('H', _parse_datetime)
 
     def get_rate(self) -> Dict[str, int]:
         '''get the measuring and averaging rate in seconds'''
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}X\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        rates_str = resp.decode('latin-1')[1:]
-        rates = {
-            'measuring_rate': int(rates_str[0:2]),
-            'averaging_interval': int(rates_str[2:7]),
-        }
-        return rates
+        return self._request('X', _parse_rate)
 
     def set_rate(
         self,
@@ -458,147 +907,2095 @@ class Combilog():
         averaging_interval: int,
     ) -> None:
         '''set the logger's measuring and averaging rate'''
-        if measuring_rate > 100:
-            raise ValueError('Cannot set measuring rate higher than 99')
-        if averaging_interval > 43200:
-            raise ValueError('max averaging interval rate is 43200 (12h)')
-        # bring to correct length
-        len_averaging_interval = len(str(averaging_interval))
-        if len(str(measuring_rate)) < 2:
-            measuring_rate_str = '0' + str(measuring_rate)
-        else:
-            measuring_rate_str = str(measuring_rate)
-
-        if len_averaging_interval < 5:
-            averaging_interval_str = ((5 - len_averaging_interval) * '0'
-                                      + str(averaging_interval))
-        else:
-            averaging_interval_str = str(averaging_interval)
-
-        rate = f'{measuring_rate_str}{averaging_interval_str}'
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}Y{rate}\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                f'Unable to set the rate to {measuring_rate} '
-                f'and {averaging_interval}. Did you authenticate?',
-            )
+        rate = _rate_str(measuring_rate, averaging_interval)
+        resp = self._call(f'Y{rate}')
+        _check_set_rate(resp, measuring_rate, averaging_interval)
 
     def delete_memory(self) -> None:
         '''deletes the logger storage cannot be undone!'''
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}C.ALL\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                "Unable to delete the logger's storage. "
-                'Did you authenticate?',
-            )
+        resp = self._call('C.ALL')
+        _check_delete_memory(resp)
 
     def get_nr_events(self) -> int:
         '''
         get the number of logs available with the currently set pointer
         '''
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}N\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        logs = int(resp.decode('latin-1')[1:])
-        return logs
+        return self._request('N', _parse_nr_events)
 
     def transparent_mode(self, state: bool) -> None:
         '''switch the transparent mode on or off'''
-        if state:
-            call = 'T1'
-        if not state:
-            call = 'T2'
-
-        with self.ser as ser:
-            telegram = (f'${self.logger_addr}{call}\r').encode('latin-1')
-            ser.write(telegram)
-            resp = ser.read_until(b'\r')
-        if resp != b'\x06':
-            raise CallNotSuccessfullError(
-                'Unable to change the state of the transparent modee.'
-                'Did you authenticate?',
+        call = 'T1' if state else 'T2'
+        resp = self._call(call)
+        _check_transparent_mode(resp)
+
+    def iter_events(
+        self,
+        pointer: Union[str, int],
+        verbose: bool = False,
+        time_format: str = 'str',
+        prefetch: int = 0,
+        decimals: bool = False,
+    ) -> Generator[Tuple[Timestamp, List[float]], None, None]:
+        '''
+        yield all bookings starting from the set pointer one by one as a
+        tuple of (timestamp, values) as soon as they were read. The port is
+        kept open until the generator is exhausted or closed.
+        :pointer str|int: the pointer from where to read
+        :verbose bool: print output to the stdout
+        :time_format str: type of the timestamp "str", "datetime" or "epoch"
+            (see ``read_event``)
+        :prefetch int: read up to this many events ahead in a background
+            thread while the previous ones are decoded and processed. The
+            port must not be used otherwise until the generator is closed
+        :decimals bool: round the values to the decimals of their channel
+            (see ``read_event``)
+        '''
+        _check_time_format(time_format)
+        with self._connection():
+            digits = self._event_digits(decimals)
+            # get number of logs
+            logs = self.get_nr_events()
+            yield from self._iter_events(
+                pointer, logs, verbose, time_format, prefetch, digits,
+            )
+
+    def _iter_events(
+        self,
+        pointer: Union[str, int],
+        logs: int,
+        verbose: bool,
+        time_format: str,
+        prefetch: int = 0,
+        digits: Union[int, Sequence[int]] = 2,
+    ) -> Generator[Tuple[Timestamp, List[float]], None, None]:
+        '''read the next ``logs`` events at the pointer'''
+        if prefetch > 0:
+            frames = self._prefetch_frames(pointer, logs, verbose, prefetch)
+            try:
+                for frame in frames:
+                    yield from _parse_event(frame, time_format, digits).items()
+            finally:
+                # sets the pointer back if the events were not all consumed
+                frames.close()
+            return
+        for i in range(logs):
+            if verbose:
+                print(f'reading event {i+1} of {logs}')
+            event = self._read_event(pointer, time_format, digits)
+            yield from event.items()
+
+    def _iter_frames(
+        self,
+        pointer: Union[str, int],
+        logs: int,
+        verbose: bool,
+        prefetch: int = 0,
+    ) -> Generator[bytes, None, None]:
+        '''read the raw replies of the next ``logs`` events at the pointer'''
+        if prefetch > 0:
+            yield from self._prefetch_frames(pointer, logs, verbose, prefetch)
+            return
+        call = _pointer_call(pointer, 'Ee')
+        for i in range(logs):
+            if verbose:
+                print(f'reading event {i+1} of {logs}')
+            yield self._request(call, _raw_reply)
+
+    def _prefetch_frames(
+        self,
+        pointer: Union[str, int],
+        logs: int,
+        verbose: bool,
+        prefetch: int,
+    ) -> Generator[bytes, None, None]:
+        '''
+        read the raw replies of the next ``logs`` events from a background
+        thread into a queue of at most ``prefetch`` replies, so the port is
+        read while the events are decoded and consumed. If the generator is
+        closed early the pointer is set back to the first event which was
+        read but not yielded
+        '''
+        call = _pointer_call(pointer, 'Ee')
+        frames: 'queue.Queue[Union[bytes, BaseException, None]]' = (
+            queue.Queue(maxsize=prefetch)
+        )
+        cancel = threading.Event()
+        # a reply read after the generator was closed
+        leftover: List[Union[bytes, BaseException, None]] = []
+
+        def put(item: Union[bytes, BaseException, None]) -> bool:
+            while not cancel.is_set():
+                try:
+                    frames.put(item, timeout=0.05)
+                    return True
+                except queue.Full:
+                    continue
+            leftover.append(item)
+            return False
+
+        def read() -> None:
+            try:
+                for _ in range(logs):
+                    frame = self._request(call, _raw_reply)
+                    if not put(frame):
+                        return
+                    elif len(frame) <= 3:
+                        # there are no more events
+                        break
+                put(None)
+            except BaseException as e:
+                put(e)
+
+        thread = threading.Thread(target=read, daemon=True)
+        thread.start()
+        done = False
+        try:
+            for i in range(logs):
+                frame = frames.get()
+                if frame is None:
+                    break
+                elif isinstance(frame, BaseException):
+                    raise frame
+                if verbose:
+                    print(f'reading event {i+1} of {logs}')
+                yield frame
+            done = True
+        finally:
+            cancel.set()
+            thread.join()
+            if not done:
+                unread: List[Union[bytes, BaseException, None]] = []
+                while not frames.empty():
+                    unread.append(frames.get_nowait())
+                unread.extend(leftover)
+                # the pointer was moved past the events read ahead
+                for frame in unread:
+                    if isinstance(frame, bytes) and len(frame) > 3:
+                        [timestamp] = _parse_event(frame, 'datetime')
+                        assert isinstance(timestamp, datetime)
+                        self._reset_pointer(pointer, timestamp)
+                        break
+
+    def _reset_pointer(
+        self,
+        pointer: Union[str, int],
+        timestamp: datetime,
+    ) -> None:
+        '''
+        set the pointer back to the first event read ahead but not yielded.
+        This runs while a generator is closed, possibly with an error of the
+        consumer in flight, so setting the pointer is tried again and if it
+        still fails a warning is issued instead of an error
+        '''
+        error: Optional[Exception] = None
+        for _ in range(_RESET_ATTEMPTS):
+            try:
+                self.pointer_to_date(pointer, timestamp)
+                return
+            except Exception as e:
+                error = e
+        warnings.warn(
+            f'unable to set pointer {pointer} back to {timestamp}, the events '
+            f'from {timestamp} on were read ahead and are skipped: {error}',
+            RuntimeWarning,
+        )
+
+    def read_range(
+        self,
+        start: datetime,
+        end: datetime,
+        pointer: Union[str, int] = 1,
+        time_format: str = 'str',
+    ) -> List[Tuple[Timestamp, List[float]]]:
+        '''
+        read the events booked from start to end (both included). The
+        pointer is set to start and reading stops at the first event after
+        end, so only the events of the window are downloaded
+        :start datetime: first booking to read
+        :end datetime: last booking to read
+        :pointer str|int: the pointer used for reading, it is moved
+        :time_format str: type of the timestamps "str", "datetime" or "epoch"
+            (see ``read_event``)
+        '''
+        return self.read_ranges([(start, end)], pointer, time_format)
+
+    def read_ranges(
+        self,
+        windows: Sequence[Tuple[datetime, datetime]],
+        pointer: Union[str, int] = 1,
+        time_format: str = 'str',
+        max_gap: Optional[timedelta] = None,
+    ) -> List[Tuple[Timestamp, List[float]]]:
+        '''
+        read the events of many time windows (see ``read_range``) in
+        chronological order. Windows closer than max_gap are read with one
+        positioning of the pointer, the events between them are read and
+        dropped
+        :windows list: (start, end) of every window
+        :max_gap timedelta: largest gap that is read through, default is two
+            averaging intervals so at most one event is read instead of
+            setting the pointer again
+        '''
+        _check_time_format(time_format)
+        for start, end in windows:
+            if start > end:
+                raise ValueError(f'window starts after its end: {start} {end}')
+        events: List[Tuple[Timestamp, List[float]]] = []
+        with self._connection():
+            if max_gap is None:
+                interval = self.get_rate()['averaging_interval']
+                max_gap = timedelta(seconds=2 * interval)
+            for group in _group_windows(windows, max_gap):
+                self.pointer_to_date(pointer, group[0][0])
+                bounds = [(_to_epoch(i), _to_epoch(j)) for i, j in group]
+                last = bounds[-1][1]
+                window = 0
+                while True:
+                    event = self.read_event(pointer, time_format='epoch')
+                    if not event:
+                        break
+                    [(timestamp, values)] = event.items()
+                    assert isinstance(timestamp, int)
+                    if timestamp > last:
+                        break
+                    while timestamp > bounds[window][1]:
+                        window += 1
+                    if timestamp >= bounds[window][0]:
+                        events.append(
+                            (_format_epoch(timestamp, time_format), values),
+                        )
+        return events
+
+    def _read_columns(
+        self,
+        pointer: Union[str, int],
+        verbose: bool,
+        prefetch: int = 0,
+        decimals: bool = False,
+    ) -> Dict[str, Any]:
+        '''
+        read all events into one preallocated buffer per channel plus a
+        "timestamp" column with the seconds since epoch. The buffers are
+        numpy arrays if numpy is installed otherwise array.array. The
+        replies are decoded in batches of ``_BATCH_EVENTS`` events
+        '''
+        with self._connection():
+            names = self.get_channel_list()
+            digits = self._event_digits(decimals)
+            logs = self.get_nr_events()
+            timestamps = _empty_column('q', logs)
+            columns: List[Any] = []
+            n = 0
+            frames = self._iter_frames(pointer, logs, verbose, prefetch)
+            while True:
+                batch = list(islice(frames, _BATCH_EVENTS))
+                if not batch:
+                    break
+                stamps, values = _parse_events(batch, 'epoch', digits)
+                if not stamps:
+                    continue
+                k = len(stamps)
+                nr_channels = len(values) // k
+                if not columns:
+                    columns = [
+                        _empty_column('d', logs) for _ in range(nr_channels)
+                    ]
+                timestamps[n:n + k] = array('q', stamps)  # type: ignore
+                for j, column in enumerate(columns):
+                    column[n:n + k] = values[j::nr_channels]
+                n += k
+        # drop the preallocated space if less events than expected were read
+        if n < logs:
+            timestamps = timestamps[:n]
+            columns = [column[:n] for column in columns]
+        output = {'timestamp': timestamps}
+        for name, column in zip(_column_names(names, len(columns)), columns):
+            output[name] = column
+        return output
+
+    def _export_names(self) -> List[str]:
+        '''the channel notations with the unit e.g. "Temp [°C]"'''
+        return [
+            f'{i["channel_notation"]} [{i["unit"]}]' if i['unit']
+            else i['channel_notation']
+            for i in self.get_channels().values()
+        ]
+
+    def export_csv(
+        self,
+        path: Union[str, IO[str]],
+        pointer: Union[str, int],
+        time_format: str = 'str',
+        compress: Optional[bool] = None,
+        delimiter: str = ',',
+        progress: Optional[Callable[[int, int], Any]] = None,
+        prefetch: int = 0,
+    ) -> int:
+        '''
+        write the events starting from the set pointer to a csv file while
+        they are read. The header is the channel notations with their unit.
+        Returns the number of events written
+        :path str|file: the file to write to, a path ending with ".gz" is
+            gzip compressed
+        :pointer str|int: the pointer from where to read
+        :time_format str: type of the timestamp "str", "datetime" or "epoch"
+            (see ``read_event``)
+        :compress bool: gzip compress the file, default is by the suffix
+        :delimiter str: the column delimiter
+        :progress callable: called with the number of events written and
+            the number of events to read after every event
+        :prefetch int: number of events read ahead (see ``iter_events``)
+        '''
+        _check_time_format(time_format)
+        with self._connection(), _open_export(path, compress) as f:
+            names = self._export_names()
+            events = self._export_events(
+                pointer, time_format, progress, prefetch,
+            )
+            return _write_csv(f, names, events, delimiter)
+
+    def export_ndjson(
+        self,
+        path: Union[str, IO[str]],
+        pointer: Union[str, int],
+        time_format: str = 'str',
+        compress: Optional[bool] = None,
+        progress: Optional[Callable[[int, int], Any]] = None,
+        prefetch: int = 0,
+    ) -> int:
+        '''
+        write the events starting from the set pointer as newline delimited
+        JSON while they are read. Every line is an object of the "timestamp"
+        and the values by the channel notations with their unit. Returns the
+        number of events written
+        :path str|file: the file to write to, a path ending with ".gz" is
+            gzip compressed
+        :pointer str|int: the pointer from where to read
+        :time_format str: type of the timestamp "str", "datetime" (written
+            as str) or "epoch" (see ``read_event``)
+        :compress bool: gzip compress the file, default is by the suffix
+        :progress callable: called with the number of events written and
+            the number of events to read after every event
+        :prefetch int: number of events read ahead (see ``iter_events``)
+        '''
+        _check_time_format(time_format)
+        with self._connection(), _open_export(path, compress) as f:
+            names = self._export_names()
+            events = self._export_events(
+                pointer, time_format, progress, prefetch,
             )
+            return _write_ndjson(f, names, events)
+
+    def _export_events(
+        self,
+        pointer: Union[str, int],
+        time_format: str,
+        progress: Optional[Callable[[int, int], Any]],
+        prefetch: int,
+    ) -> Iterator[Tuple[Timestamp, List[float]]]:
+        logs = self.get_nr_events()
+        events = self._iter_events(
+            pointer, logs, False, time_format, prefetch,
+        )
+        if progress is None:
+            return events
+        return _with_progress(events, lambda n: progress(n, logs))
 
     def read_logger(
         self,
         pointer: Union[str, int],
         verbose: bool = False,
         output_type: str = 'dict',
-    ) -> Union[Dict[str, List[float]], List[Union[Any]]]:
+        time_format: str = 'str',
+        prefetch: int = 0,
+        decimals: bool = False,
+    ) -> Union[
+        Dict[Timestamp, List[float]],
+        Dict[str, Any],
+        List[Union[Any]],
+        Iterator[Tuple[Timestamp, List[float]]],
+    ]:
         '''
         reads all bookings starting from the set pointer
         :pointer str|int: the pointer from where to read
         :verbose bool: print output to the stdout
         :output_type str: output as a "dict" which can be converted to a pd df
             output as "list" to be written to csv using the csv module
+            output as "iter" to get a generator yielding (timestamp, values)
+            while the events are read (see ``iter_events``)
+            output as "columns" to get a dict with one array per channel
+            named after ``get_channel_list`` and a "timestamp" column in
+            seconds since epoch. The arrays are numpy arrays if numpy is
+            installed and can be passed to a pd df without copying
+        :time_format str: type of the timestamp "str", "datetime" or "epoch"
+            (see ``read_event``)
+        :prefetch int: number of events read ahead while the previous ones
+            are decoded (see ``iter_events``)
+        :decimals bool: round the values to the decimals of their channel
+            (see ``read_event``)
         depending on the number of logs this can take a while
         '''
-        # get number of logs
-        logs = self.get_nr_events()
-        # read all events
-        i = 0
-        events = {}
-        while i < logs:
-            if verbose:
-                print(f'reading event {i+1} of {logs}')
-            event = self.read_event(pointer)
-            events.update(event)
-            i += 1
-        if output_type == 'dict':
+        OUTPUT_TYPES = ('dict', 'list', 'iter', 'columns')
+        if output_type not in OUTPUT_TYPES:
+            raise ValueError(
+                f'output_type must be {", ".join(OUTPUT_TYPES)}'
+                f', not {output_type}',
+            )
+        if output_type == 'columns':
+            return self._read_columns(
+                pointer=pointer,
+                verbose=verbose,
+                prefetch=prefetch,
+                decimals=decimals,
+            )
+        events = self.iter_events(
+            pointer=pointer,
+            verbose=verbose,
+            time_format=time_format,
+            prefetch=prefetch,
+            decimals=decimals,
+        )
+        if output_type == 'iter':
             return events
         elif output_type == 'list':
-            list_events = []
-            for j in events.keys():
-                values = [k for k in events[j]]
-                timestamp_values = [j] + values  # type: ignore
-                list_events.append(timestamp_values)
-            return list_events
+            # dict first so duplicated timestamps are only kept once
+            return [[j] + values for j, values in dict(events).items()]
         else:
-            raise ValueError(
-                f'output_type must be dict or list, not {output_type}',
-            )
+            return dict(events)
 
 
-def _channel_type_to_txt(channel_type: int) -> str:
-    CHANNEL_TYPES = {
-        0: 'empty channel (EM)',
-        1: 'analogue input channel (AR)',
-        2: 'arithmeic channel (AR)',
-        3: 'digital output channel (DO)',
-        4: 'digital input channel (DI)',
-        5: 'setpoint channel (VO)',
-        6: 'alarm channel (AL)',
-    }
-    try:
-        return CHANNEL_TYPES[channel_type]
-    except KeyError:
-        return 'unknown channel type'
+class AsyncCombilog():
+    '''
+    asyncio version of ``Combilog`` with the same commands as coroutines.
+    The port is read without blocking the event loop, so one process can
+    talk to many loggers at once. The arguments are the same as for
+    ``Combilog``
+    :poll_interval float: seconds between checking for new data on ports
+        which cannot be watched by the event loop (e.g. on windows)
+    '''
 
+    def __init__(
+        self,
+        logger_addr: Union[str, int],
+        port: str,
+        baudrate: int = 9600,
+        bytesize: int = 8,
+        parity: str = 'N',
+        stopbits: int = 1,
+        timeout: float = 1.0,
+        poll_interval: float = 0.005,
+    ) -> None:
+        self.logger_addr = _format_addr(logger_addr)
+        self.ser = _create_serial(
+            port=port,
+            baudrate=baudrate,
+            bytesize=bytesize,
+            parity=parity,
+            stopbits=stopbits,
+            timeout=timeout,
+        )
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._buf = bytearray()
+        self._fd: Optional[int] = None
+        self._data_received: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
 
-def _channel_calc_to_txt(calc_type: int) -> str:
-    CALC_TYPES = {
-        0: 'normal calculation of average value',
-        1: 'calculation of average value with wind direction',
-        2: 'calculation of the sum over the averaging interval',
-        3: 'continuous sum',
-        4: 'vectorial average for wind velocity',
-        5: 'vectorial average for wind direction',
-    }
-    try:
-        return CALC_TYPES[calc_type]
-    except KeyError:
-        return 'unknown calculation type'
+    async def open(self) -> None:
+        '''open the port and keep it open until ``close`` is called'''
+        if self.ser.is_open:
+            return
+        # reads must never block the event loop
+        self.ser.timeout = 0
+        self.ser.open()
+        self._buf.clear()
+        self._data_received = asyncio.Event()
+        try:
+            self._fd = self.ser.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            # e.g. windows or url handlers, these are polled instead
+            self._fd = None
+        if self._fd is not None:
+            asyncio.get_event_loop().add_reader(self._fd, self._read_ready)
 
+    async def close(self) -> None:
+        '''close the port that was opened via ``open``'''
+        if self._fd is not None:
+            asyncio.get_event_loop().remove_reader(self._fd)
+            self._fd = None
+        self.ser.close()
+        self.ser.timeout = self.timeout
 
-def _data_format_to_txt(data_format: int) -> str:
-    DATA_FORMATS = {
+    @property
+    def is_open(self) -> bool:
+        '''True if a session is open and the port is kept open'''
+        return bool(self.ser.is_open)
+
+    async def __aenter__(self) -> 'AsyncCombilog':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    def _read_available(self) -> None:
+        waiting = self.ser.in_waiting
+        if waiting:
+            self._buf += self.ser.read(waiting)
+
+    def _read_ready(self) -> None:
+        '''called by the event loop when the port can be read'''
+        self._read_available()
+        assert self._data_received is not None
+        self._data_received.set()
+
+    async def _read_reply(self) -> bytes:
+        '''wait for one reply frame (see ``_read_reply``) or the timeout'''
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.timeout
+        while True:
+            if self._fd is None:
+                self._read_available()
+            end = _frame_end(self._buf)
+            if end:
+                frame = bytes(self._buf[:end])
+                del self._buf[:end]
+                return frame
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                # return what was received like a serial port would
+                frame = bytes(self._buf)
+                self._buf.clear()
+                return frame
+            if self._fd is not None:
+                assert self._data_received is not None
+                self._data_received.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._data_received.wait(),
+                        timeout=remaining,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def _call(self, command: str) -> bytes:
+        '''
+        send a command to the logger and wait for the reply frame without
+        blocking the event loop. Calls are sent one after another
+        '''
+        telegram = f'${self.logger_addr}{command}\r'.encode('latin-1')
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            opened = not self.is_open
+            if opened:
+                await self.open()
+            try:
+                # drop the rest of a previous reply that timed out
+                self._read_available()
+                self._buf.clear()
+                self.ser.write(telegram)
+                return await self._read_reply()
+            finally:
+                if opened:
+                    await self.close()
+
+    async def authenticate(self, passwd: str) -> bool:
+        '''see ``Combilog.authenticate``'''
+        resp = await self._call(f'P{passwd}')
+        return resp == ACK
+
+    async def device_id(
+            self,
+            fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, str]:
+        '''see ``Combilog.device_id``'''
+        resp = await self._call('V')
+        return _parse_device_id(resp, fields)
+
+    async def device_info(
+            self,
+            fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Union[str, int]]:
+        '''see ``Combilog.device_info``'''
+        resp = await self._call('S')
+        return _parse_device_info(resp, fields)
+
+    async def status_info(self) -> Dict[str, str]:
+        '''see ``Combilog.status_info``'''
+        resp = await self._call('Z')
+        return _parse_status_info(resp)
+
+    async def get_channel_info(self, channel_nr: str) -> Dict[str, Any]:
+        '''see ``Combilog.get_channel_info``'''
+        resp = await self._call(f'B{channel_nr}')
+        return _parse_channel_info(resp, channel_nr)
+
+    async def discover_channels(self) -> Dict[str, Dict[str, Any]]:
+        '''see ``Combilog.discover_channels``'''
+        channels: Dict[str, Dict[str, Any]] = {}
+        device = await self.device_info(['nr_channels'])
+        nr_channels = int(device['nr_channels'])
+        for channel_nr in CHANNEL_NUMBERS:
+            if len(channels) >= nr_channels:
+                break
+            try:
+                info = await self.get_channel_info(channel_nr)
+            except ChannelNotFoundError:
+                continue
+            if info['channel_type'] != EMPTY_CHANNEL:
+                channels[channel_nr] = info
+        return channels
+
+    async def get_channel_list(self) -> List[str]:
+        '''see ``Combilog.get_channel_list``'''
+        channels = await self.discover_channels()
+        return [info['channel_notation'] for info in channels.values()]
+
+    async def read_channel(self, channel_nr: str) -> str:
+        '''see ``Combilog.read_channel``'''
+        resp = await self._call(f'R{channel_nr}')
+        return _parse_channel(resp, channel_nr)
+
+    async def write_channel(
+        self,
+        channel_nr: str,
+        channel_value: Union[float, int, str],
+    ) -> None:
+        '''see ``Combilog.write_channel``'''
+        resp = await self._call(f'W{channel_nr}{channel_value}')
+        _check_write_channel(resp, channel_nr)
+
+    async def reset_channel(self, channel_nr: str) -> None:
+        '''see ``Combilog.reset_channel``'''
+        resp = await self._call(f'D{channel_nr}')
+        _check_reset_channel(resp, channel_nr)
+
+    async def pointer_to_start(self, pointer: Union[str, int]) -> None:
+        '''see ``Combilog.pointer_to_start``'''
+        call = _pointer_call(pointer, 'Cc')
+        resp = await self._call(call)
+        _check_pointer_to_start(resp)
+
+    async def read_event(
+        self,
+        pointer: Union[str, int],
+        time_format: str = 'str',
+    ) -> Dict[Timestamp, List[float]]:
+        '''see ``Combilog.read_event``'''
+        call = _pointer_call(pointer, 'Ee')
+        _check_time_format(time_format)
+        resp = await self._call(call)
+        return _parse_event(resp, time_format)
+
+    async def repeat_read_event(
+        self,
+        pointer: Union[str, int],
+        time_format: str = 'str',
+    ) -> Dict[Timestamp, List[float]]:
+        '''see ``Combilog.repeat_read_event``'''
+        call = _pointer_call(pointer, 'Ff')
+        _check_time_format(time_format)
+        resp = await self._call(call)
+        return _parse_event(resp, time_format)
+
+    async def pointer_to_date(
+        self,
+        pointer: Union[str, int],
+        date: Union[str, datetime],
+    ) -> None:
+        '''see ``Combilog.pointer_to_date``'''
+        call = _pointer_call(pointer, 'Cc')
+        date = _date_str(date)
+        resp = await self._call(f'{call}{date}')
+        _check_pointer_to_date(resp, date)
+
+    async def pointer_to_pos(
+        self,
+        pointer: Union[str, int],
+        position: str,
+    ) -> None:
+        '''see ``Combilog.pointer_to_pos``'''
+        call = _pointer_call(pointer, 'Cc')
+        resp = await self._call(f'{call}{position}')
+        _check_pointer_to_pos(resp, position)
+
+    async def set_datetime(
+        self,
+        date: Optional[Union[str, datetime]] = None,
+    ) -> None:
+        '''see ``Combilog.set_datetime``, default is the computer time'''
+        date = _date_str(date if date is not None else datetime.now())
+        resp = await self._call(f'G{date}')
+        _check_set_datetime(resp, date)
+
+    async def read_datetime(self) -> datetime:
+        '''see ``Combilog.read_datetime``'''
+        resp = await self._call('H')
+        return _parse_datetime(resp)
+
+    async def get_rate(self) -> Dict[str, int]:
+        '''see ``Combilog.get_rate``'''
+        resp = await self._call('X')
+        return _parse_rate(resp)
+
+    async def set_rate(
+        self,
+        measuring_rate: int,
+        averaging_interval: int,
+    ) -> None:
+        '''see ``Combilog.set_rate``'''
+        rate = _rate_str(measuring_rate, averaging_interval)
+        resp = await self._call(f'Y{rate}')
+        _check_set_rate(resp, measuring_rate, averaging_interval)
+
+    async def delete_memory(self) -> None:
+        '''see ``Combilog.delete_memory``'''
+        resp = await self._call('C.ALL')
+        _check_delete_memory(resp)
+
+    async def get_nr_events(self) -> int:
+        '''see ``Combilog.get_nr_events``'''
+        resp = await self._call('N')
+        return _parse_nr_events(resp)
+
+    async def transparent_mode(self, state: bool) -> None:
+        '''see ``Combilog.transparent_mode``'''
+        call = 'T1' if state else 'T2'
+        resp = await self._call(call)
+        _check_transparent_mode(resp)
+
+    async def iter_events(
+        self,
+        pointer: Union[str, int],
+        verbose: bool = False,
+        time_format: str = 'str',
+    ) -> AsyncGenerator[Tuple[Timestamp, List[float]], None]:
+        '''
+        asynchronously yield all bookings starting from the set pointer as
+        (timestamp, values), see ``Combilog.iter_events``. If the loop is
+        left early the port is only closed by ``aclose`` or when the
+        generator is garbage collected
+
+            events = logger.iter_events(pointer=1)
+            try:
+                async for timestamp, values in events:
+                    ...
+            finally:
+                await events.aclose()
+        '''
+        _check_time_format(time_format)
+        opened = not self.is_open
+        if opened:
+            await self.open()
+        try:
+            logs = await self.get_nr_events()
+            for i in range(logs):
+                if verbose:
+                    print(f'reading event {i+1} of {logs}')
+                event = await self.read_event(pointer, time_format)
+                for item in event.items():
+                    yield item
+        finally:
+            if opened:
+                await self.close()
+
+    async def read_logger(
+        self,
+        pointer: Union[str, int],
+        verbose: bool = False,
+        output_type: str = 'dict',
+        time_format: str = 'str',
+    ) -> Union[
+        Dict[Timestamp, List[float]],
+        List[Union[Any]],
+        AsyncIterator[Tuple[Timestamp, List[float]]],
+    ]:
+        '''
+        reads all bookings starting from the set pointer, see
+        ``Combilog.read_logger``. output_type "iter" returns an async
+        iterator, the "columns" output is not supported
+        '''
+        OUTPUT_TYPES = ('dict', 'list', 'iter')
+        if output_type not in OUTPUT_TYPES:
+            raise ValueError(
+                f'output_type must be {", ".join(OUTPUT_TYPES)}'
+                f', not {output_type}',
+            )
+        events = self.iter_events(
+            pointer=pointer,
+            verbose=verbose,
+            time_format=time_format,
+        )
+        if output_type == 'iter':
+            return events
+        try:
+            # dict first so duplicated timestamps are only kept once
+            events_dict = {j: values async for j, values in events}
+        finally:
+            # close the port even if reading failed
+            await events.aclose()
+        if output_type == 'list':
+            return [[j] + values for j, values in events_dict.items()]
+        else:
+            return events_dict
+
+
+class FleetResult(NamedTuple):
+    '''result of a task run on one logger of a ``Fleet``'''
+    port: Optional[str]
+    logger_addr: str
+    result: Any
+    error: Optional[Exception]
+
+
+class Fleet():
+    '''
+    poll many loggers at once. Loggers on different ports are polled in
+    parallel by one worker thread per port, loggers sharing a port (e.g. a
+    RS-485 bus) are polled one after another so they never collide
+    :targets list: (port, logger_addr) tuples or ``Combilog`` instances.
+        ``Combilog`` instances are grouped by the name of their port
+    :max_workers int: maximum number of ports polled at once (default all)
+    :kwargs: serial settings passed to ``Combilog`` for the (port,
+        logger_addr) targets e.g. baudrate
+    '''
+
+    def __init__(
+        self,
+        targets: Sequence[Union[Tuple[str, Union[str, int]], Combilog]],
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
+        ports: Dict[str, serial.Serial] = {}
+        self.loggers: List[Combilog] = []
+        for target in targets:
+            if isinstance(target, Combilog):
+                logger = target
+            else:
+                port, logger_addr = target
+                logger = Combilog(logger_addr=logger_addr, port=port, **kwargs)
+                # loggers on the same port share one serial object
+                logger.ser = ports.setdefault(port, logger.ser)
+            self.loggers.append(logger)
+        self.max_workers = max_workers
+
+    @property
+    def buses(self) -> List[List[Combilog]]:
+        '''the loggers grouped by the serial port they share'''
+        buses: Dict[Union[str, int], List[Combilog]] = {}
+        for logger in self.loggers:
+            buses.setdefault(_bus_key(logger.ser), []).append(logger)
+        return list(buses.values())
+
+    def poll(
+        self,
+        task: Callable[[Combilog], Any],
+    ) -> Generator[FleetResult, None, None]:
+        '''
+        run the task (e.g. ``lambda logger: logger.read_logger(1)``) on every
+        logger and yield a ``FleetResult`` as soon as a logger is done. An
+        exception raised by the task is returned in ``error`` and does not
+        stop polling the other loggers
+        '''
+        buses = self.buses
+        results: 'queue.Queue[Optional[FleetResult]]' = queue.Queue()
+        cancelled = threading.Event()
+
+        def poll_bus(loggers: List[Combilog]) -> None:
+            # loggers built separately on the same port have their own
+            # serial objects which are opened one after another
+            sessions: Dict[int, List[Combilog]] = {}
+            for logger in loggers:
+                sessions.setdefault(id(logger.ser), []).append(logger)
+            try:
+                for shared in sessions.values():
+                    if cancelled.is_set():
+                        break
+                    poll_session(shared)
+            finally:
+                results.put(None)
+
+        def poll_session(loggers: List[Combilog]) -> None:
+            pending = list(loggers)
+            try:
+                # keep the port open for all loggers sharing it
+                with loggers[0]._connection():
+                    while pending and not cancelled.is_set():
+                        logger = pending.pop(0)
+                        try:
+                            result = FleetResult(
+                                logger.ser.port, logger.logger_addr,
+                                task(logger), None,
+                            )
+                        except Exception as e:
+                            result = FleetResult(
+                                logger.ser.port, logger.logger_addr, None, e,
+                            )
+                        results.put(result)
+            except Exception as e:
+                # e.g. the port could not be opened
+                for logger in pending:
+                    results.put(
+                        FleetResult(
+                            logger.ser.port, logger.logger_addr, None, e,
+                        ),
+                    )
+
+        max_workers = self.max_workers or max(len(buses), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for loggers in buses:
+                executor.submit(poll_bus, loggers)
+            try:
+                running = len(buses)
+                while running:
+                    result = results.get()
+                    if result is None:
+                        running -= 1
+                    else:
+                        yield result
+            finally:
+                cancelled.set()
+
+
+def _bus_key(ser: serial.Serial) -> Union[str, int]:
+    '''
+    the physical port of a serial object. Every ``loop://`` port is a
+    separate port in the process, so it is identified by the object
+    '''
+    if ser.port is None or ser.port.startswith('loop://'):
+        return id(ser)
+    return ser.port
+
+
+class Checkpoint(NamedTuple):
+    '''the last event of a logger that was downloaded and acknowledged'''
+    serial_number: int
+    timestamp: datetime
+
+
+class CheckpointStore():
+    '''
+    durable checkpoints of many loggers in one JSON file keyed by the
+    logger's serial number. Every save replaces the file atomically
+    :path str: path to the JSON file, it is created on the first save
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def load(self, serial_number: int) -> Optional[Checkpoint]:
+        '''the checkpoint of the logger or None if there is none yet'''
+        with self._lock:
+            checkpoints = self._read()
+        timestamp = checkpoints.get(str(serial_number))
+        if timestamp is None:
+            return None
+        return Checkpoint(
+            serial_number=serial_number,
+            timestamp=datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S'),
+        )
+
+    def save(self, checkpoint: Checkpoint) -> None:
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[str(checkpoint.serial_number)] = str(
+                checkpoint.timestamp,
+            )
+            _atomic_write_json(self.path, checkpoints)
+
+
+class SyncBatch(NamedTuple):
+    '''new events fetched by ``IncrementalSync`` and their checkpoint'''
+    events: List[Tuple[Timestamp, List[float]]]
+    checkpoint: Optional[Checkpoint]
+
+
+class IncrementalSync():
+    '''
+    download only the events that were booked since the last acknowledged
+    download. The pointer is set just after the checkpoint so every cycle
+    only costs time for the new events.
+
+        sync = IncrementalSync(logger, CheckpointStore('checkpoints.json'))
+        with sync.batch() as events:
+            insert_into_db(events)  # checkpoint is saved if this succeeds
+
+    :logger Combilog: the logger to sync
+    :store CheckpointStore: where the checkpoints are saved
+    :pointer str|int: the pointer used for reading
+    :start datetime: where to start if there is no checkpoint yet, default
+        is the start of the memory
+    :max_events int: read at most this many events per batch
+    :time_format str: type of the timestamps "str", "datetime" or "epoch"
+        (see ``Combilog.read_event``)
+    '''
+
+    def __init__(
+        self,
+        logger: Combilog,
+        store: CheckpointStore,
+        pointer: Union[str, int] = 1,
+        start: Optional[datetime] = None,
+        max_events: Optional[int] = None,
+        time_format: str = 'str',
+    ) -> None:
+        _check_time_format(time_format)
+        self.logger = logger
+        self.store = store
+        self.pointer = pointer
+        self.start = start
+        self.max_events = max_events
+        self.time_format = time_format
+        self._serial_number: Optional[int] = None
+
+    @property
+    def serial_number(self) -> int:
+        '''the serial number identifying the logger's checkpoint'''
+        if self._serial_number is None:
+            info = self.logger.device_info(['serial_number'])
+            self._serial_number = int(info['serial_number'])
+        return self._serial_number
+
+    def fetch(self) -> SyncBatch:
+        '''
+        read the events after the checkpoint. The checkpoint is not saved
+        before ``commit`` is called with the batch
+        '''
+        with self.logger._connection():
+            checkpoint = self.store.load(self.serial_number)
+            if checkpoint is not None:
+                self.logger.pointer_to_date(
+                    self.pointer,
+                    checkpoint.timestamp + timedelta(seconds=1),
+                )
+            elif self.start is not None:
+                self.logger.pointer_to_date(self.pointer, self.start)
+            else:
+                self.logger.pointer_to_start(self.pointer)
+            logs = self.logger.get_nr_events()
+            if self.max_events is not None:
+                logs = min(logs, self.max_events)
+            events = []
+            last = None
+            if checkpoint is not None:
+                last = _to_epoch(checkpoint.timestamp)
+            # the timestamps are compared as epoch seconds which are the
+            # cheapest to decode
+            for timestamp, values in self.logger._iter_events(
+                self.pointer, logs, False, 'epoch',
+            ):
+                assert isinstance(timestamp, int)
+                # never hand out an acknowledged event twice
+                if last is not None and timestamp <= last:
+                    continue
+                last = timestamp
+                events.append(
+                    (_format_epoch(timestamp, self.time_format), values),
+                )
+        if events:
+            assert last is not None
+            checkpoint = Checkpoint(self.serial_number, _from_epoch(last))
+        return SyncBatch(events=events, checkpoint=checkpoint)
+
+    def commit(self, batch: SyncBatch) -> None:
+        '''acknowledge the batch and save its checkpoint'''
+        if batch.events and batch.checkpoint is not None:
+            self.store.save(batch.checkpoint)
+
+    @contextmanager
+    def batch(
+            self,
+    ) -> Generator[List[Tuple[Timestamp, List[float]]], None, None]:
+        '''
+        fetch the new events and commit them if the block does not raise
+        '''
+        batch = self.fetch()
+        yield batch.events
+        self.commit(batch)
+
+
+class Tick(NamedTuple):
+    '''
+    a read of a ``Scheduler``, either of the current "values" or of the new
+    "events" booked since the last tick
+    '''
+    kind: str
+    # logger time of the measurement or booking the read belongs to
+    scheduled: datetime
+    # seconds the read started after it was due
+    lag: float
+    # ticks skipped because the previous read overran
+    missed: int
+    values: Dict[str, ChannelValue]
+    events: List[Tuple[Timestamp, List[float]]]
+
+
+class Scheduler():
+    '''
+    read the current values at the measuring rate and the new events at the
+    averaging interval of the logger. The wake up times are calculated from
+    the logger's clock so the schedule does not drift and a read never
+    happens before the logger measured or booked. If a read takes longer
+    than the period the skipped ticks are reported as ``Tick.missed``
+
+        for tick in Scheduler(logger):
+            print(tick.kind, tick.scheduled, tick.values or tick.events)
+
+    :logger Combilog: the logger to poll
+    :channel_list list: channels to read, default is all channels
+    :pointer str|int: pointer used to read the new events
+    :read_values bool: read the current values at the measuring rate
+    :read_events bool: read the new events at the averaging interval
+    :delay float: seconds to wait after a measurement or booking before
+        reading it
+    :time_format str: type of the timestamps "str", "datetime" or "epoch"
+        (see ``Combilog.read_event``)
+    :resync float: seconds after which the rates and the clock offset are
+        read again
+    '''
+
+    def __init__(
+        self,
+        logger: Combilog,
+        channel_list: Optional[Sequence[str]] = None,
+        pointer: Union[str, int] = 1,
+        read_values: bool = True,
+        read_events: bool = True,
+        delay: float = 1.0,
+        time_format: str = 'str',
+        resync: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Any] = time.sleep,
+    ) -> None:
+        _check_time_format(time_format)
+        self.logger = logger
+        self.channel_list = channel_list
+        self.pointer = pointer
+        self.read_values = read_values
+        self.read_events = read_events
+        self.delay = delay
+        self.time_format = time_format
+        self.resync = resync
+        self.clock = clock
+        self.sleep = sleep
+        self.periods: Dict[str, int] = {}
+        # seconds the logger clock is ahead of the host clock
+        self.offset = 0.0
+        self._synced = 0.0
+
+    def sync(self) -> None:
+        '''read the rates and estimate the offset of the logger's clock'''
+        with self.logger._connection():
+            rate = self.logger.get_rate()
+            before = self.clock()
+            logger_time = self.logger.read_datetime()
+            after = self.clock()
+        self.periods = {}
+        if self.read_values and rate['measuring_rate'] > 0:
+            self.periods['values'] = rate['measuring_rate']
+        if self.read_events and rate['averaging_interval'] > 0:
+            self.periods['events'] = rate['averaging_interval']
+        # the clock has a resolution of one second, assume the middle of it
+        # and of the time the call took
+        logger_epoch = _to_epoch(logger_time) + 0.5
+        self.offset = logger_epoch - (before + after) / 2
+        self._synced = after
+
+    def logger_now(self) -> float:
+        '''the estimated time of the logger's clock as seconds since epoch'''
+        return self.clock() + self.offset
+
+    def _schedule(self) -> Dict[str, int]:
+        '''the next measurement or booking per kind in logger time'''
+        now = self.logger_now()
+        return {
+            kind: (int(now) // period + 1) * period
+            for kind, period in self.periods.items()
+        }
+
+    def _read(self, kind: str) -> Tuple[Dict[str, ChannelValue], List[Any]]:
+        if kind == 'values':
+            return self.logger.read_channels(self.channel_list), []
+        logs = self.logger.get_nr_events()
+        events = list(
+            self.logger._iter_events(
+                self.pointer, logs, False, self.time_format,
+            ),
+        )
+        return {}, events
+
+    def ticks(
+            self,
+            stop: Optional[threading.Event] = None,
+    ) -> Generator[Tick, None, None]:
+        '''
+        yield a ``Tick`` for every read until stop is set. The port is kept
+        open in between
+        :stop threading.Event: stop the schedule, also while waiting
+        '''
+        sleep = self.sleep if stop is None else stop.wait
+        with self.logger._connection():
+            self.sync()
+            if self.read_events:
+                # only deliver the events booked from now on
+                self.logger.pointer_to_date(
+                    self.pointer, _from_epoch(int(self.logger_now())),
+                )
+            due = self._schedule()
+            while due and not (stop is not None and stop.is_set()):
+                kind = min(due, key=lambda i: due[i])
+                period = self.periods[kind]
+                wake = due[kind] - self.offset + self.delay
+                now = self.clock()
+                if wake > now:
+                    sleep(wake - now)
+                    if stop is not None and stop.is_set():
+                        break
+                    now = self.clock()
+                # skip the ticks that are already over instead of catching up
+                missed = max(int((now - wake) // period), 0)
+                scheduled = due[kind] + missed * period
+                lag = now - (wake + missed * period)
+                values, events = self._read(kind)
+                yield Tick(
+                    kind=kind,
+                    scheduled=_from_epoch(scheduled),
+                    lag=lag,
+                    missed=missed,
+                    values=values,
+                    events=events,
+                )
+                due[kind] = scheduled + period
+                if self.clock() - self._synced > self.resync:
+                    periods = self.periods
+                    self.sync()
+                    if self.periods != periods:
+                        due = self._schedule()
+
+    def __iter__(self) -> Iterator[Tick]:
+        return self.ticks()
+
+    def run(
+            self,
+            on_values: Optional[Callable[[Tick], Any]] = None,
+            on_events: Optional[Callable[[Tick], Any]] = None,
+            stop: Optional[threading.Event] = None,
+    ) -> None:
+        '''
+        call on_values or on_events with every ``Tick`` until stop is set
+        :on_values callable: called with the ticks of the current values
+        :on_events callable: called with the ticks of the new events
+        :stop threading.Event: stop the schedule, also while waiting
+        '''
+        for tick in self.ticks(stop):
+            if tick.kind == 'values' and on_values is not None:
+                on_values(tick)
+            elif tick.kind == 'events' and on_events is not None:
+                on_events(tick)
+
+
+class CaptureRecord(NamedTuple):
+    '''a telegram and its raw reply as stored in a capture file'''
+    # time.monotonic() when the telegram was sent and the reply was read
+    sent: float
+    received: float
+    telegram: bytes
+    reply: bytes
+
+
+class Capture():
+    '''
+    append every telegram sent by a ``Combilog`` and its raw reply to a
+    binary capture file which can be replayed with ``ReplaySerial``. The
+    file starts with CAPTURE_MAGIC followed by one record per telegram: the
+    send and receive time as big-endian doubles, the lengths of the
+    telegram and the reply as unsigned shorts and both as is
+
+        with Capture('session.cap') as capture:
+            logger = Combilog(..., capture=capture)
+            logger.read_logger(pointer=1)
+
+    :path str: the capture file, an existing file is appended to
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._f = open(path, 'ab')
+        if self._f.tell() == 0:
+            self._f.write(CAPTURE_MAGIC)
+
+    def record(
+            self,
+            sent: float,
+            telegram: bytes,
+            received: float,
+            reply: bytes,
+    ) -> None:
+        self._f.write(
+            _CAPTURE_RECORD.pack(sent, received, len(telegram), len(reply)),
+        )
+        self._f.write(telegram)
+        self._f.write(reply)
+
+    def flush(self) -> None:
+        self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> 'Capture':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def read_capture(path: str) -> Generator[CaptureRecord, None, None]:
+    '''read the records of a capture file written by ``Capture``'''
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(CAPTURE_MAGIC):
+        raise ValueError(f'{path} is not a capture file')
+    pos = len(CAPTURE_MAGIC)
+    size = _CAPTURE_RECORD.size
+    while pos < len(data):
+        if pos + size > len(data):
+            raise ValueError(f'{path} ends with an incomplete record')
+        sent, received, len_telegram, len_reply = _CAPTURE_RECORD.unpack_from(
+            data, pos,
+        )
+        pos += size
+        telegram = data[pos:pos + len_telegram]
+        reply = data[pos + len_telegram:pos + len_telegram + len_reply]
+        pos += len_telegram + len_reply
+        if len(telegram) + len(reply) != len_telegram + len_reply:
+            raise ValueError(f'{path} ends with an incomplete record')
+        yield CaptureRecord(sent, received, telegram, reply)
+
+
+class ReplaySerial(protocol_loop.Serial):
+    '''
+    serial port answering the telegrams with the replies recorded in a
+    capture file at full speed. Replies are returned per telegram in the
+    recorded order, a telegram without a recorded reply left is not
+    answered (timeout). Use it instead of the port of a ``Combilog`` to
+    decode a capture again
+
+        logger = Combilog(logger_addr=1, port='loop://')
+        logger.ser = ReplaySerial('session.cap')
+        logs = logger.read_logger(pointer=1)
+
+    :path str: capture file written by ``Capture``
+    '''
+
+    def __init__(self, path: str, **kwargs: Any) -> None:
+        self.replies: Dict[bytes, Deque[bytes]] = {}
+        for record in read_capture(path):
+            self.replies.setdefault(record.telegram, deque()).append(
+                record.reply,
+            )
+        self._rx = b''
+        self._pos = 0
+        # a missing reply must not wait for the timeout
+        kwargs.setdefault('timeout', 0)
+        # like serial.Serial() the port is not opened on creation
+        super().__init__(None, **kwargs)
+        self.port = 'loop://'
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._rx) - self._pos
+
+    def read(self, size: int = 1) -> bytes:
+        data = self._rx[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def read_until(
+            self,
+            expected: bytes = b'\n',
+            size: Optional[int] = None,
+    ) -> bytes:
+        end = self._rx.find(expected, self._pos)
+        end = len(self._rx) if end == -1 else end + len(expected)
+        if size is not None:
+            end = min(end, self._pos + size)
+        return self.read(end - self._pos)
+
+    def reset_input_buffer(self) -> None:
+        self._rx = b''
+        self._pos = 0
+
+    def write(self, data: Any) -> int:
+        replies = self.replies.get(bytes(data))
+        reply = replies.popleft() if replies else b''
+        if self._pos < len(self._rx):
+            self._rx = self._rx[self._pos:] + reply
+        else:
+            self._rx = reply
+        self._pos = 0
+        return len(data)
+
+
+class Sink(ABC):
+    '''
+    base class of the destinations of ``BatchWriter``. A sink writes a batch
+    of events of one logger at once and must be idempotent: writing an event
+    of the same logger and timestamp again replaces it
+    '''
+
+    @abstractmethod
+    def write_batch(
+            self,
+            serial_number: int,
+            events: Sequence[Tuple[Timestamp, List[float]]],
+    ) -> None:
+        '''write the events of the logger with the serial number'''
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSink(Sink):
+    '''
+    write the events to a SQLite table with one row per event keyed by
+    (serial_number, timestamp). The values are stored as a JSON array. Every
+    batch is one transaction with a single ``executemany``
+    :path str: the database file
+    :table str: the table, it is created if it does not exist
+    '''
+
+    def __init__(self, path: str, table: str = 'events') -> None:
+        if not table.isidentifier():
+            raise ValueError(f'invalid table name {table!r}')
+        self.table = table
+        # batches may be written from the thread of a ``BatchWriter``
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'serial_number INTEGER NOT NULL, '
+                'timestamp TEXT NOT NULL, '
+                'channel_values TEXT NOT NULL, '
+                'PRIMARY KEY (serial_number, timestamp))',
+            )
+
+    def write_batch(
+            self,
+            serial_number: int,
+            events: Sequence[Tuple[Timestamp, List[float]]],
+    ) -> None:
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(serial_number, timestamp, channel_values) VALUES (?, ?, ?)',
+                [
+                    (serial_number, _timestamp_str(t), json.dumps(v))
+                    for t, v in events
+                ],
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class CopyTextSink(Sink):
+    '''
+    write the events in the text format of PostgreSQL's COPY with the
+    columns serial_number, timestamp and the values as a
+    ``double precision[]``, e.g. to a file or a ``copy_expert`` stream.
+    Load it into a staging table and upsert it with a few statements:
+
+        CREATE TEMP TABLE staging (LIKE events);
+        COPY staging FROM STDIN;
+        INSERT INTO events SELECT * FROM staging
+        ON CONFLICT (serial_number, timestamp)
+        DO UPDATE SET channel_values = excluded.channel_values;
+
+    :f file: text file the rows are written to
+    '''
+
+    def __init__(self, f: IO[str]) -> None:
+        self.f = f
+
+    def write_batch(
+            self,
+            serial_number: int,
+            events: Sequence[Tuple[Timestamp, List[float]]],
+    ) -> None:
+        self.f.write(
+            ''.join(
+                f'{serial_number}\t{_copy_escape(_timestamp_str(t))}\t'
+                f'{{{",".join(_copy_float(i) for i in v)}}}\n'
+                for t, v in events
+            ),
+        )
+
+
+class BatchWriter():
+    '''
+    collect events and write them to a ``Sink`` in batches from a background
+    thread so reading the logger and writing overlap. At most max_pending
+    batches are queued, ``write`` blocks if the sink cannot keep up. After
+    an error of the sink no more batches are written and every following
+    ``write``, ``flush`` and ``close`` raises it
+
+        with BatchWriter(SQLiteSink('logs.db'), serial_number) as writer:
+            for timestamp, values in logger.iter_events(pointer=1):
+                writer.write(timestamp, values)
+
+    :sink Sink: where the events are written to
+    :serial_number int: serial number of the logger the events are from
+    :batch_size int: number of events per batch
+    :max_pending int: number of batches waiting to be written
+    '''
+
+    def __init__(
+        self,
+        sink: Sink,
+        serial_number: int,
+        batch_size: int = 500,
+        max_pending: int = 4,
+    ) -> None:
+        if batch_size < 1:
+            raise ValueError(
+                f'batch_size must be at least 1, not {batch_size}',
+            )
+        self.sink = sink
+        self.serial_number = serial_number
+        self.batch_size = batch_size
+        self.written = 0
+        self._batch: List[Tuple[Timestamp, List[float]]] = []
+        self._queue: 'queue.Queue[Optional[List[Any]]]' = queue.Queue(
+            maxsize=max_pending,
+        )
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                # keep draining so write does not block forever, the error
+                # is raised to the caller instead
+                continue
+            try:
+                self.sink.write_batch(self.serial_number, batch)
+                self.written += len(batch)
+            except BaseException as e:
+                self._error = e
+
+    def _raise(self) -> None:
+        # the error is kept so no batch is written after a gap
+        if self._error is not None:
+            raise self._error
+
+    def write(self, timestamp: Timestamp, values: List[float]) -> None:
+        self._batch.append((timestamp, values))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        '''queue the collected events even if the batch is not full'''
+        self._raise()
+        if self._batch:
+            self._queue.put(self._batch)
+            self._batch = []
+
+    def close(self) -> None:
+        '''write the remaining events and wait until all are written'''
+        try:
+            if self._thread.is_alive():
+                self.flush()
+        finally:
+            if self._thread.is_alive():
+                self._queue.put(None)
+                self._thread.join()
+        self._raise()
+
+    def __enter__(self) -> 'BatchWriter':
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def _format_addr(logger_addr: Union[str, int]) -> str:
+    logger_addr = str(logger_addr)
+    # add leading 0 if only one digit
+    if len(logger_addr) == 1:
+        logger_addr = '0' + logger_addr
+    return logger_addr
+
+
+def _atomic_write_json(path: str, obj: Any) -> None:
+    '''
+    write a new file and replace the old one so a crash can never leave a
+    half written file behind
+    '''
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _create_serial(
+    port: str,
+    baudrate: int,
+    bytesize: int,
+    parity: str,
+    stopbits: int,
+    timeout: float,
+) -> serial.Serial:
+    '''check the settings and create the serial object without opening it'''
+    BAUDRATE = (2400, 4800, 9600, 19200, 38400)
+    BYTESIZE = (5, 6, 7, 8)
+    PARITY = ('N', 'E', 'O')
+    STOPBITS = (1, 2)
+
+    # check input
+    if baudrate not in BAUDRATE:
+        raise ValueError(
+            f'baudrate must be {", ".join(str(i) for i in BAUDRATE)}'
+            f', not {baudrate}',
+        )
+    if bytesize not in BYTESIZE:
+        raise ValueError(
+            f'bytesize must be {", ".join(str(i) for i in BYTESIZE)}'
+            f', not {bytesize}',
+        )
+    if parity not in PARITY:
+        raise ValueError(
+            f'parity must be {", ".join(str(i) for i in PARITY)}'
+            f', not {parity}',
+        )
+    if stopbits not in STOPBITS:
+        raise ValueError(
+            f'stopbits must be {", ".join(str(i) for i in STOPBITS)}'
+            f', not {stopbits}',
+        )
+    if not isinstance(timeout, float):
+        raise TypeError(f'timeout must be float, not {type(timeout)}')
+
+    ser = serial.Serial()
+    ser.port = port
+    ser.baudrate = baudrate
+    ser.bytesize = bytesize
+    ser.parity = parity
+    ser.stopbits = stopbits
+    ser.timeout = timeout
+    return ser
+
+
+def _pointer_call(pointer: Union[str, int], calls: str) -> str:
+    '''
+    get the call for pointer 1 or 2 from calls e.g. "Cc" -> "C" for pointer 1
+    '''
+    if str(pointer) == '1':
+        return calls[0]
+    elif str(pointer) == '2':
+        return calls[1]
+    else:
+        raise ValueError(f'pointer must be either 1 or 2, not {pointer}')
+
+
+def _date_str(date: Union[str, datetime]) -> str:
+    '''format the date as %y%m%d%H%M%S for the logger'''
+    if isinstance(date, datetime):
+        date = date.strftime('%y%m%d%H%M%S')
+    if len(date) != 12:
+        raise ValueError(
+            f'date must have len 12, not {len(date)} '
+            'and must have the format %y%m%d%H%M%S',
+        )
+    return date
+
+
+def _rate_str(measuring_rate: int, averaging_interval: int) -> str:
+    '''format the measuring and averaging rate for the logger'''
+    if measuring_rate > 100:
+        raise ValueError('Cannot set measuring rate higher than 99')
+    if averaging_interval > 43200:
+        raise ValueError('max averaging interval rate is 43200 (12h)')
+    # bring to correct length
+    return f'{measuring_rate:02d}{averaging_interval:05d}'
+
+
+def _latin1(field: bytes) -> str:
+    return field.decode('latin-1')
+
+
+def _latin1_stripped(field: bytes) -> str:
+    return field.decode('latin-1').strip()
+
+
+# fields of the replies as (name, start, stop, conversion) with the offsets
+# into the raw reply including the leading "=". int() accepts bytes and
+# ignores surrounding whitespace and the carriage return
+_DEVICE_ID_FIELDS = (
+    ('vendor_name', 1, 11, _latin1),
+    ('model_name', 11, 18, _latin1),
+    ('hw_revision', 19, 24, _latin1),
+    ('sw_revision', 25, 29, _latin1),
+)
+_DEVICE_INFO_FIELDS = (
+    ('location', 1, 21, _latin1_stripped),
+    ('serial_number', 21, 27, int),
+    ('nr_channels', 27, None, int),
+)
+_RATE_FIELDS = (
+    ('measuring_rate', 1, 3, int),
+    ('averaging_interval', 3, 8, int),
+)
+
+
+def _parse_fields(
+        resp: bytes,
+        layout: Sequence[Tuple[str, int, Optional[int], Callable[..., Any]]],
+        fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    '''
+    convert the fields of a reply at their fixed offsets. Only the fields
+    named in fields are converted, default is all fields of the layout
+    '''
+    if fields is not None:
+        unknown = set(fields).difference(i[0] for i in layout)
+        if unknown:
+            raise ValueError(f'unknown fields: {", ".join(sorted(unknown))}')
+    return {
+        name: convert(resp[start:stop])
+        for name, start, stop, convert in layout
+        if fields is None or name in fields
+    }
+
+
+def _parse_device_id(
+        resp: bytes,
+        fields: Optional[Sequence[str]] = None,
+) -> Dict[str, str]:
+    return _parse_fields(resp, _DEVICE_ID_FIELDS, fields)
+
+
+def _parse_device_info(
+        resp: bytes,
+        fields: Optional[Sequence[str]] = None,
+) -> Dict[str, Union[str, int]]:
+    return _parse_fields(resp, _DEVICE_INFO_FIELDS, fields)
+
+
+def _check_ack(resp: bytes, message: str) -> None:
+    '''raise a ``CallNotSuccessfullError`` if the reply is not an ACK'''
+    if resp != ACK:
+        raise CallNotSuccessfullError(message)
+
+
+def _check_write_channel(resp: bytes, channel_nr: str) -> None:
+    _check_ack(
+        resp,
+        f'Unable write to channel {channel_nr}. '
+        'Did you authenticate and does the channel exist?',
+    )
+
+
+def _check_reset_channel(resp: bytes, channel_nr: str) -> None:
+    _check_ack(
+        resp,
+        f'Unable to reset channel {channel_nr}. '
+        'Did you authenticate and does the channel exist?',
+    )
+
+
+def _check_pointer_to_start(resp: bytes) -> None:
+    _check_ack(resp, 'Unable to set pointer 1. Did you authenticate?')
+
+
+def _check_pointer_to_date(resp: bytes, date: str) -> None:
+    _check_ack(
+        resp,
+        f'Unable to set pointer 1 to {date}. Did you authenticate? '
+        'has "date" the format %y%m%d%H%M%S or is a datetime.datetime'
+        ' object?',
+    )
+
+
+def _check_pointer_to_pos(resp: bytes, position: str) -> None:
+    _check_ack(
+        resp,
+        f'Unable to set pointer 1 to position {position}. '
+        'Did you authenticate?',
+    )
+
+
+def _check_set_datetime(resp: bytes, date: str) -> None:
+    _check_ack(
+        resp,
+        f'Unable to set the date to {date}. Did you authenticate?',
+    )
+
+
+def _check_set_rate(
+        resp: bytes,
+        measuring_rate: int,
+        averaging_interval: int,
+) -> None:
+    _check_ack(
+        resp,
+        f'Unable to set the rate to {measuring_rate} '
+        f'and {averaging_interval}. Did you authenticate?',
+    )
+
+
+def _check_delete_memory(resp: bytes) -> None:
+    _check_ack(
+        resp,
+        "Unable to delete the logger's storage. Did you authenticate?",
+    )
+
+
+def _check_transparent_mode(resp: bytes) -> None:
+    _check_ack(
+        resp,
+        'Unable to change the state of the transparent mode. '
+        'Did you authenticate?',
+    )
+
+
+def _parse_status_info(resp: bytes) -> Dict[str, str]:
+    info = resp.decode('latin-1')[1:]
+    status_info = {
+        'channel_status': info[:8],
+        'module_status': info[9:],
+    }
+    return status_info
+
+
+def _parse_channel_info(resp: bytes, channel_nr: str) -> Dict[str, Any]:
+    if resp == NAK or resp == b'':
+        raise ChannelNotFoundError(f'channel {channel_nr} was not found')
+    # an empty external channel is one character shorter than specified in
+    # the manual, so the fields are split at the ";" and not read at fixed
+    # positions
+    head, data, tail = resp.rstrip(b'\r').rsplit(b';', 2)
+    channel_info = {
+        'channel_type': _channel_type_to_txt(_digit(head[1:2])),
+        'channel_notation': _latin1_stripped(head[2:]),
+        'data_format': _data_format_to_txt(_digit(data[0:1])),
+        'field_length': _digit(data[1:2]),
+        'decimals': _digit(data[2:3]),
+        'unit': _latin1_stripped(data[3:]),
+        'host_input': _host_input_possible(_digit(tail[0:1])),
+        'type_of_calculation': _channel_calc_to_txt(_digit(tail[1:2])),
+    }
+    return channel_info
+
+
+def _digit(char: bytes) -> int:
+    '''a single digit of a reply or -1 if it is missing'''
+    return int(char) if char.isdigit() else -1
+
+
+def _parse_channel(resp: bytes, channel_nr: str) -> str:
+    if resp == NAK or resp == b'':
+        raise ChannelNotFoundError(f'channel {channel_nr} was not found')
+    channel = resp.decode('latin-1')[1:]
+    if channel.startswith('E'):
+        raise ChannelError(
+            f'Cannot read channel {channel_nr}, '
+            'the channel indicates an error',
+        )
+    return channel.strip()
+
+
+def _channel_value_to_float(
+        value: str,
+        info: Optional[Dict[str, Any]],
+) -> float:
+    '''
+    convert the value of a channel as returned by ``read_channel`` using its
+    channel information (see ``get_channel_info``) if it is known
+    '''
+    if info is None:
+        return float(value)
+    if info['data_format'] == 'set 8':
+        # the eight states are sent as a binary number
+        number = float(int(value, 2))
+    else:
+        number = float(value)
+    if info['decimals'] >= 0:
+        number = round(number, info['decimals'])
+    return number
+
+
+def _parse_datetime(resp: bytes) -> datetime:
+    resp_str = resp.decode('latin-1')[1:-1]
+    logger_datetime = _parse_timestamp(resp_str, time_format='datetime')
+    return logger_datetime  # type: ignore
+
+
+def _parse_rate(resp: bytes) -> Dict[str, int]:
+    return _parse_fields(resp, _RATE_FIELDS)
+
+
+def _parse_nr_events(resp: bytes) -> int:
+    return int(resp[1:])
+
+
+def _column_names(names: Sequence[str], n: int) -> List[str]:
+    '''
+    unique names of n columns of values from the channel names. The channel
+    list may be shorter e.g. without external channels
+    '''
+    columns: List[str] = []
+    for i in range(n):
+        name = names[i] if i < len(names) else f'channel_{i+1}'
+        if name in columns or name == 'timestamp':
+            name = f'{name}_{i+1}'
+        columns.append(name)
+    return columns
+
+
+def _with_progress(
+        events: Iterator[Tuple[Timestamp, List[float]]],
+        progress: Callable[[int], Any],
+) -> Generator[Tuple[Timestamp, List[float]], None, None]:
+    for n, event in enumerate(events, 1):
+        yield event
+        progress(n)
+
+
+def _write_csv(
+        f: IO[str],
+        names: Sequence[str],
+        events: Iterable[Tuple[Timestamp, List[float]]],
+        delimiter: str = ',',
+        header: bool = True,
+) -> int:
+    '''
+    write the events as csv and return the number. The header is left out
+    with ``header=False`` e.g. when appending to a file
+    '''
+    writer = csv.writer(f, delimiter=delimiter)
+    n = 0
+    for timestamp, values in events:
+        if n == 0 and header:
+            columns = _column_names(names, len(values))
+            writer.writerow(['timestamp'] + columns)
+        writer.writerow([timestamp] + values)
+        n += 1
+    if n == 0 and header:
+        writer.writerow(['timestamp'] + list(names))
+    return n
+
+
+def _write_ndjson(
+        f: IO[str],
+        names: Sequence[str],
+        events: Iterable[Tuple[Timestamp, List[float]]],
+) -> int:
+    '''write the events as newline delimited JSON and return the number'''
+    header: List[str] = []
+    n = 0
+    for timestamp, values in events:
+        if len(header) != len(values):
+            header = _column_names(names, len(values))
+        event: Dict[str, Any] = {'timestamp': timestamp}
+        event.update(zip(header, values))
+        f.write(json.dumps(event, default=str))
+        f.write('\n')
+        n += 1
+    return n
+
+
+@contextmanager
+def _open_export(
+        path: Union[str, IO[str]],
+        compress: Optional[bool],
+        append: bool = False,
+) -> Generator[IO[str], None, None]:
+    '''
+    open a file for an export with a large buffer or gzip compressed. A file
+    object is used as is and not closed. With ``append`` the file is not
+    truncated
+    '''
+    if not isinstance(path, str):
+        yield path
+        return
+    if compress is None:
+        compress = path.endswith('.gz')
+    mode = 'a' if append else 'w'
+    if compress:
+        f: IO[str] = io.TextIOWrapper(
+            gzip.GzipFile(path, f'{mode}b'), encoding='utf-8', newline='',
+        )
+    else:
+        f = open(
+            path, mode, encoding='utf-8', newline='', buffering=1 << 16,
+        )
+    with f:
+        yield f
+
+
+def _empty_column(typecode: str, size: int) -> Any:
+    '''
+    preallocate a column of size for values of the typecode ("d" for float,
+    "q" for int64) as numpy array if numpy is available or array.array
+    '''
+    if numpy is not None:
+        return numpy.zeros(size, dtype=_NUMPY_DTYPES[typecode])
+    else:
+        size_bytes = array(typecode).itemsize * size  # type: ignore
+        return array(typecode, bytes(size_bytes))
+
+
+def _channel_type_to_txt(channel_type: int) -> str:
+    CHANNEL_TYPES = {
+        0: EMPTY_CHANNEL,
+        1: 'analogue input channel (AR)',
+        2: 'arithmeic channel (AR)',
+        3: 'digital output channel (DO)',
+        4: 'digital input channel (DI)',
+        5: 'setpoint channel (VO)',
+        6: 'alarm channel (AL)',
+    }
+    try:
+        return CHANNEL_TYPES[channel_type]
+    except KeyError:
+        return 'unknown channel type'
+
+
+def _channel_calc_to_txt(calc_type: int) -> str:
+    CALC_TYPES = {
+        0: 'normal calculation of average value',
+        1: 'calculation of average value with wind direction',
+        2: 'calculation of the sum over the averaging interval',
+        3: 'continuous sum',
+        4: 'vectorial average for wind velocity',
+        5: 'vectorial average for wind direction',
+    }
+    try:
+        return CALC_TYPES[calc_type]
+    except KeyError:
+        return 'unknown calculation type'
+
+
+def _data_format_to_txt(data_format: int) -> str:
+    DATA_FORMATS = {
         0: 'no format',
         1: 'bool',
         2: 'integer',
@@ -620,7 +3017,479 @@ def _host_input_possible(host_input: int) -> Union[bool, str]:
         return 'unknown'
 
 
+def _raw_reply(resp: bytes) -> bytes:
+    return resp
+
+
+def _read_reply(ser: serial.Serial) -> bytes:
+    '''
+    read exactly one reply frame from the logger. Either a single ACK/NAK
+    byte, a data frame starting with "=" terminated by a carriage return or
+    nothing if the logger did not answer within the timeout
+    '''
+    first = ser.read(1)
+    if first in (ACK, NAK, b''):
+        return first
+    return first + ser.read_until(b'\r')
+
+
+def _frame_end(buf: bytearray) -> int:
+    '''length of the first complete reply frame in buf or 0 if incomplete'''
+    if buf[:1] in (ACK, NAK):
+        return 1
+    return buf.find(b'\r') + 1
+
+
+def _check_time_format(time_format: str) -> None:
+    if time_format not in TIME_FORMATS:
+        raise ValueError(
+            f'time_format must be {", ".join(TIME_FORMATS)}'
+            f', not {time_format}',
+        )
+
+
+@lru_cache(maxsize=64)
+def _parse_date_part(yymmdd: str) -> Tuple[date, str, int]:
+    '''
+    parse the date part of a timestamp. Consecutive events share the date
+    so this is cached. Returns the date, its str and the days since epoch
+    '''
+    yy = int(yymmdd[0:2])
+    # same pivot as strptime's %y
+    year = 2000 + yy if yy < 69 else 1900 + yy
+    day = date(year, int(yymmdd[2:4]), int(yymmdd[4:6]))
+    return day, str(day), day.toordinal() - _EPOCH_ORDINAL
+
+
+def _parse_timestamp(timestamp: str, time_format: str = 'str') -> Timestamp:
+    '''
+    parse the logger's fixed width timestamp with the format %y%m%d%H%M%S
+    much faster than datetime.strptime
+    :time_format str: return a str e.g. "2020-09-04 17:20:00", a "datetime"
+        or the seconds since epoch as int ("epoch")
+    '''
+    if len(timestamp) != 12 or not timestamp.isdecimal():
+        raise ValueError(
+            f'time data {timestamp!r} does not match format %y%m%d%H%M%S',
+        )
+    day, day_str, days = _parse_date_part(timestamp[:6])
+    hour = int(timestamp[6:8])
+    minute = int(timestamp[8:10])
+    second = int(timestamp[10:12])
+    if hour > 23 or minute > 59 or second > 59:
+        raise ValueError(f'time data {timestamp!r} is not a valid time')
+    if time_format == 'str':
+        return (
+            f'{day_str} {timestamp[6:8]}:{timestamp[8:10]}:{timestamp[10:12]}'
+        )
+    elif time_format == 'epoch':
+        return days * 86400 + hour * 3600 + minute * 60 + second
+    _check_time_format(time_format)
+    return datetime(day.year, day.month, day.day, hour, minute, second)
+
+
+def _to_epoch(timestamp: datetime) -> int:
+    '''seconds since epoch of a naive datetime in the logger's time'''
+    return int((timestamp - datetime(1970, 1, 1)).total_seconds())
+
+
+def _from_epoch(seconds: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=seconds)
+
+
+def _format_epoch(seconds: int, time_format: str) -> Timestamp:
+    '''a timestamp in seconds since epoch in the time_format'''
+    if time_format == 'epoch':
+        return seconds
+    timestamp = _from_epoch(seconds)
+    return timestamp if time_format == 'datetime' else str(timestamp)
+
+
+def _group_windows(
+        windows: Sequence[Tuple[datetime, datetime]],
+        max_gap: timedelta,
+) -> List[List[Tuple[datetime, datetime]]]:
+    '''
+    sort the windows and group the ones with at most max_gap in between.
+    Overlapping windows are joined
+    '''
+    groups: List[List[Tuple[datetime, datetime]]] = []
+    for start, end in sorted(windows):
+        if groups and start - groups[-1][-1][1] <= max_gap:
+            last_start, last_end = groups[-1][-1]
+            if start <= last_end:
+                groups[-1][-1] = (last_start, max(end, last_end))
+            else:
+                groups[-1].append((start, end))
+        else:
+            groups.append([(start, end)])
+    return groups
+
+
+def _timestamp_str(timestamp: Timestamp) -> str:
+    '''a timestamp of any time_format as str e.g. "2020-09-04 17:20:00"'''
+    if isinstance(timestamp, str):
+        return timestamp
+    elif isinstance(timestamp, int):
+        timestamp = _from_epoch(timestamp)
+    return str(timestamp)
+
+
+def _copy_escape(value: str) -> str:
+    '''escape a value for the text format of COPY'''
+    return value.translate(_COPY_ESCAPES)
+
+
+def _copy_float(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    elif value in (float('inf'), float('-inf')):
+        return 'Infinity' if value > 0 else '-Infinity'
+    return repr(value)
+
+
+def _parse_event(
+    resp: bytes,
+    time_format: str = 'str',
+    digits: Union[int, Sequence[int]] = 2,
+) -> Dict[Timestamp, List[float]]:
+    '''
+    parse the reply to an E/e or F/f call into {timestamp: values}. The reply
+    is "=", one char, the timestamp, ";" and one hex value followed by ";"
+    per channel. Only the timestamp is decoded to a str, the values are
+    converted from IEE Std 754 Short Real Format straight from the bytes
+    and rounded to the digits (see ``_row_digits``)
+    '''
+    if len(resp) > 3:
+        timestamp, hexvals = _split_event(resp, time_format)
+        raw = unhexlify(hexvals)
+        values = _float_struct(len(raw) // 4).unpack(raw)
+        row = _row_digits(digits, len(values))
+        return {timestamp: [round(v, d) for v, d in zip(values, row)]}
+    else:
+        return {}
+
+
+def _parse_events(
+    resps: Iterable[bytes],
+    time_format: str = 'str',
+    digits: Union[int, Sequence[int]] = 2,
+) -> Tuple[List[Timestamp], 'array[float]']:
+    '''
+    parse many replies to E/e calls at once (see ``_parse_event``). The
+    values of all events are decoded with one unhexlify and one unpack into
+    a flat array of doubles with one row per event, so value j of event i
+    is at ``i * nr_channels + j``. Replies without an event are skipped
+    '''
+    timestamps: List[Timestamp] = []
+    payload: List[bytes] = []
+    for resp in resps:
+        if len(resp) <= 3:
+            continue
+        timestamp, hexvals = _split_event(resp, time_format)
+        if payload and len(hexvals) != len(payload[0]):
+            raise ValueError(
+                'all events must have the same number of channels',
+            )
+        timestamps.append(timestamp)
+        payload.append(hexvals)
+    raw = unhexlify(b''.join(payload))
+    values = _float_struct(len(raw) // 4).unpack(raw)
+    nr_channels = len(payload[0]) // 8 if payload else 0
+    row = _row_digits(digits, nr_channels)
+    return timestamps, array(
+        'd', [round(v, d) for v, d in zip(values, cycle(row))],
+    )
+
+
+def _split_event(resp: bytes, time_format: str) -> Tuple[Timestamp, bytes]:
+    '''the timestamp and the hex values without separators of an event'''
+    if resp[_EVENT_VALUES - 1:_EVENT_VALUES] != b';':
+        raise ValueError(f'invalid event {resp!r}')
+    timestamp = _parse_timestamp(
+        resp[2:_EVENT_VALUES - 1].decode('latin-1'), time_format,
+    )
+    end = -1 if resp[-1:] == b'\r' else len(resp)
+    hexvals = resp[_EVENT_VALUES:end].translate(None, b';')
+    if len(hexvals) % 8:
+        raise ValueError(f'invalid event {resp!r}')
+    return timestamp, hexvals
+
+
+def _row_digits(
+    digits: Union[int, Sequence[int]],
+    nr_channels: int,
+) -> List[int]:
+    '''
+    the digits to round each value of an event to. Digits are either one
+    number for all channels or one per channel (e.g. the "decimals" from
+    ``get_channels``), channels without digits are rounded to 2 digits
+    '''
+    if isinstance(digits, int):
+        return [digits] * nr_channels
+    row = list(digits[:nr_channels])
+    return row + [2] * (nr_channels - len(row))
+
+
 def _hexIEE_to_dec(hexval: str, digits: int = 2) -> float:
     '''decode the data read from the logger's storage drive'''
     dec = round(unpack('!f', bytes.fromhex(hexval))[0], digits)
     return dec
+
+
+@lru_cache(maxsize=128)
+def _float_struct(n: int) -> Struct:
+    '''precompiled struct for n big-endian IEEE 754 short real values'''
+    return Struct(f'!{n}f')
+
+
+class _Progress():
+    '''
+    print the number of events read, the events per second and the
+    estimated time left at most every interval seconds to the stream
+    '''
+
+    def __init__(
+            self,
+            stream: Optional[IO[str]] = None,
+            interval: float = 0.5,
+    ) -> None:
+        self.stream = sys.stderr if stream is None else stream
+        self.interval = interval
+        self.start = time.monotonic()
+        self._next = self.start + interval
+        self._n = 0
+        self._total = 0
+
+    def __call__(self, n: int, total: int) -> None:
+        self._n, self._total = n, total
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            self._print(now)
+
+    def _print(self, now: float, end: str = '') -> None:
+        elapsed = now - self.start
+        rate = self._n / elapsed if elapsed > 0 else 0.0
+        eta = (self._total - self._n) / rate if rate > 0 else 0.0
+        self.stream.write(
+            f'\r{self._n}/{self._total} events {rate:.1f} events/s '
+            f'ETA {int(eta) // 60:02d}:{int(eta) % 60:02d}{end}',
+        )
+        self.stream.flush()
+
+    def done(self) -> None:
+        self._print(time.monotonic(), end='\n')
+
+
+def _cli_logger(args: argparse.Namespace) -> Combilog:
+    logger = Combilog(
+        logger_addr=args.addr,
+        port=args.port,
+        baudrate=args.baudrate,
+        bytesize=args.bytesize,
+        parity=args.parity,
+        stopbits=args.stopbits,
+        timeout=args.timeout,
+        retry=RetryPolicy(attempts=args.retries + 1),
+        channels=read_program(args.program) if args.program else None,
+    )
+    if args.passwd is not None and not logger.authenticate(args.passwd):
+        raise CallNotSuccessfullError('Unable to authenticate')
+    return logger
+
+
+def _cli_info(logger: Combilog, args: argparse.Namespace) -> None:
+    with logger:
+        info = {
+            'device_id': logger.device_id(),
+            'device_info': logger.device_info(),
+            'status_info': logger.status_info(),
+            'rate': logger.get_rate(),
+            'datetime': str(logger.read_datetime()),
+            'nr_events': logger.get_nr_events(),
+            'channels': logger.get_channels(),
+        }
+    json.dump(info, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+def _cli_download(logger: Combilog, args: argparse.Namespace) -> None:
+    path = sys.stdout if args.output == '-' else args.output
+    progress = None if args.quiet else _Progress()
+    with logger:
+        if args.from_start:
+            logger.pointer_to_start(args.pointer)
+        if args.format == 'csv':
+            logger.export_csv(
+                path, args.pointer, args.time_format, progress=progress,
+                prefetch=args.prefetch,
+            )
+        else:
+            logger.export_ndjson(
+                path, args.pointer, args.time_format, progress=progress,
+                prefetch=args.prefetch,
+            )
+    if progress is not None:
+        progress.done()
+
+
+def _cli_sync(logger: Combilog, args: argparse.Namespace) -> None:
+    sync = IncrementalSync(
+        logger,
+        CheckpointStore(args.checkpoints),
+        pointer=args.pointer,
+        max_events=args.max_events,
+        time_format=args.time_format,
+    )
+    path = sys.stdout if args.output == '-' else args.output
+    with logger:
+        names = logger._export_names()
+        batch = sync.fetch()
+    if batch.events:
+        # every run appends its batch, the checkpoint moves on after it
+        header = not isinstance(path, str) or not os.path.exists(path) or \
+            os.path.getsize(path) == 0
+        with _open_export(path, None, append=True) as f:
+            if args.format == 'csv':
+                _write_csv(f, names, batch.events, header=header)
+            else:
+                _write_ndjson(f, names, batch.events)
+    # only acknowledge the events once they were written
+    sync.commit(batch)
+    if not args.quiet:
+        print(f'{len(batch.events)} new events', file=sys.stderr)
+
+
+def _cli_live(logger: Combilog, args: argparse.Namespace) -> None:
+    scheduler = Scheduler(
+        logger,
+        channel_list=args.channels,
+        read_events=False,
+        delay=args.delay,
+    )
+    writer = csv.writer(sys.stdout)
+    for n, tick in enumerate(scheduler, 1):
+        if tick.missed:
+            print(
+                f'missed {tick.missed} measurements before {tick.scheduled}',
+                file=sys.stderr,
+            )
+        values = {k: v.value for k, v in tick.values.items()}
+        if args.format == 'csv':
+            if n == 1:
+                writer.writerow(['timestamp'] + list(values))
+            writer.writerow([tick.scheduled] + list(values.values()))
+        else:
+            event: Dict[str, Any] = {'timestamp': tick.scheduled}
+            event.update(values)
+            sys.stdout.write(json.dumps(event, default=str) + '\n')
+        sys.stdout.flush()
+        if args.count is not None and n >= args.count:
+            break
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    '''
+    command line interface. Returns 1 on protocol errors and 3 if the port
+    cannot be used
+    '''
+    parser = argparse.ArgumentParser(
+        prog='combilog',
+        description='interact with a combilog datalogger',
+    )
+    parser.add_argument('-p', '--port', required=True, help='e.g. com3')
+    parser.add_argument('-a', '--addr', default='01', help='logger address')
+    parser.add_argument('--baudrate', type=int, default=9600)
+    parser.add_argument('--bytesize', type=int, default=8)
+    parser.add_argument('--parity', default='N')
+    parser.add_argument('--stopbits', type=int, default=1)
+    parser.add_argument('--timeout', type=float, default=1.0)
+    parser.add_argument(
+        '--retries', type=int, default=2,
+        help='retries of a command without a (complete) reply',
+    )
+    parser.add_argument('--passwd', help='authenticate with the password')
+    parser.add_argument(
+        '--program', help='read the channels from the .PRO file',
+    )
+    parser.add_argument(
+        '-q', '--quiet', action='store_true', help='no progress output',
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    subparsers.add_parser('info', help='print the logger information')
+
+    def add_output(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument(
+            '-o', '--output', default='-',
+            help='file, ".gz" is compressed, default is stdout',
+        )
+        subparser.add_argument(
+            '-f', '--format', choices=('csv', 'ndjson'), default='csv',
+        )
+        subparser.add_argument(
+            '--time-format', choices=TIME_FORMATS, default='str',
+        )
+        subparser.add_argument('--pointer', choices=('1', '2'), default='1')
+
+    download = subparsers.add_parser('download', help='download the events')
+    add_output(download)
+    download.add_argument(
+        '--from-start', action='store_true',
+        help='set the pointer to the start of the memory first',
+    )
+    download.add_argument(
+        '--prefetch', type=int, default=16,
+        help='events read ahead while writing, 0 to read one by one',
+    )
+
+    sync = subparsers.add_parser(
+        'sync',
+        help='download the events since the last sync, a file is appended to',
+    )
+    add_output(sync)
+    sync.add_argument(
+        '--checkpoints', required=True, help='JSON file of the checkpoints',
+    )
+    sync.add_argument('--max-events', type=int)
+
+    live = subparsers.add_parser(
+        'live', help='read the channels at the measuring rate',
+    )
+    live.add_argument('--channels', nargs='+', help='default is all')
+    live.add_argument(
+        '-f', '--format', choices=('csv', 'ndjson'), default='csv',
+    )
+    live.add_argument('-n', '--count', type=int, help='number of reads')
+    live.add_argument('--delay', type=float, default=1.0)
+
+    args = parser.parse_args(argv)
+    commands: Dict[
+        str, Callable[[Combilog, argparse.Namespace], None],
+    ] = {
+        'info': _cli_info,
+        'download': _cli_download,
+        'sync': _cli_sync,
+        'live': _cli_live,
+    }
+    try:
+        logger = _cli_logger(args)
+        commands[args.command](logger, args)
+    except (
+        CallNotSuccessfullError, ChannelError, ChannelNotFoundError,
+        ValueError,
+    ) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    except serial.SerialException as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 3
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
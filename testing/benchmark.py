@@ -0,0 +1,193 @@
+'''
+benchmark the download throughput and the latency of single commands
+against the emulator so changes can be compared without a logger.
+
+    python -m testing.benchmark --output benchmark.json
+
+The results are written as JSON to track regressions across releases.
+'''
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import combilog
+from combilog import Combilog
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+from testing.emulator import synthetic_events
+
+BAUDRATES = (2400, 4800, 9600, 19200, 38400)
+SIZES = (10, 50)
+FULL_SPEED_SIZES = (1000, 10000)
+
+
+def _percentile(values: Sequence[float], percent: float) -> float:
+    '''nearest-rank percentile'''
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+class _DecodeTimer():
+    '''measure the time spent in ``combilog._parse_event``'''
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self._parse_event = combilog._parse_event
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self._parse_event(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def __enter__(self) -> '_DecodeTimer':
+        combilog._parse_event = self  # type: ignore
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        combilog._parse_event = self._parse_event  # type: ignore
+
+
+def bench_download(
+        nr_events: int,
+        baudrate: int,
+        realtime: bool = True,
+        nr_channels: int = 18,
+) -> Dict[str, Any]:
+    '''time a full ``read_logger`` and split it into decoding and I/O'''
+    emulator = Emulator(
+        memory=synthetic_events(nr_events, nr_channels=nr_channels),
+        baudrate=baudrate,
+        realtime=realtime,
+    )
+    logger = emulated_logger(emulator)
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    with _DecodeTimer() as decode:
+        logs = logger.read_logger(pointer=1)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+    nr_read = len(logs)  # type: ignore
+    assert nr_read == nr_events, f'read {nr_read} of {nr_events}'
+    return {
+        'nr_events': nr_events,
+        'nr_channels': nr_channels,
+        'baudrate': baudrate,
+        'realtime': realtime,
+        'seconds': wall,
+        'events_per_second': nr_events / wall,
+        'cpu_seconds': cpu,
+        'decode_seconds': decode.seconds,
+        'io_seconds': wall - decode.seconds,
+    }
+
+
+def bench_latency(
+        logger: Combilog,
+        call: Callable[[], Any],
+        repeat: int,
+) -> Dict[str, float]:
+    '''p50 and p99 latency of a single command in seconds'''
+    latencies = []
+    with logger:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+    return {
+        'p50': statistics.median(latencies),
+        'p99': _percentile(latencies, 99),
+        'mean': statistics.mean(latencies),
+        'repeat': repeat,
+    }
+
+
+def bench_commands(baudrate: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    emulator = Emulator(
+        memory=synthetic_events(repeat + 1),
+        baudrate=baudrate,
+    )
+    logger = emulated_logger(emulator)
+    date = datetime(2020, 9, 4, 17, 20)
+    return {
+        'read_event': bench_latency(
+            logger, lambda: logger.read_event(pointer=1), repeat,
+        ),
+        'read_channel': bench_latency(
+            logger, lambda: logger.read_channel('01'), repeat,
+        ),
+        'get_channel_info': bench_latency(
+            logger, lambda: logger.get_channel_info('01'), repeat,
+        ),
+        'pointer_to_date': bench_latency(
+            logger, lambda: logger.pointer_to_date(1, date), repeat,
+        ),
+    }
+
+
+def run(
+        baudrates: Sequence[int] = BAUDRATES,
+        sizes: Sequence[int] = SIZES,
+        full_speed_sizes: Sequence[int] = FULL_SPEED_SIZES,
+        repeat: int = 20,
+) -> Dict[str, Any]:
+    download: List[Dict[str, Any]] = []
+    for baudrate in baudrates:
+        for size in sizes:
+            download.append(bench_download(size, baudrate))
+    # without the time on the wire only the CPU time is left
+    for size in full_speed_sizes:
+        download.append(bench_download(size, 9600, realtime=False))
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'download': download,
+        'latency': {
+            str(baudrate): bench_commands(baudrate, repeat)
+            for baudrate in baudrates
+        },
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--baudrates', type=int, nargs='+', default=BAUDRATES,
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument(
+        '--full-speed-sizes', type=int, nargs='*', default=FULL_SPEED_SIZES,
+    )
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='JSON file, default is stdout')
+    args = parser.parse_args(argv)
+    results = run(
+        baudrates=args.baudrates,
+        sizes=args.sizes,
+        full_speed_sizes=args.full_speed_sizes,
+        repeat=args.repeat,
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,538 @@
+'''
+emulator of a combilog speaking the ASCII protocol used by ``Combilog`` so
+the package can be tested and benchmarked without a logger connected.
+
+The emulator can be reached in process via ``EmulatorSerial`` (a pyserial
+``loop://`` port answered by the emulator) or via ``PtyServer`` which serves
+it on a Linux pseudo-terminal that can be opened like a real port.
+
+    emulator = Emulator(memory=synthetic_events(nr_events=1000))
+    logger = emulated_logger(emulator)
+    logs = logger.read_logger(pointer=1)
+'''
+import math
+import os
+import random
+import select
+import threading
+import time
+from datetime import datetime
+from datetime import timedelta
+from struct import pack
+from types import TracebackType
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Type
+from typing import Union
+
+from serial import PortNotOpenError
+from serial.urlhandler import protocol_loop
+
+from combilog import ACK
+from combilog import Combilog
+from combilog import NAK
+
+Event = Tuple[datetime, List[float]]
+
+FAULTS = ('drop', 'nak', 'truncate', 'garble')
+# commands which need a previous authentication
+AUTH_REQUIRED = ('W', 'D', 'G', 'Y', 'T')
+
+
+class EmulatedChannel(NamedTuple):
+    notation: str
+    unit: str = ''
+    decimals: int = 2
+    channel_type: int = 1
+    data_format: int = 3
+    field_length: int = 4
+    host_input: int = 1
+    type_of_calculation: int = 0
+    value: float = 0.0
+    error: bool = False
+
+
+def synthetic_channels(nr_channels: int) -> Dict[str, EmulatedChannel]:
+    '''internal channels "01" to "19" followed by external channels "80"...'''
+    numbers = [f'{i:02d}' for i in range(1, 20)]
+    numbers += [f'{i:02X}' for i in range(0x80, 0xBC)]
+    if nr_channels > len(numbers):
+        raise ValueError(f'cannot emulate more than {len(numbers)} channels')
+    return {
+        nr: EmulatedChannel(
+            notation=f'Channel{nr}',
+            unit='°C',
+            decimals=1,
+            value=float(i),
+        )
+        for i, nr in enumerate(numbers[:nr_channels])
+    }
+
+
+def synthetic_events(
+        nr_events: int,
+        nr_channels: int = 18,
+        start: datetime = datetime(2020, 9, 4, 17, 20),
+        interval: int = 30,
+) -> List[Event]:
+    '''
+    create a deterministic memory of nr_events bookings every interval
+    seconds with nr_channels values each
+    '''
+    events = []
+    for i in range(nr_events):
+        values = [
+            round(10 * math.sin(i / 100 + j) + j, 2)
+            for j in range(nr_channels)
+        ]
+        events.append((start + timedelta(seconds=i * interval), values))
+    return events
+
+
+class Emulator():
+    '''
+    state and protocol handling of an emulated logger
+    :logger_addr str|int: address the emulator answers to
+    :memory list: bookings as (datetime, values) e.g. from
+        ``synthetic_events`` or recorded via ``Combilog.iter_events``
+    :channels dict: channel number -> ``EmulatedChannel``
+    :passwd str: password needed to authenticate
+    :baudrate int: baudrate used to calculate the time on the wire
+    :realtime bool: sleep for the time the telegram and the reply need on the
+        wire at the baudrate. False answers at full speed
+    :latency float: seconds the logger needs before it starts to reply
+    :faults dict: probability per reply of a fault from ``FAULTS``
+        "drop": no reply, "nak": NAK instead of the reply,
+        "truncate": the reply is cut and misses the carriage return,
+        "garble": a character of the reply is changed
+    :seed int: seed for the random fault injection
+    '''
+
+    def __init__(
+            self,
+            logger_addr: Union[str, int] = 1,
+            memory: Optional[Sequence[Event]] = None,
+            channels: Optional[Dict[str, EmulatedChannel]] = None,
+            passwd: str = '12345678',
+            baudrate: int = 9600,
+            bytesize: int = 8,
+            parity: str = 'N',
+            stopbits: int = 1,
+            realtime: bool = True,
+            latency: float = 0.0,
+            faults: Optional[Dict[str, float]] = None,
+            seed: int = 0,
+    ) -> None:
+        self.logger_addr = f'{int(logger_addr):02d}'
+        self.memory = list(memory) if memory is not None else []
+        if channels is None:
+            nr_channels = len(self.memory[0][1]) if self.memory else 18
+            channels = synthetic_channels(nr_channels)
+        self.channels = channels
+        self.passwd = passwd
+        self.vendor_name = 'Friedrichs'
+        self.model_name = 'COM1020'
+        self.hw_revision = 'V4.01'
+        self.sw_revision = '2.26'
+        self.location = 'Emulator'
+        self.serial_number = 100005
+        self.measuring_rate = 5
+        self.averaging_interval = 30
+        self.clock_offset = timedelta(0)
+        self.authenticated = False
+        self.pointers = {1: 0, 2: 0}
+        self.baudrate = baudrate
+        self.bits_per_byte = 1 + bytesize + (parity != 'N') + stopbits
+        self.realtime = realtime
+        self.latency = latency
+        self.faults = faults or {}
+        for fault in self.faults:
+            if fault not in FAULTS:
+                raise ValueError(
+                    f'fault must be {", ".join(FAULTS)}, not {fault}',
+                )
+        self._random = random.Random(seed)
+        self._forced_faults: List[str] = []
+        self.lock = threading.Lock()
+        self.telegrams = 0
+
+    def inject(self, fault: str, n: int = 1) -> None:
+        '''let the next n replies fail with the fault'''
+        if fault not in FAULTS:
+            raise ValueError(f'fault must be {", ".join(FAULTS)}, not {fault}')
+        self._forced_faults.extend([fault] * n)
+
+    def add_event(
+            self,
+            values: Sequence[float],
+            timestamp: Optional[datetime] = None,
+    ) -> None:
+        '''book a new event, by default at the time of the logger's clock'''
+        if timestamp is None:
+            timestamp = self.now().replace(microsecond=0)
+        self.memory.append((timestamp, list(values)))
+
+    def now(self) -> datetime:
+        return datetime.now() + self.clock_offset
+
+    def wire_time(self, nr_bytes: int) -> float:
+        '''seconds nr_bytes need to be transmitted at the baudrate'''
+        return nr_bytes * self.bits_per_byte / self.baudrate
+
+    def reply_delay(self, telegram: bytes, reply: bytes) -> float:
+        '''seconds from sending the telegram until the reply is received'''
+        if not self.realtime:
+            return self.latency
+        return self.wire_time(len(telegram) + len(reply)) + self.latency
+
+    def handle(self, telegram: bytes) -> bytes:
+        '''
+        answer a telegram e.g. b"$01V\\r". Telegrams to a different address
+        are not answered.
+        '''
+        with self.lock:
+            self.telegrams += 1
+            msg = telegram.decode('latin-1').rstrip('\r')
+            if not msg.startswith('$') or msg[1:3] != self.logger_addr:
+                return b''
+            reply = self._dispatch(msg[3:4], msg[4:])
+            return self._apply_fault(reply)
+
+    def _apply_fault(self, reply: bytes) -> bytes:
+        if self._forced_faults:
+            fault: Optional[str] = self._forced_faults.pop(0)
+        else:
+            fault = None
+            for name, probability in self.faults.items():
+                if self._random.random() < probability:
+                    fault = name
+                    break
+        if fault is None:
+            return reply
+        elif fault == 'drop':
+            return b''
+        elif fault == 'nak':
+            return NAK
+        elif fault == 'truncate':
+            return reply[:len(reply) // 2]
+        else:
+            if len(reply) < 3:
+                return reply
+            pos = self._random.randrange(1, len(reply) - 1)
+            return reply[:pos] + b'#' + reply[pos + 1:]
+
+    def _dispatch(self, command: str, args: str) -> bytes:
+        if command in AUTH_REQUIRED and not self.authenticated:
+            return NAK
+        try:
+            handler = getattr(self, f'_cmd_{COMMANDS[command]}')
+        except KeyError:
+            return NAK
+        try:
+            return handler(command, args)
+        except (ValueError, KeyError):
+            return NAK
+
+    @staticmethod
+    def _data(data: str) -> bytes:
+        return f'={data}\r'.encode('latin-1')
+
+    def _cmd_authenticate(self, command: str, args: str) -> bytes:
+        self.authenticated = args == self.passwd
+        return ACK if self.authenticated else NAK
+
+    def _cmd_device_id(self, command: str, args: str) -> bytes:
+        return self._data(
+            f'{self.vendor_name:<10.10}{self.model_name:<7.7} '
+            f'{self.hw_revision:<5.5} {self.sw_revision:<4.4}',
+        )
+
+    def _cmd_device_info(self, command: str, args: str) -> bytes:
+        return self._data(
+            f'{self.location:<20.20}{self.serial_number:06d}'
+            f'{self.nr_channels:>3}',
+        )
+
+    def _cmd_status_info(self, command: str, args: str) -> bytes:
+        status = ''.join(
+            '1' if i.error else '0' for i in list(self.channels.values())[:8]
+        )
+        return self._data(f'{status:0<8};000')
+
+    @property
+    def nr_channels(self) -> int:
+        '''number of configured i.e. not empty channels'''
+        return sum(i.channel_type != 0 for i in self.channels.values())
+
+    def _cmd_channel_info(self, command: str, args: str) -> bytes:
+        if args not in self.channels and 0x80 <= int(args, 16) < 0xBC:
+            # external channels without a module answer as empty channels
+            channel = EmulatedChannel(notation='', channel_type=0)
+        else:
+            channel = self.channels[args]
+        info = (
+            f'{channel.channel_type}{channel.notation:<19.19};'
+            f'{channel.data_format}{channel.field_length}{channel.decimals}'
+            f'{channel.unit:<5.5};{channel.host_input}'
+            f'{channel.type_of_calculation}'
+        )
+        if channel.channel_type == 0 and int(args, 16) >= 0x80:
+            # empty external channels are one character shorter
+            info = info[:-1]
+        return self._data(info)
+
+    def _cmd_read_channel(self, command: str, args: str) -> bytes:
+        channel = self.channels[args]
+        if channel.error:
+            return self._data('E' + ' ' * channel.field_length)
+        return self._data(f'{channel.value:.{channel.decimals}f}')
+
+    def _cmd_write_channel(self, command: str, args: str) -> bytes:
+        channel = self.channels[args[:2]]
+        if channel.host_input != 0:
+            return NAK
+        self.channels[args[:2]] = channel._replace(value=float(args[2:]))
+        return ACK
+
+    def _cmd_reset_channel(self, command: str, args: str) -> bytes:
+        self.channels[args]
+        return ACK
+
+    def _cmd_set_pointer(self, command: str, args: str) -> bytes:
+        pointer = 1 if command == 'C' else 2
+        if args == '':
+            self.pointers[pointer] = 0
+        elif args == '.ALL':
+            if not self.authenticated:
+                return NAK
+            self.memory.clear()
+            self.pointers = {1: 0, 2: 0}
+        elif len(args) == 12:
+            date = datetime.strptime(args, '%y%m%d%H%M%S')
+            pos = 0
+            while pos < len(self.memory) and self.memory[pos][0] < date:
+                pos += 1
+            self.pointers[pointer] = pos
+        else:
+            self.pointers[pointer] = min(int(args), len(self.memory))
+        return ACK
+
+    def _event(self, pos: int) -> bytes:
+        if not 0 <= pos < len(self.memory):
+            return self._data('')
+        timestamp, values = self.memory[pos]
+        payload = ''.join(f'{pack("!f", i).hex().upper()};' for i in values)
+        return self._data(f'1{timestamp:%y%m%d%H%M%S};{payload}')
+
+    def _cmd_read_event(self, command: str, args: str) -> bytes:
+        pointer = 1 if command == 'E' else 2
+        pos = self.pointers[pointer]
+        self.pointers[pointer] = min(pos + 1, len(self.memory))
+        return self._event(pos)
+
+    def _cmd_repeat_read_event(self, command: str, args: str) -> bytes:
+        pointer = 1 if command == 'F' else 2
+        return self._event(self.pointers[pointer] - 1)
+
+    def _cmd_nr_events(self, command: str, args: str) -> bytes:
+        pointer = 1 if command == 'N' else 2
+        return self._data(str(len(self.memory) - self.pointers[pointer]))
+
+    def _cmd_set_datetime(self, command: str, args: str) -> bytes:
+        date = datetime.strptime(args, '%y%m%d%H%M%S')
+        self.clock_offset = date - datetime.now()
+        return ACK
+
+    def _cmd_read_datetime(self, command: str, args: str) -> bytes:
+        return self._data(f'{self.now():%y%m%d%H%M%S}')
+
+    def _cmd_get_rate(self, command: str, args: str) -> bytes:
+        return self._data(
+            f'{self.measuring_rate:02d}{self.averaging_interval:05d}',
+        )
+
+    def _cmd_set_rate(self, command: str, args: str) -> bytes:
+        if len(args) != 7:
+            return NAK
+        self.measuring_rate = int(args[:2])
+        self.averaging_interval = int(args[2:])
+        return ACK
+
+    def _cmd_transparent_mode(self, command: str, args: str) -> bytes:
+        return ACK if args in ('1', '2') else NAK
+
+
+COMMANDS = {
+    'P': 'authenticate',
+    'V': 'device_id',
+    'S': 'device_info',
+    'Z': 'status_info',
+    'B': 'channel_info',
+    'R': 'read_channel',
+    'W': 'write_channel',
+    'D': 'reset_channel',
+    'C': 'set_pointer',
+    'c': 'set_pointer',
+    'E': 'read_event',
+    'e': 'read_event',
+    'F': 'repeat_read_event',
+    'f': 'repeat_read_event',
+    'N': 'nr_events',
+    'n': 'nr_events',
+    'G': 'set_datetime',
+    'H': 'read_datetime',
+    'X': 'get_rate',
+    'Y': 'set_rate',
+    'T': 'transparent_mode',
+}
+
+
+def _answer(emulators: Sequence[Emulator], telegram: bytes) -> bytes:
+    '''
+    let the emulator with the telegram's address answer after the delay.
+    Without an answer the telegram still needs its time on the wire
+    '''
+    reply = b''
+    for emulator in emulators:
+        reply = emulator.handle(telegram)
+        if reply:
+            break
+    delay = emulator.reply_delay(telegram, reply)
+    if delay:
+        time.sleep(delay)
+    return reply
+
+
+class EmulatorSerial(protocol_loop.Serial):
+    '''
+    in process serial port (pyserial's ``loop://``) answered by one or more
+    emulators sharing the line like loggers on a RS-485 bus. The replies are
+    buffered instead of being queued byte by byte so the port itself costs
+    as little CPU time as possible. Reading more than was replied waits for
+    the timeout like a real port
+    '''
+
+    def __init__(self, *emulators: Emulator, **kwargs: Any) -> None:
+        self.emulators = emulators
+        self.nr_opened = 0
+        self._telegram = bytearray()
+        self._rx = bytearray()
+        kwargs.setdefault('timeout', 1.0)
+        # like serial.Serial() the port is not opened on creation
+        super().__init__(None, **kwargs)
+        self.port = 'loop://'
+
+    def open(self) -> None:
+        super().open()
+        self.nr_opened += 1
+        self._telegram.clear()
+        self._rx.clear()
+
+    @property
+    def in_waiting(self) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError()
+        if len(self._rx) < size and self.timeout:
+            # nothing else will arrive
+            time.sleep(self.timeout)
+        data = bytes(self._rx[:size])
+        del self._rx[:size]
+        return data
+
+    def reset_input_buffer(self) -> None:
+        self._rx.clear()
+
+    def write(self, data: Any) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        self._telegram += data
+        while b'\r' in self._telegram:
+            end = self._telegram.index(b'\r') + 1
+            telegram = bytes(self._telegram[:end])
+            del self._telegram[:end]
+            self._rx += _answer(self.emulators, telegram)
+        return len(data)
+
+
+def emulated_logger(emulator: Emulator, **kwargs: Any) -> Combilog:
+    '''
+    create a ``Combilog`` talking to the emulator via ``EmulatorSerial`` with
+    the emulator's address and baudrate
+    '''
+    kwargs.setdefault('baudrate', emulator.baudrate)
+    logger = Combilog(
+        logger_addr=emulator.logger_addr,
+        port='loop://',
+        **kwargs,
+    )
+    settings = logger.ser.get_settings()
+    logger.ser = EmulatorSerial(emulator)  # type: ignore
+    logger.ser.apply_settings(settings)
+    return logger
+
+
+class PtyServer():
+    '''
+    serve an emulator on a Linux pseudo-terminal. ``port`` can be passed to
+    ``Combilog`` like a real port e.g. /dev/pts/3
+
+        with PtyServer(Emulator()) as port:
+            logger = Combilog(logger_addr=1, port=port)
+    '''
+
+    def __init__(self, *emulators: Emulator) -> None:
+        self.emulators = emulators
+        import tty  # posix only
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self) -> str:
+        self._thread.start()
+        return self.port
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(
+            self,
+            exc_type: Optional[Type[BaseException]],
+            exc_value: Optional[BaseException],
+            traceback: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def _serve(self) -> None:
+        telegram = bytearray()
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            telegram += os.read(self._master, 4096)
+            while b'\r' in telegram:
+                end = telegram.index(b'\r') + 1
+                self._answer(bytes(telegram[:end]))
+                del telegram[:end]
+
+    def _answer(self, telegram: bytes) -> None:
+        reply = _answer(self.emulators, telegram)
+        if reply:
+            os.write(self._master, reply)
@@ -0,0 +1,153 @@
+import asyncio
+import sys
+
+import pytest
+
+from combilog import AsyncCombilog
+from combilog import CallNotSuccessfullError
+from combilog import ChannelNotFoundError
+from testing.emulator import Emulator
+from testing.emulator import EmulatorSerial
+from testing.emulator import PtyServer
+from testing.emulator import synthetic_events
+
+
+def _run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro)
+
+
+@pytest.fixture
+def async_logger(emulator):
+    logger = AsyncCombilog(logger_addr=1, port='loop://')
+    logger.ser = EmulatorSerial(emulator)  # type: ignore
+    return logger
+
+
+def test_commands(async_logger):
+    async def main():
+        assert (await async_logger.device_info())['nr_channels'] == 18
+        assert (await async_logger.device_id())['vendor_name'] == 'Friedrichs'
+        assert await async_logger.get_rate() == {
+            'measuring_rate': 5,
+            'averaging_interval': 30,
+        }
+        assert await async_logger.read_channel('02') == '1.0'
+        assert len(await async_logger.get_channel_list()) == 18
+        with pytest.raises(ChannelNotFoundError):
+            await async_logger.get_channel_info('20')
+        assert await async_logger.authenticate('wrong') is False
+        with pytest.raises(CallNotSuccessfullError):
+            await async_logger.delete_memory()
+        assert await async_logger.authenticate('12345678') is True
+        await async_logger.set_rate(10, 60)
+        assert (await async_logger.get_rate())['measuring_rate'] == 10
+    _run(main())
+    # the port is only opened for every call
+    assert async_logger.is_open is False
+
+
+def test_session(async_logger):
+    async def main():
+        async with async_logger:
+            assert async_logger.is_open is True
+            await async_logger.get_nr_events()
+            await async_logger.pointer_to_date(1, '200904172500')
+            assert await async_logger.get_nr_events() == 40
+        assert async_logger.is_open is False
+    _run(main())
+    assert async_logger.ser.nr_opened == 1
+
+
+@pytest.mark.parametrize('output_type', ('dict', 'list'))
+def test_read_logger(async_logger, output_type):
+    logs = _run(async_logger.read_logger(pointer=1, output_type=output_type))
+    assert len(logs) == 50
+    assert async_logger.ser.nr_opened == 1
+
+
+def test_read_logger_iter(async_logger):
+    async def main():
+        events = await async_logger.read_logger(pointer=1, output_type='iter')
+        return [i async for i in events]
+    events = _run(main())
+    assert len(events) == 50
+    assert events[0][0] == '2020-09-04 17:20:00'
+    assert async_logger.is_open is False
+
+
+def test_read_logger_closes_the_port_on_errors(async_logger, emulator):
+    emulator.inject('garble')
+
+    async def main():
+        with pytest.raises(ValueError):
+            await async_logger.read_logger(pointer=1)
+        assert async_logger.is_open is False
+    _run(main())
+
+
+def test_iter_events_aclose(async_logger):
+    async def main():
+        events = async_logger.iter_events(pointer=1)
+        async for _ in events:
+            break
+        assert async_logger.is_open is True
+        await events.aclose()
+        assert async_logger.is_open is False
+    _run(main())
+
+
+def test_read_logger_invalid_output_type(async_logger):
+    with pytest.raises(ValueError) as execinfo:
+        _run(async_logger.read_logger(pointer=1, output_type='columns'))
+    assert 'dict, list, iter' in str(execinfo.value)
+
+
+def test_timeout_does_not_block_the_loop(emulator):
+    async_logger = AsyncCombilog(logger_addr=2, port='loop://', timeout=0.2)
+    async_logger.ser = EmulatorSerial(emulator)  # type: ignore
+    ticks = []
+
+    async def tick():
+        for _ in range(5):
+            ticks.append(1)
+            await asyncio.sleep(0.02)
+
+    async def main():
+        # logger 2 does not exist and does not answer
+        return await asyncio.gather(async_logger.get_rate(), tick())
+    with pytest.raises(ValueError):
+        _run(main())
+    assert len(ticks) == 5
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+def test_many_loggers_at_once():
+    emulators = [
+        Emulator(memory=synthetic_events(10), baudrate=38400)
+        for _ in range(3)
+    ]
+    servers = [PtyServer(i) for i in emulators]
+
+    async def download(port):
+        logger = AsyncCombilog(logger_addr=1, port=port, baudrate=38400)
+        return await logger.read_logger(pointer=1)
+
+    async def main():
+        return await asyncio.gather(*(download(i.port) for i in servers))
+    for server in servers:
+        server.start()
+    try:
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        results = _run(main())
+        duration = loop.time() - start
+    finally:
+        for server in servers:
+            server.stop()
+    assert [len(i) for i in results] == [10, 10, 10]
+    # one download needs ~0.5 s, they run in parallel
+    single = sum(i.reply_delay(b'$01E\r', b'=' * 180) for i in emulators[:1])
+    assert duration < 3 * 10 * single
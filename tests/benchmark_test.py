@@ -0,0 +1,32 @@
+import json
+
+from testing.benchmark import _percentile
+from testing.benchmark import main
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 99) == 99
+    assert _percentile([3.0], 99) == 3.0
+
+
+def test_benchmark_writes_json(tmpdir):
+    output = tmpdir.join('benchmark.json')
+    ret = main([
+        '--baudrates', '38400', '--sizes', '2',
+        '--full-speed-sizes', '20', '--repeat', '2',
+        '--output', str(output),
+    ])
+    assert ret == 0
+    results = json.loads(output.read())
+    realtime, full_speed = results['download']
+    assert realtime['baudrate'] == 38400
+    assert realtime['nr_events'] == 2
+    assert full_speed['realtime'] is False
+    assert full_speed['nr_events'] == 20
+    assert full_speed['decode_seconds'] <= full_speed['seconds']
+    assert set(results['latency']['38400']) == {
+        'read_event', 'read_channel', 'get_channel_info', 'pointer_to_date',
+    }
+    assert results['latency']['38400']['read_event']['repeat'] == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from combilog import Capture
+from combilog import CAPTURE_MAGIC
+from combilog import Combilog
+from combilog import read_capture
+from combilog import ReplaySerial
+from testing.emulator import emulated_logger
+
+
+@pytest.fixture
+def capture_file(tmpdir, emulator):
+    path = str(tmpdir.join('session.cap'))
+    with Capture(path) as capture:
+        logger = emulated_logger(emulator, capture=capture)
+        logger.pointer_to_start(1)
+        logger.read_logger(pointer=1)
+    return path
+
+
+def _replay_logger(path):
+    logger = Combilog(logger_addr=1, port='loop://')
+    logger.ser = ReplaySerial(path)  # type: ignore
+    return logger
+
+
+def test_read_capture(capture_file):
+    records = list(read_capture(capture_file))
+    # pointer, number of events and one telegram per event
+    assert len(records) == 52
+    assert records[0].telegram == b'$01C\r'
+    assert records[0].reply == b'\x06'
+    assert records[1].telegram == b'$01N\r'
+    assert records[1].reply == b'=50\r'
+    assert all(i.sent <= i.received for i in records)
+    assert records[2].sent >= records[1].received
+
+
+def test_capture_appends(capture_file, emulator):
+    with Capture(capture_file) as capture:
+        emulated_logger(emulator, capture=capture).get_nr_events()
+    assert len(list(read_capture(capture_file))) == 53
+
+
+def test_replay(capture_file, emulated):
+    emulated.pointer_to_start(1)
+    expected = emulated.read_logger(pointer=1)
+    logger = _replay_logger(capture_file)
+    logger.pointer_to_start(1)
+    assert logger.read_logger(pointer=1) == expected
+
+
+def test_replay_columns(tmpdir, emulator):
+    path = str(tmpdir.join('columns.cap'))
+    with Capture(path) as capture:
+        logger = emulated_logger(emulator, capture=capture)
+        expected = logger.read_logger(pointer=1, output_type='columns')
+    columns = _replay_logger(path).read_logger(
+        pointer=1, output_type='columns',
+    )
+    assert isinstance(columns, dict) and isinstance(expected, dict)
+    assert list(columns) == list(expected) == ['timestamp'] + [
+        f'Channel{i:02d}' for i in range(1, 19)
+    ]
+    assert list(columns['Channel02']) == list(expected['Channel02'])
+
+
+def test_replay_without_reply(capture_file):
+    logger = _replay_logger(capture_file)
+    assert logger.read_event(pointer=2) == {}
+
+
+def test_read_capture_invalid(tmpdir, capture_file):
+    path = tmpdir.join('invalid.cap')
+    path.write_binary(b'no capture')
+    with pytest.raises(ValueError):
+        list(read_capture(str(path)))
+    with open(capture_file, 'rb') as f:
+        data = f.read()
+    path.write_binary(data[:-3])
+    with pytest.raises(ValueError):
+        list(read_capture(str(path)))
+    path.write_binary(CAPTURE_MAGIC)
+    assert list(read_capture(str(path))) == []
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from combilog import ChannelCache
+from testing.emulator import emulated_logger
+from testing.emulator import EmulatedChannel
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return ChannelCache(str(tmpdir.join('channels.json')))
+
+
+def test_channel_cache_key(emulated):
+    assert emulated.channel_cache_key() == '100005:COM1020:2.26:18'
+
+
+def test_get_channels_without_cache(emulated, emulator):
+    channels = emulated.get_channels()
+    assert list(channels) == [f'{i:02d}' for i in range(1, 19)]
+    assert channels['01']['channel_notation'] == 'Channel01'
+    assert channels['01']['decimals'] == 1
+    assert emulated.get_channel_list()[:2] == ['Channel01', 'Channel02']
+
+
+def test_get_channels_cached(emulated, emulator, cache):
+    emulated.channel_cache = cache
+    channels = emulated.get_channels()
+    telegrams = emulator.telegrams
+    assert emulated.get_channels() == channels
+    # only the staleness check is sent
+    assert emulator.telegrams - telegrams == 2
+
+
+def test_get_channels_cached_on_disk(emulator, cache):
+    logger = emulated_logger(emulator)
+    logger.channel_cache = cache
+    channels = logger.get_channels()
+    with open(cache.path) as f:
+        assert json.load(f) == {'100005:COM1020:2.26:18': channels}
+    # a new process reads the file
+    logger = emulated_logger(emulator)
+    logger.channel_cache = ChannelCache(cache.path)
+    telegrams = emulator.telegrams
+    assert logger.get_channels() == channels
+    assert emulator.telegrams - telegrams == 2
+
+
+def test_get_channels_stale(emulated, emulator, cache):
+    emulated.channel_cache = cache
+    emulated.get_channels()
+    emulator.channels['19'] = EmulatedChannel(notation='NewChannel')
+    assert emulated.get_channel_list()[-1] == 'NewChannel'
+    assert len(cache.get('100005:COM1020:2.26:19')) == 19
+
+
+def test_get_channels_invalidate(emulated, emulator, cache):
+    emulated.channel_cache = cache
+    emulated.get_channels()
+    emulator.channels['01'] = EmulatedChannel(notation='Renamed')
+    # same configuration key so the cached notation is returned
+    assert emulated.get_channel_list()[0] == 'Channel01'
+    assert emulated.get_channels(refresh=True)['01']['channel_notation'] == (
+        'Renamed'
+    )
+    cache.invalidate(emulated.channel_cache_key())
+    assert cache.get('100005:COM1020:2.26:18') is None
+    emulated.get_channels()
+    cache.invalidate()
+    assert cache.get('100005:COM1020:2.26:18') is None
+    with open(cache.path) as f:
+        assert json.load(f) == {}
@@ -0,0 +1,141 @@
+import csv
+import gzip
+import io
+import json
+import sys
+
+import pytest
+
+from combilog import _Progress
+from combilog import CheckpointStore
+from combilog import main
+from testing.emulator import Emulator
+from testing.emulator import PtyServer
+from testing.emulator import synthetic_events
+
+pytestmark = pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+
+
+@pytest.fixture
+def emulator():
+    return Emulator(
+        memory=synthetic_events(5, nr_channels=3),
+        baudrate=38400,
+        realtime=False,
+    )
+
+
+@pytest.fixture
+def port(emulator):
+    with PtyServer(emulator) as port:
+        yield port
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', newline='')
+    return open(path, newline='')
+
+
+def _main(port, *argv):
+    return main(['-p', port, '--baudrate', '38400', '-q', *argv])
+
+
+def test_info(port, capsys):
+    assert _main(port, 'info') == 0
+    info = json.loads(capsys.readouterr().out)
+    assert info['device_info']['serial_number'] == 100005
+    assert info['nr_events'] == 5
+    assert list(info['channels']) == ['01', '02', '03']
+
+
+def test_download_csv(port, capsys):
+    assert _main(port, 'download', '--from-start') == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0][0] == 'timestamp'
+    assert len(rows) == 6
+
+
+def test_download_channels_from_program(port, emulator, capsys):
+    argv = ('--program', 'testing/tetsing.PRO', 'download')
+    telegrams = emulator.telegrams
+    assert _main(port, *argv) == 0
+    header = capsys.readouterr().out.splitlines()[0]
+    assert header.startswith('timestamp,LufttempMittel [°C],LufttempMin')
+    # only the number of events and the events were asked for
+    assert emulator.telegrams - telegrams == 6
+
+
+def test_download_ndjson_file(port, tmpdir):
+    path = str(tmpdir.join('events.ndjson'))
+    assert _main(port, 'download', '-f', 'ndjson', '-o', path) == 0
+    with open(path) as f:
+        events = [json.loads(i) for i in f]
+    assert len(events) == 5
+    assert len(events[0]) == 4
+
+
+def test_sync(port, emulator, tmpdir, capsys):
+    checkpoints = str(tmpdir.join('checkpoints.json'))
+    argv = ('sync', '--checkpoints', checkpoints, '-f', 'ndjson')
+    assert _main(port, *argv) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 5
+    checkpoint = CheckpointStore(checkpoints).load(emulator.serial_number)
+    assert checkpoint is not None
+    assert checkpoint.timestamp == emulator.memory[-1][0]
+    assert _main(port, *argv) == 0
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('name', ('events.csv', 'events.csv.gz'))
+def test_sync_appends_to_file(port, emulator, tmpdir, name):
+    checkpoints = str(tmpdir.join('checkpoints.json'))
+    path = str(tmpdir.join(name))
+    argv = ('sync', '--checkpoints', checkpoints, '-o', path)
+    assert _main(port, *argv) == 0
+    emulator.add_event([1.0, 2.0, 3.0])
+    assert _main(port, *argv) == 0
+    # no new events leave the file as it is
+    assert _main(port, *argv) == 0
+    with _open(path) as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == 'timestamp'
+    assert len(rows) == 7
+    assert [float(i) for i in rows[-1][1:]] == [1.0, 2.0, 3.0]
+
+
+def test_live(port, emulator, capsys):
+    emulator.measuring_rate = 1
+    argv = ('live', '--channels', '01', '02', '-n', '2', '--delay', '0')
+    assert _main(port, *argv) == 0
+    rows = list(csv.reader(io.StringIO(capsys.readouterr().out)))
+    assert rows[0] == ['timestamp', '01', '02']
+    assert len(rows) == 3
+
+
+def test_protocol_error_exit_code(port, capsys):
+    assert _main(port, '--addr', '07', '--timeout', '0.05', 'info') == 1
+    assert capsys.readouterr().err.startswith('error: ')
+
+
+def test_port_error_exit_code(tmpdir, capsys):
+    assert _main(str(tmpdir.join('missing')), 'info') == 3
+    assert capsys.readouterr().err.startswith('error: ')
+
+
+def test_progress_rate_limited(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('combilog.time.monotonic', lambda: now[0])
+    stream = io.StringIO()
+    progress = _Progress(stream, interval=1.0)
+    for n in range(1, 11):
+        now[0] = n * 0.25
+        progress(n, 20)
+    progress.done()
+    lines = stream.getvalue().split('\r')[1:]
+    assert len(lines) == 3
+    assert lines[1] == '8/20 events 4.0 events/s ETA 00:03'
+    assert lines[-1] == '10/20 events 4.0 events/s ETA 00:02\n'
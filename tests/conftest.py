@@ -1,8 +1,104 @@
 import pytest
 
 from combilog import Combilog
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+from testing.emulator import synthetic_events
+
+
+class FakeSerial():
+    '''
+    minimal stand-in for a ``serial.Serial`` port answering every telegram
+    with a canned reply. A reply may be a list which is consumed in order
+    '''
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.is_open = False
+        self.nr_opened = 0
+        self.written = []
+        self.timeout = 1.0
+        self._buf = bytearray()
+
+    def open(self):
+        self.is_open = True
+        self.nr_opened += 1
+
+    def close(self):
+        self.is_open = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def reset_input_buffer(self):
+        self._buf.clear()
+
+    def write(self, data):
+        assert self.is_open, 'writing to a closed port'
+        self.written.append(data)
+        reply = self.replies.get(data, b'\x15')
+        if isinstance(reply, list):
+            reply = reply.pop(0) if reply else b''
+        self._buf += reply
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self._buf[:size])
+        del self._buf[:size]
+        return data
+
+    def read_until(self, expected=b'\n', size=None):
+        idx = self._buf.find(expected)
+        end = len(self._buf) if idx == -1 else idx + len(expected)
+        return self.read(end)
+
+
+def channel_info_reply(notation, unit='', decimals=2, channel_type=1):
+    '''build the reply of a B call for an internal channel'''
+    return (
+        f'={channel_type}{notation:<19};34{decimals}{unit:<5};00\r'
+    ).encode('latin-1')
 
 
 @pytest.fixture
 def my_logger():
     return Combilog(logger_addr=1, port='com6')
+
+
+@pytest.fixture
+def fake_serial():
+    return FakeSerial(
+        replies={
+            b'$01N\r': b'=3\r',
+            b'$01E\r': [
+                b'=1200904172000;42493CD3;00000000;\r',
+                b'=1200904172030;42493CD3;00000000;\r',
+                b'=1200904172100;42493CD3;00000000;\r',
+            ],
+            b'$01H\r': b'=200904172000\r',
+            b'$01S\r': b'=Fake                100001  2\r',
+            b'$01B01\r': channel_info_reply('LufttempMittel', '°C', 1),
+            b'$01B02\r': channel_info_reply('LuftfeuchteMittel', '%'),
+        },
+    )
+
+
+@pytest.fixture
+def fake_logger(fake_serial):
+    logger = Combilog(logger_addr=1, port='com6')
+    logger.ser = fake_serial
+    return logger
+
+
+@pytest.fixture
+def emulator():
+    return Emulator(memory=synthetic_events(nr_events=50), realtime=False)
+
+
+@pytest.fixture
+def emulated(emulator):
+    return emulated_logger(emulator)
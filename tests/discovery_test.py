@@ -0,0 +1,42 @@
+import pytest
+
+from combilog import CHANNEL_NUMBERS
+from testing.emulator import emulated_logger
+from testing.emulator import EmulatedChannel
+from testing.emulator import Emulator
+from testing.emulator import synthetic_channels
+
+
+@pytest.fixture
+def external_emulator():
+    channels = synthetic_channels(19)
+    # two external modules and an empty internal channel
+    channels['05'] = EmulatedChannel(notation='', channel_type=0)
+    channels['82'] = EmulatedChannel(notation='Ext82', unit='m/s')
+    channels['8A'] = EmulatedChannel(notation='Ext8A')
+    return Emulator(channels=channels, realtime=False)
+
+
+def test_channel_numbers():
+    assert len(CHANNEL_NUMBERS) == 80
+    assert CHANNEL_NUMBERS[:2] == ('01', '02')
+    assert CHANNEL_NUMBERS[-1] == 'BB'
+
+
+def test_discover_channels_stops_early(emulated, emulator):
+    channels = emulated.discover_channels()
+    assert list(channels) == [f'{i:02d}' for i in range(1, 19)]
+    # device_info and one telegram per channel
+    assert emulator.telegrams == 19
+
+
+def test_discover_external_channels(external_emulator):
+    logger = emulated_logger(external_emulator)
+    channels = logger.discover_channels()
+    assert '05' not in channels
+    assert list(channels)[-2:] == ['82', '8A']
+    assert channels['82']['unit'] == 'm/s'
+    assert channels['8A']['channel_notation'] == 'Ext8A'
+    # stopped at 8A instead of probing up to BB
+    assert external_emulator.telegrams == 1 + 20 + 11
+    assert logger.get_channel_list()[-1] == 'Ext8A'
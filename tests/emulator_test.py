@@ -0,0 +1,167 @@
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+from combilog import CallNotSuccessfullError
+from combilog import ChannelError
+from combilog import ChannelNotFoundError
+from combilog import Combilog
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+from testing.emulator import EmulatorSerial
+from testing.emulator import PtyServer
+from testing.emulator import synthetic_events
+
+
+def test_device_id(emulated):
+    assert emulated.device_id() == {
+        'vendor_name': 'Friedrichs',
+        'model_name': 'COM1020',
+        'hw_revision': 'V4.01',
+        'sw_revision': '2.26',
+    }
+
+
+def test_device_info(emulated):
+    assert emulated.device_info() == {
+        'location': 'Emulator',
+        'serial_number': 100005,
+        'nr_channels': 18,
+    }
+    assert emulated.device_info(['serial_number']) == {
+        'serial_number': 100005,
+    }
+    assert emulated.device_id(fields=['model_name']) == {
+        'model_name': 'COM1020',
+    }
+
+
+def test_channels(emulated, emulator):
+    assert emulated.get_channel_info('01')['channel_notation'] == 'Channel01'
+    assert len(emulated.get_channel_list()) == 18
+    assert emulated.read_channel('02') == '1.0'
+    with pytest.raises(ChannelNotFoundError):
+        emulated.get_channel_info('20')
+    emulator.channels['03'] = emulator.channels['03']._replace(error=True)
+    with pytest.raises(ChannelError):
+        emulated.read_channel('03')
+
+
+def test_write_channel_needs_authentication(emulated, emulator):
+    emulator.channels['08'] = emulator.channels['08']._replace(host_input=0)
+    with pytest.raises(CallNotSuccessfullError):
+        emulated.write_channel('08', '10.0')
+    assert emulated.authenticate('12345678') is True
+    emulated.write_channel('08', '10.0')
+    assert emulated.read_channel('08') == '10.0'
+
+
+@pytest.mark.parametrize('pointer', (1, 2))
+def test_read_logger(emulated, pointer):
+    logs = emulated.read_logger(pointer=pointer)
+    assert len(logs) == 50
+    timestamp, values = next(iter(logs.items()))
+    assert timestamp == '2020-09-04 17:20:00'
+    assert values == synthetic_events(1)[0][1]
+    assert emulated.get_nr_events() == 0 if pointer == 1 else 50
+
+
+def test_pointer_to_date(emulated):
+    emulated.pointer_to_date(1, datetime(2020, 9, 4, 17, 25))
+    assert emulated.get_nr_events() == 40
+    event = emulated.read_event(1)
+    assert list(event) == ['2020-09-04 17:25:00']
+    assert emulated.repeat_read_event(1) == event
+
+
+def test_set_rate_and_datetime(emulated):
+    emulated.authenticate('12345678')
+    emulated.set_rate(10, 60)
+    assert emulated.get_rate() == {
+        'measuring_rate': 10,
+        'averaging_interval': 60,
+    }
+    emulated.set_datetime('200904172000')
+    logger_time = emulated.read_datetime()
+    assert abs(logger_time - datetime(2020, 9, 4, 17, 20)).total_seconds() < 2
+
+
+def test_delete_memory(emulated):
+    with pytest.raises(CallNotSuccessfullError):
+        emulated.delete_memory()
+    emulated.authenticate('12345678')
+    emulated.delete_memory()
+    assert emulated.get_nr_events() == 0
+
+
+def test_wrong_address_is_not_answered(emulator):
+    emulated = emulated_logger(emulator, timeout=0.1)
+    emulated.logger_addr = '02'
+    with pytest.raises(ChannelNotFoundError):
+        emulated.get_channel_info('01')
+
+
+def test_shared_bus():
+    first = Emulator(logger_addr=1, realtime=False)
+    second = Emulator(logger_addr=2, realtime=False)
+    second.location = 'Second'
+    ser = EmulatorSerial(first, second)
+    logger = Combilog(logger_addr=2, port='loop://')
+    logger.ser = ser  # type: ignore
+    assert logger.device_info()['location'] == 'Second'
+
+
+@pytest.mark.parametrize(
+    ('fault', 'exp'),
+    (('drop', b''), ('nak', b'\x15'), ('truncate', b'=050')),
+)
+def test_inject_fault(emulator, fault, exp):
+    emulator.inject(fault)
+    assert emulator.handle(b'$01X\r') == exp
+    assert emulator.handle(b'$01X\r') == b'=0500030\r'
+
+
+def test_random_faults():
+    emulator = Emulator(faults={'garble': 1.0}, realtime=False)
+    reply = emulator.handle(b'$01X\r')
+    assert reply != b'=0500030\r'
+    assert b'#' in reply
+
+
+def test_invalid_fault():
+    with pytest.raises(ValueError) as execinfo:
+        Emulator(faults={'invalid': 1.0})
+    assert 'drop, nak, truncate, garble' in str(execinfo.value)
+
+
+def test_realtime_baudrate_delay():
+    emulator = Emulator(memory=synthetic_events(2), baudrate=38400)
+    emulated = emulated_logger(emulator)
+    start = time.monotonic()
+    emulated.read_event(pointer=1)
+    # ~180 bytes at 38400 baud
+    assert time.monotonic() - start >= 0.04
+
+
+def test_latency(emulator):
+    emulator.latency = 0.05
+    start = time.monotonic()
+    emulator_logger = emulated_logger(emulator)
+    emulator_logger.get_nr_events()
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+def test_pty_server(emulator):
+    with PtyServer(emulator) as port:
+        logger = Combilog(logger_addr=1, port=port)
+        assert logger.device_info()['serial_number'] == 100005
+        with logger:
+            logs = logger.read_logger(pointer=1)
+            assert isinstance(logs, dict)
+            assert len(logs) == 50
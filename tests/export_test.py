@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+
+from combilog import _column_names
+
+
+def test_column_names():
+    assert _column_names(['a', 'a', 'timestamp'], 4) == [
+        'a', 'a_2', 'timestamp_3', 'channel_4',
+    ]
+
+
+def test_export_csv(emulated, tmpdir):
+    path = str(tmpdir.join('logs.csv'))
+    assert emulated.export_csv(path, pointer=1) == 50
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ['timestamp', 'Channel01 [°C]', 'Channel02 [°C]']
+    assert len(rows[0]) == 19
+    assert len(rows) == 51
+    assert rows[1][0] == '2020-09-04 17:20:00'
+    assert float(rows[1][2]) == 9.41
+
+
+def test_export_csv_gzip(emulated, tmpdir):
+    path = str(tmpdir.join('logs.csv.gz'))
+    assert emulated.export_csv(path, pointer=1, delimiter=';') == 50
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith('timestamp;Channel01 [°C];')
+    assert len(lines) == 51
+
+
+def test_export_csv_no_events(fake_logger):
+    fake_logger.ser.replies[b'$01N\r'] = b'=0\r'
+    f = io.StringIO()
+    assert fake_logger.export_csv(f, pointer=1) == 0
+    assert f.getvalue() == (
+        'timestamp,LufttempMittel [°C],LuftfeuchteMittel [%]\r\n'
+    )
+
+
+def test_export_csv_epoch(fake_logger):
+    f = io.StringIO()
+    assert fake_logger.export_csv(f, pointer=1, time_format='epoch') == 3
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert rows[0] == [
+        'timestamp', 'LufttempMittel [°C]', 'LuftfeuchteMittel [%]',
+    ]
+    assert rows[1] == ['1599240000', '50.31', '0.0']
+
+
+def test_export_ndjson(emulated, tmpdir):
+    path = str(tmpdir.join('logs.ndjson'))
+    assert emulated.export_ndjson(path, pointer=1, time_format='epoch') == 50
+    with open(path, encoding='utf-8') as f:
+        events = [json.loads(line) for line in f]
+    assert len(events) == 50
+    assert events[0]['timestamp'] == 1599240000
+    assert list(events[0])[:2] == ['timestamp', 'Channel01 [°C]']
+    assert len(events[0]) == 19
+
+
+def test_export_ndjson_gzip_datetime(emulated, tmpdir):
+    path = str(tmpdir.join('logs.ndjson.gz'))
+    emulated.export_ndjson(path, pointer=1, time_format='datetime')
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        event = json.loads(f.readline())
+    assert event['timestamp'] == '2020-09-04 17:20:00'
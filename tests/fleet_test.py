@@ -0,0 +1,140 @@
+import sys
+import time
+
+import pytest
+
+from combilog import Combilog
+from combilog import Fleet
+from testing.emulator import Emulator
+from testing.emulator import EmulatorSerial
+from testing.emulator import PtyServer
+from testing.emulator import synthetic_events
+
+
+def _bus(*emulators):
+    ser = EmulatorSerial(*emulators)
+    loggers = []
+    for emulator in emulators:
+        logger = Combilog(logger_addr=emulator.logger_addr, port='loop://')
+        logger.ser = ser  # type: ignore
+        loggers.append(logger)
+    return loggers
+
+
+@pytest.fixture
+def fleet():
+    emulators = [
+        Emulator(logger_addr=i, memory=synthetic_events(i), realtime=False)
+        for i in (1, 2, 3)
+    ]
+    return Fleet(_bus(*emulators[:2]) + _bus(emulators[2]))
+
+
+def test_buses(fleet):
+    assert [len(i) for i in fleet.buses] == [2, 1]
+
+
+def test_poll(fleet):
+    results = list(fleet.poll(lambda logger: logger.read_logger(pointer=1)))
+    assert sorted((i.logger_addr, len(i.result)) for i in results) == [
+        ('01', 1), ('02', 2), ('03', 3),
+    ]
+    assert all(i.error is None for i in results)
+    # every port was opened once
+    assert [i[0].ser.nr_opened for i in fleet.buses] == [1, 1]
+
+
+def test_poll_error_per_logger(fleet):
+    def task(logger):
+        if logger.logger_addr == '02':
+            raise ValueError('failed')
+        return logger.get_nr_events()
+
+    results = {i.logger_addr: i for i in fleet.poll(task)}
+    assert isinstance(results['02'].error, ValueError)
+    assert results['01'].result == 1
+    assert results['03'].result == 3
+    assert results['03'].error is None
+
+
+def test_poll_port_not_found():
+    fleet = Fleet([('/dev/does_not_exist', 1), ('/dev/does_not_exist', 2)])
+    assert len(fleet.buses) == 1
+    results = list(fleet.poll(lambda logger: logger.get_nr_events()))
+    assert [i.logger_addr for i in results] == ['01', '02']
+    assert all(i.error is not None for i in results)
+    assert results[0].port == '/dev/does_not_exist'
+
+
+def test_poll_stopped_early(fleet):
+    polled = []
+
+    def task(logger):
+        polled.append(logger.logger_addr)
+        return logger.get_nr_events()
+
+    fleet.max_workers = 1
+    results = fleet.poll(task)
+    next(results)
+    results.close()
+    assert len(polled) < 3
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+def test_ports_are_polled_in_parallel():
+    servers = [
+        PtyServer(
+            Emulator(memory=synthetic_events(5), baudrate=38400),
+            Emulator(
+                logger_addr=2, memory=synthetic_events(5), baudrate=38400,
+            ),
+        )
+        for _ in range(3)
+    ]
+    ports = [i.start() for i in servers]
+
+    def task(logger):
+        logger.pointer_to_start(1)
+        return logger.read_logger(1)
+
+    try:
+        fleet = Fleet(
+            [(port, addr) for port in ports for addr in (1, 2)],
+            baudrate=38400,
+        )
+        start = time.monotonic()
+        results = list(fleet.poll(task))
+        duration = time.monotonic() - start
+        start = time.monotonic()
+        fleet.max_workers = 1
+        list(fleet.poll(task))
+        duration_serial = time.monotonic() - start
+    finally:
+        for server in servers:
+            server.stop()
+    assert len(results) == 6
+    assert all(len(i.result) == 5 for i in results)
+    assert duration < duration_serial / 2
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+def test_loggers_built_separately_share_the_bus():
+    emulators = [
+        Emulator(logger_addr=i, memory=synthetic_events(i), realtime=False)
+        for i in (1, 2)
+    ]
+    with PtyServer(*emulators) as port:
+        loggers = [Combilog(logger_addr=i, port=port) for i in (1, 2)]
+        fleet = Fleet(loggers)
+        assert fleet.buses == [loggers]
+        results = list(fleet.poll(lambda logger: logger.get_nr_events()))
+    assert [(i.logger_addr, i.result) for i in results] == [
+        ('01', 1), ('02', 2),
+    ]
+    assert all(i.error is None for i in results)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 import pytest
 
 from combilog import _channel_calc_to_txt
@@ -5,6 +7,15 @@ from combilog import _channel_type_to_txt
 from combilog import _data_format_to_txt
 from combilog import _hexIEE_to_dec
 from combilog import _host_input_possible
+from combilog import _parse_channel_info
+from combilog import _parse_device_id
+from combilog import _parse_device_info
+from combilog import _parse_event
+from combilog import _parse_events
+from combilog import _parse_fields
+from combilog import _parse_nr_events
+from combilog import _parse_rate
+from combilog import _parse_timestamp
 
 
 @pytest.mark.parametrize(
@@ -80,3 +91,157 @@ def test_get_data_format(data_format, exp_txt):
 def test_hexIEE_to_dec(val, exp):
     resp_0 = _hexIEE_to_dec(val)
     assert resp_0 == exp
+
+
+@pytest.mark.parametrize(
+    'timestamp',
+    (
+        '200904172000', '000101000000', '681231235959', '690101000000',
+        '991231235959', '240229120000',
+    ),
+)
+def test_parse_timestamp_same_as_strptime(timestamp):
+    exp = datetime.strptime(timestamp, '%y%m%d%H%M%S')
+    assert _parse_timestamp(timestamp) == str(exp)
+    assert _parse_timestamp(timestamp, time_format='datetime') == exp
+    epoch = (exp - datetime(1970, 1, 1)).total_seconds()
+    assert _parse_timestamp(timestamp, time_format='epoch') == epoch
+
+
+@pytest.mark.parametrize(
+    'timestamp',
+    (
+        '2009041720', '20090417200a', '200230120000', '200904246000',
+        '200904172060', '200904170060', ' 00904172000',
+    ),
+)
+def test_parse_timestamp_invalid(timestamp):
+    with pytest.raises(ValueError) as execinfo:
+        _parse_timestamp(timestamp)
+    assert timestamp in str(execinfo.value) or 'day' in str(execinfo.value)
+
+
+def test_parse_timestamp_invalid_time_format():
+    with pytest.raises(ValueError) as execinfo:
+        _parse_timestamp('200904172000', time_format='invalid')
+    assert 'str, datetime, epoch' in str(execinfo.value)
+
+
+def test_parse_channel_info():
+    resp = '=1LufttempMittel     ;341°C   ;12\r'.encode('latin-1')
+    assert _parse_channel_info(resp, '01') == {
+        'channel_type': 'analogue input channel (AR)',
+        'channel_notation': 'LufttempMittel',
+        'data_format': 'real',
+        'field_length': 4,
+        'decimals': 1,
+        'unit': '°C',
+        'host_input': False,
+        'type_of_calculation': 'calculation of the sum over the averaging '
+        'interval',
+    }
+
+
+def test_parse_channel_info_empty_external_channel():
+    # one character shorter than specified in the manual
+    info = _parse_channel_info(b'=0                   ;000     ;1\r', '80')
+    assert info['channel_type'] == 'empty channel (EM)'
+    assert info['channel_notation'] == ''
+    assert info['host_input'] is False
+    assert info['type_of_calculation'] == 'unknown calculation type'
+
+
+def test_parse_device_id():
+    resp = b'=FriedrichsCOM1020 V4.01 2.26\r'
+    assert _parse_device_id(resp) == {
+        'vendor_name': 'Friedrichs',
+        'model_name': 'COM1020',
+        'hw_revision': 'V4.01',
+        'sw_revision': '2.26',
+    }
+
+
+def test_parse_device_info():
+    resp = b'=Emulator            100005 18\r'
+    assert _parse_device_info(resp) == {
+        'location': 'Emulator',
+        'serial_number': 100005,
+        'nr_channels': 18,
+    }
+
+
+def test_parse_fields_only_asked_fields():
+    layout = (('a', 1, 3, int), ('b', 3, 4, bytes.decode))
+    assert _parse_fields(b'=12x\r', layout, fields=('a',)) == {'a': 12}
+    assert _parse_fields(b'=12x\r', layout) == {'a': 12, 'b': 'x'}
+    with pytest.raises(ValueError) as excinfo:
+        _parse_fields(b'=12x\r', layout, fields=('a', 'c'))
+    assert str(excinfo.value) == 'unknown fields: c'
+
+
+def test_parse_rate_and_nr_events():
+    assert _parse_rate(b'=0500030\r') == {
+        'measuring_rate': 5,
+        'averaging_interval': 30,
+    }
+    assert _parse_nr_events(b'=1234\r') == 1234
+
+
+def test_parse_event():
+    resp = b'=1200904172000;42493CD3;00000000;\r'
+    assert _parse_event(resp) == {'2020-09-04 17:20:00': [50.31, 0.0]}
+    assert _parse_event(resp, 'epoch') == {1599240000: [50.31, 0.0]}
+    assert _parse_event(b'=1200904172000;\r') == {'2020-09-04 17:20:00': []}
+    assert _parse_event(b'=\r') == {}
+
+
+@pytest.mark.parametrize(
+    ('digits', 'exp'),
+    (
+        (0, [0, 50, 50]),
+        ([0, 1, 3], [0, 50.3, 50.309]),
+        # channels without decimals are rounded to 2 digits
+        ([1], [0, 50.31, 50.31]),
+    ),
+)
+def test_parse_event_digits(digits, exp):
+    resp = b'=1200904172000;00000000;42493CD3;42493CD3;\r'
+    assert _parse_event(resp, digits=digits) == {'2020-09-04 17:20:00': exp}
+
+
+def test_parse_events():
+    resps = (
+        b'=1200904172000;00000000;42493CD3;\r',
+        b'=1200904172030;42493CD3;00000000;\r',
+        b'=\r',
+    )
+    timestamps, values = _parse_events(resps, 'epoch', [0, 2])
+    assert timestamps == [1599240000, 1599240030]
+    assert values.typecode == 'd'
+    assert list(values) == [0, 50.31, 50, 0]
+
+
+def test_parse_events_empty():
+    timestamps, values = _parse_events([b'=\r'])
+    assert timestamps == []
+    assert len(values) == 0
+
+
+def test_parse_events_different_nr_of_channels():
+    resps = (b'=1200904172000;00000000;\r', b'=1200904172030;\r')
+    with pytest.raises(ValueError) as execinfo:
+        _parse_events(resps)
+    assert 'same number of channels' in str(execinfo.value)
+
+
+@pytest.mark.parametrize(
+    'resp',
+    (
+        b'=120090417200;42493CD3;\r',
+        b'=1200904172000;42493CD;\r',
+        b'=1200904172000;42493CDX;\r',
+    ),
+)
+def test_parse_event_invalid(resp):
+    with pytest.raises(ValueError):
+        _parse_event(resp)
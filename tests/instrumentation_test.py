@@ -0,0 +1,103 @@
+from typing import List
+
+import pytest
+
+from combilog import CallNotSuccessfullError
+from combilog import CallRecord
+from combilog import ChannelNotFoundError
+from combilog import CommandStats
+from combilog import Instrumentation
+from combilog import LATENCY_BUCKETS
+from testing.emulator import emulated_logger
+
+
+@pytest.fixture
+def instrumentation():
+    return Instrumentation()
+
+
+@pytest.fixture
+def instrumented(emulator, instrumentation):
+    return emulated_logger(
+        emulator, timeout=0.01, instrumentation=instrumentation,
+    )
+
+
+def test_hooks(instrumented, instrumentation):
+    records: List[CallRecord] = []
+    instrumentation.add_hook(records.append)
+    instrumented.device_info()
+    instrumented.pointer_to_start(1)
+    with pytest.raises(ChannelNotFoundError):
+        instrumented.get_channel_info('20')
+    device_info, pointer, channel_info = records
+    assert device_info.command == 'S'
+    assert device_info.bytes_sent == 5
+    assert device_info.bytes_received == 31
+    assert device_info.attempts == 1
+    assert device_info.outcome == 'reply'
+    assert device_info.open_seconds > 0
+    assert device_info.io_seconds > 0
+    assert device_info.parse_seconds > 0
+    assert pointer.outcome == 'ACK'
+    assert pointer.parse_seconds < 0.01
+    # the NAK was received and then raised while parsing
+    assert channel_info.outcome == 'error'
+    assert channel_info.bytes_received == 1
+    instrumentation.remove_hook(records.append)
+    instrumented.device_info()
+    assert len(records) == 3
+
+
+def test_failing_hook(instrumented, instrumentation):
+    def hook(record: CallRecord) -> None:
+        raise ValueError('broken hook')
+
+    records: List[CallRecord] = []
+    instrumentation.add_hook(hook)
+    instrumentation.add_hook(records.append)
+    with pytest.warns(RuntimeWarning, match='broken hook'):
+        assert instrumented.device_info()['nr_channels'] == 18
+    # the error of the command is not replaced by the error of the hook
+    with pytest.warns(RuntimeWarning, match='broken hook'):
+        with pytest.raises(ChannelNotFoundError):
+            instrumented.get_channel_info('20')
+    # the other hooks are still called
+    assert [r.outcome for r in records] == ['reply', 'error']
+
+
+def test_stats(instrumented, instrumentation, emulator):
+    with instrumented:
+        instrumented.read_logger(pointer=1)
+    stats = instrumentation.stats()
+    assert list(stats) == ['E', 'N']
+    assert stats['E']['calls'] == 50
+    assert stats['E']['outcomes'] == {'reply': 50}
+    assert sum(stats['E']['histogram']) == 50
+    assert stats['E']['bytes_received'] == 50 * len(emulator._event(0))
+    # the port was opened for the session and not for a command
+    assert stats['E']['open_seconds'] == 0
+    instrumentation.reset()
+    assert instrumentation.stats() == {}
+
+
+def test_stats_timeout(instrumented, instrumentation, emulator):
+    emulator.inject('drop')
+    with pytest.raises(ValueError):
+        instrumented.get_nr_events()
+    emulator.inject('drop')
+    with pytest.raises(CallNotSuccessfullError):
+        instrumented.delete_memory()
+    stats = instrumentation.stats()
+    assert stats['N']['outcomes'] == {'error': 1}
+    assert stats['C']['outcomes'] == {'timeout': 1}
+
+
+def test_command_stats_histogram():
+    stats = CommandStats()
+    assert len(stats.histogram) == len(LATENCY_BUCKETS) + 1
+
+
+def test_no_instrumentation(emulated):
+    assert emulated.instrumentation is None
+    assert emulated.get_nr_events() == 50
@@ -0,0 +1,150 @@
+import time
+
+import pytest
+import serial
+
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+from testing.emulator import synthetic_events
+
+
+@pytest.mark.parametrize('output_type', ('dict', 'list'))
+def test_prefetch_reads_the_same_events(emulator, output_type):
+    logger = emulated_logger(emulator)
+    expected = logger.read_logger(1, output_type=output_type)
+    emulator.pointers[1] = 0
+    logs = logger.read_logger(1, output_type=output_type, prefetch=4)
+    assert isinstance(logs, (dict, list))
+    assert logs == expected
+    assert len(logs) == 50
+
+
+def test_prefetch_columns(emulator):
+    logger = emulated_logger(emulator)
+    columns = logger.read_logger(1, output_type='columns', prefetch=8)
+    assert isinstance(columns, dict)
+    assert len(columns['timestamp']) == 50
+    assert list(columns['Channel01'][:2]) == [
+        i[1][0] for i in emulator.memory[:2]
+    ]
+
+
+def test_prefetch_export(emulator, tmpdir):
+    path = str(tmpdir.join('events.csv'))
+    logger = emulated_logger(emulator)
+    assert logger.export_csv(path, 1, prefetch=8) == 50
+
+
+def test_prefetch_verbose(emulator, capsys):
+    emulator.memory = emulator.memory[:2]
+    emulated_logger(emulator).read_logger(1, verbose=True, prefetch=2)
+    assert capsys.readouterr().out == (
+        'reading event 1 of 2\nreading event 2 of 2\n'
+    )
+
+
+def test_prefetch_is_bounded(emulator):
+    logger = emulated_logger(emulator)
+    events = logger.iter_events(1, prefetch=4)
+    next(events)
+    time.sleep(0.2)
+    # "N", the event yielded, the full queue and the one waiting to be queued
+    assert emulator.telegrams == 1 + 1 + 4 + 1
+    events.close()
+
+
+def test_prefetch_close_resets_the_pointer(emulator):
+    logger = emulated_logger(emulator)
+    with logger:
+        events = logger.iter_events(1, time_format='datetime', prefetch=4)
+        for _, _ in zip(range(3), events):
+            pass
+        time.sleep(0.1)
+        events.close()
+        # the events read ahead are read again
+        assert list(logger.read_event(1, 'datetime')) == [
+            emulator.memory[3][0],
+        ]
+    assert not logger.is_open
+
+
+def _close_after_three(logger):
+    events = logger.iter_events(1, time_format='datetime', prefetch=4)
+    for _, _ in zip(range(3), events):
+        pass
+    time.sleep(0.1)
+    return events
+
+
+def test_prefetch_reset_retried_after_nak(emulator):
+    logger = emulated_logger(emulator)
+    with logger:
+        events = _close_after_three(logger)
+        emulator.inject('nak')
+        events.close()
+        assert list(logger.read_event(1, 'datetime')) == [
+            emulator.memory[3][0],
+        ]
+
+
+def test_prefetch_reset_failing_warns(emulator):
+    logger = emulated_logger(emulator)
+    with logger:
+        events = _close_after_three(logger)
+        emulator.inject('nak', 3)
+        with pytest.warns(RuntimeWarning, match='pointer 1 back to'):
+            events.close()
+
+
+def test_prefetch_reset_keeps_the_consumer_error(emulator):
+    logger = emulated_logger(emulator)
+    with logger, pytest.warns(RuntimeWarning):
+        with pytest.raises(KeyError):
+            events = _close_after_three(logger)
+            emulator.inject('nak', 3)
+            try:
+                raise KeyError('consumer')
+            finally:
+                events.close()
+
+
+def test_prefetch_end_of_memory(emulator):
+    logger = emulated_logger(emulator)
+    # the logger has less events than it reported
+    events = logger._iter_events(1, 60, False, 'str', 4)
+    with logger:
+        assert len(list(events)) == 50
+
+
+def test_prefetch_reader_error(emulator, monkeypatch):
+    logger = emulated_logger(emulator)
+    request = logger._request
+    calls = []
+
+    def failing_request(command, parse, *args):
+        calls.append(command)
+        if len(calls) > 5:
+            raise serial.SerialException('device disconnected')
+        return request(command, parse, *args)
+
+    monkeypatch.setattr(logger, '_request', failing_request)
+    events = []
+    with pytest.raises(serial.SerialException):
+        for event in logger.iter_events(1, prefetch=2):
+            events.append(event)
+    # "N" and 4 events
+    assert len(events) == 4
+
+
+def test_prefetch_overlaps_reading_and_processing():
+    def download(prefetch):
+        emulator = Emulator(
+            memory=synthetic_events(15), realtime=False, latency=0.02,
+        )
+        logger = emulated_logger(emulator)
+        start = time.perf_counter()
+        for _ in logger.iter_events(1, prefetch=prefetch):
+            time.sleep(0.02)
+        return time.perf_counter() - start
+
+    assert download(prefetch=4) < 0.75 * download(prefetch=0)
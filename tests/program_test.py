@@ -0,0 +1,70 @@
+import pytest
+
+from combilog import Combilog
+from combilog import read_program
+from testing.emulator import emulated_logger
+
+PROGRAM = 'testing/tetsing.PRO'
+
+
+def test_read_program():
+    channels = read_program(PROGRAM)
+    assert len(channels) == 24
+    # KANAL0 to KANAL19 are the internal channels followed by the external
+    assert list(channels)[19:] == ['20', '80', '81', '82', '83']
+    assert channels['01'] == {
+        'channel_type': 'analogue input channel (AR)',
+        'channel_notation': 'LufttempMittel',
+        'data_format': 'real',
+        'field_length': 4,
+        'decimals': 1,
+        'unit': '°C',
+        'host_input': True,
+        'type_of_calculation': 'unknown calculation type',
+    }
+    assert channels['02']['channel_type'] == 'arithmeic channel (AR)'
+    assert channels['18']['unit'] == ''
+    assert channels['20']['unit'] == 'W/m²'
+    assert channels['83']['channel_notation'] == '°²³%$§"!'
+    assert channels['83']['unit'] == 'V'
+
+
+def test_read_program_latin1(tmpdir):
+    path = tmpdir.join('latin1.PRO')
+    path.write_binary(
+        '[KANAL0]\nKanalTyp=1\nKanalBez=Temp\nFormatEinheit=_°C\n\n'
+        '[KANAL1]\nKanalTyp=0\n'.encode('latin-1'),
+    )
+    channels = read_program(str(path))
+    assert list(channels) == ['01']
+    assert channels['01']['unit'] == '°C'
+    assert channels['01']['decimals'] == -1
+
+
+def test_read_program_invalid_channel(tmpdir):
+    path = tmpdir.join('invalid.PRO')
+    path.write('[KANAL99]\nKanalTyp=1\n')
+    with pytest.raises(ValueError) as excinfo:
+        read_program(str(path))
+    assert str(excinfo.value).endswith('has an invalid channel [KANAL99]')
+
+
+def test_channels_from_program_need_no_telegrams(emulator):
+    channels = read_program(PROGRAM)
+    logger = emulated_logger(emulator)
+    logger.channels = channels
+    telegrams = emulator.telegrams
+    assert logger.get_channels() is channels
+    assert logger.get_channel_list()[:2] == ['LufttempMittel', 'LufttempMin']
+    assert logger._export_names()[0] == 'LufttempMittel [°C]'
+    assert emulator.telegrams == telegrams
+    # refresh asks the logger
+    assert logger.get_channels(refresh=True)['01']['channel_notation'] == (
+        'Channel01'
+    )
+
+
+def test_channels_argument():
+    channels = read_program(PROGRAM)
+    logger = Combilog(logger_addr=1, port='com6', channels=channels)
+    assert logger.get_channel_list()[-1] == '°²³%$§"!'
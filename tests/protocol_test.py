@@ -0,0 +1,39 @@
+from typing import cast
+
+import pytest
+import serial
+
+from combilog import _read_reply
+from combilog import ChannelNotFoundError
+from tests.conftest import FakeSerial
+
+
+@pytest.mark.parametrize(
+    ('buf', 'exp'),
+    (
+        pytest.param(b'\x06=1\r', b'\x06', id='ACK'),
+        pytest.param(b'\x15=1\r', b'\x15', id='NAK'),
+        pytest.param(b'=200904172000\r\x06', b'=200904172000\r', id='data'),
+        pytest.param(b'', b'', id='empty'),
+    ),
+)
+def test_read_reply_reads_exactly_one_frame(buf, exp):
+    ser = FakeSerial(replies={})
+    ser._buf += buf
+    assert _read_reply(cast(serial.Serial, ser)) == exp
+
+
+def test_call_ack_without_carriage_return(fake_logger, fake_serial):
+    fake_serial.replies[b'$01Pwrong\r'] = b'\x15'
+    fake_serial.replies[b'$01P12345678\r'] = b'\x06'
+    with fake_logger:
+        assert fake_logger.authenticate('wrong') is False
+        assert fake_logger.authenticate('12345678') is True
+        assert fake_logger.get_nr_events() == 3
+    assert fake_serial._buf == b''
+
+
+def test_get_channel_info_nak(fake_logger):
+    with pytest.raises(ChannelNotFoundError) as execinfo:
+        fake_logger.get_channel_info('99')
+    assert 'channel 99 was not found' in str(execinfo.value)
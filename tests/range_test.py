@@ -0,0 +1,105 @@
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from combilog import _group_windows
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+from testing.emulator import synthetic_events
+
+START = datetime(2020, 9, 4, 17, 20)
+
+
+def _t(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+@pytest.fixture
+def emulator():
+    # one event every 30 seconds for one day
+    return Emulator(memory=synthetic_events(2880), realtime=False)
+
+
+def test_read_range(emulator):
+    logger = emulated_logger(emulator)
+    events = logger.read_range(_t(60), _t(70), time_format='datetime')
+    assert [i[0] for i in events] == [
+        _t(60) + timedelta(seconds=30 * i) for i in range(21)
+    ]
+    assert events[0][1] == emulator.memory[120][1]
+    # pointer, rate, the events of the window and the first one after it
+    assert emulator.telegrams == 24
+
+
+@pytest.mark.parametrize(
+    ('time_format', 'expected'),
+    (
+        ('str', '2020-09-04 18:20:00'),
+        ('epoch', 1599243600),
+        ('datetime', datetime(2020, 9, 4, 18, 20)),
+    ),
+)
+def test_read_range_time_format(emulator, time_format, expected):
+    logger = emulated_logger(emulator)
+    events = logger.read_range(_t(60), _t(60), time_format=time_format)
+    assert [i[0] for i in events] == [expected]
+
+
+def test_read_range_end_of_memory(emulator):
+    logger = emulated_logger(emulator)
+    events = logger.read_range(_t(1435), _t(2000))
+    assert len(events) == 10
+
+
+def test_read_range_empty(emulator):
+    logger = emulated_logger(emulator)
+    assert logger.read_range(_t(60.1), _t(60.2)) == []
+    assert logger.read_range(_t(-10), _t(-1)) == []
+
+
+def test_read_range_invalid(emulator):
+    logger = emulated_logger(emulator)
+    with pytest.raises(ValueError):
+        logger.read_range(_t(10), _t(5))
+
+
+def test_read_ranges(emulator):
+    logger = emulated_logger(emulator)
+    windows = [(_t(100), _t(101)), (_t(10), _t(11)), (_t(12), _t(12.5))]
+    events = logger.read_ranges(windows, time_format='datetime')
+    assert [i[0] for i in events] == [
+        _t(10), _t(10.5), _t(11), _t(12), _t(12.5),
+        _t(100), _t(100.5), _t(101),
+    ]
+    # the close windows are read with one positioning and the event at
+    # 11.5 in between is dropped: rate, two pointers, 6 + 1 and 3 + 1 events
+    assert emulator.telegrams == 1 + 2 + 7 + 4
+
+
+def test_read_ranges_max_gap(emulator):
+    logger = emulated_logger(emulator)
+    windows = [(_t(10), _t(11)), (_t(100), _t(101))]
+    events = logger.read_ranges(windows, max_gap=timedelta(hours=2))
+    assert len(events) == 6
+    assert emulator.telegrams == 1 + 183 + 1
+
+
+def test_backfill_a_day_is_bounded(emulator):
+    emulator.memory = synthetic_events(2880 * 3)
+    logger = emulated_logger(emulator)
+    day = START + timedelta(days=1)
+    events = logger.read_range(day, day + timedelta(days=1, seconds=-1))
+    assert len(events) == 2880
+    assert emulator.telegrams == 2 + 2881
+
+
+def test_group_windows():
+    windows = [
+        (_t(5), _t(6)), (_t(0), _t(2)), (_t(1), _t(3)), (_t(20), _t(21)),
+    ]
+    assert _group_windows(windows, timedelta(minutes=2)) == [
+        [(_t(0), _t(3)), (_t(5), _t(6))],
+        [(_t(20), _t(21))],
+    ]
+    assert _group_windows([], timedelta(0)) == []
@@ -0,0 +1,97 @@
+import pytest
+
+from combilog import _channel_value_to_float
+from combilog import CallNotSuccessfullError
+from combilog import ChannelCache
+from combilog import ChannelError
+from combilog import ChannelNotFoundError
+from combilog import ChannelValue
+from combilog import RetryPolicy
+from testing.emulator import emulated_logger
+from testing.emulator import EmulatedChannel
+
+
+def test_read_channels(emulated, emulator):
+    snapshot = emulated.read_channels()
+    assert len(snapshot) == 18
+    assert snapshot['01'].value == 0.0
+    assert snapshot['18'].value == 17.0
+    assert all(i.error is None for i in snapshot.values())
+    assert emulated.ser.nr_opened == 1
+
+
+def test_read_channels_errors_per_channel(emulated, emulator):
+    emulator.channels['03'] = emulator.channels['03']._replace(error=True)
+    snapshot = emulated.read_channels(['02', '03', '04', '20'])
+    assert list(snapshot) == ['02', '03', '04', '20']
+    assert snapshot['02'].value == 1.0
+    assert snapshot['03'].value is None
+    assert isinstance(snapshot['03'].error, ChannelError)
+    assert isinstance(snapshot['20'].error, ChannelNotFoundError)
+    assert snapshot['04'].value == 3.0
+
+
+def test_read_channels_retry_exhausted(emulator):
+    retry = RetryPolicy(attempts=2, backoff=0)
+    logger = emulated_logger(emulator, retry=retry, timeout=0.01)
+    logger.get_channels()
+    emulator.inject('drop', 2)
+    snapshot = logger.read_channels(['01', '02'])
+    assert isinstance(snapshot['01'].error, CallNotSuccessfullError)
+    assert snapshot['02'] == ChannelValue(1.0, None)
+
+
+def test_read_channels_looks_up_the_channels_once(emulated, emulator):
+    emulated.read_channels()
+    telegrams = emulator.telegrams
+    emulated.read_channels()
+    # one telegram per channel
+    assert emulator.telegrams - telegrams == 18
+    emulated.read_channels(['01', '02'])
+    assert emulator.telegrams - telegrams == 18 + 2
+
+
+def test_read_channels_does_not_keep_the_channels(emulated, emulator):
+    emulated.read_channels()
+    assert emulated.channels is None
+    emulator.channels['19'] = EmulatedChannel('Channel19', value=18.0)
+    # get_channels still looks up the channels
+    assert emulated.get_channel_list()[-1] == 'Channel19'
+    assert emulated.read_channels()['19'].value == 18.0
+
+
+def test_read_channels_refresh(emulator):
+    logger = emulated_logger(emulator, channel_cache=ChannelCache())
+    logger.read_channels()
+    emulator.channels['01'] = emulator.channels['01']._replace(
+        decimals=3, value=1.25,
+    )
+    # still rounded with the decimals looked up first
+    assert logger.read_channels()['01'].value == 1.2
+    logger.get_channels(refresh=True)
+    assert logger.read_channels()['01'].value == 1.25
+
+
+def test_read_channels_passed_channels(emulator):
+    channels = {'01': {'data_format': 'real', 'decimals': 1}}
+    logger = emulated_logger(emulator, channels=channels)
+    assert logger.read_channels() == {'01': ChannelValue(0.0, None)}
+    assert emulator.telegrams == 1
+
+
+@pytest.mark.parametrize(
+    ('value', 'info', 'exp'),
+    (
+        ('12.3', None, 12.3),
+        ('12.345', {'data_format': 'real', 'decimals': 2}, 12.35),
+        ('7', {'data_format': 'integer', 'decimals': 0}, 7.0),
+        ('00000101', {'data_format': 'set 8', 'decimals': 0}, 5.0),
+    ),
+)
+def test_channel_value_to_float(value, info, exp):
+    assert _channel_value_to_float(value, info) == exp
+
+
+def test_channel_value_to_float_invalid():
+    with pytest.raises(ValueError):
+        _channel_value_to_float('', {'data_format': 'real', 'decimals': 1})
@@ -0,0 +1,159 @@
+import types
+from array import array
+from datetime import datetime
+
+import pytest
+
+import combilog
+
+
+def test_iter_events(fake_logger):
+    events = fake_logger.iter_events(pointer=1)
+    assert isinstance(events, types.GeneratorType)
+    assert next(events) == ('2020-09-04 17:20:00', [50.31, 0.0])
+    # the port is kept open while iterating
+    assert fake_logger.is_open is True
+    assert [i[0] for i in events] == [
+        '2020-09-04 17:20:30', '2020-09-04 17:21:00',
+    ]
+    assert fake_logger.is_open is False
+
+
+def test_iter_events_closed_early(fake_logger, fake_serial):
+    events = fake_logger.iter_events(pointer=1)
+    next(events)
+    events.close()
+    assert fake_logger.is_open is False
+    # only the first event was requested
+    assert fake_serial.written.count(b'$01E\r') == 1
+
+
+def test_read_logger_iter(fake_logger, capsys):
+    events = fake_logger.read_logger(
+        pointer=1, verbose=True, output_type='iter',
+    )
+    # nothing is read until the generator is consumed
+    assert capsys.readouterr().out == ''
+    assert len(list(events)) == 3
+    assert capsys.readouterr().out.count('reading event') == 3
+
+
+@pytest.mark.parametrize(
+    ('output_type', 'exp'),
+    (
+        (
+            'dict',
+            {
+                '2020-09-04 17:20:00': [50.31, 0.0],
+                '2020-09-04 17:20:30': [50.31, 0.0],
+                '2020-09-04 17:21:00': [50.31, 0.0],
+            },
+        ),
+        (
+            'list',
+            [
+                ['2020-09-04 17:20:00', 50.31, 0.0],
+                ['2020-09-04 17:20:30', 50.31, 0.0],
+                ['2020-09-04 17:21:00', 50.31, 0.0],
+            ],
+        ),
+    ),
+)
+def test_read_logger_output_types(fake_logger, output_type, exp):
+    assert fake_logger.read_logger(pointer=1, output_type=output_type) == exp
+
+
+def test_read_logger_invalid_output_type_reads_nothing(fake_logger):
+    with pytest.raises(ValueError) as execinfo:
+        fake_logger.read_logger(pointer=1, output_type='invalid')
+    assert 'dict, list, iter' in str(execinfo.value)
+    assert fake_logger.ser.written == []
+
+
+@pytest.mark.parametrize(
+    ('time_format', 'exp'),
+    (
+        ('str', '2020-09-04 17:20:00'),
+        ('datetime', datetime(2020, 9, 4, 17, 20)),
+        ('epoch', 1599240000),
+    ),
+)
+def test_read_logger_time_format(fake_logger, time_format, exp):
+    logs = fake_logger.read_logger(pointer=1, time_format=time_format)
+    assert list(logs)[0] == exp
+
+
+def test_read_event_invalid_time_format(fake_logger):
+    with pytest.raises(ValueError) as execinfo:
+        fake_logger.read_event(pointer=1, time_format='invalid')
+    assert 'invalid' in str(execinfo.value)
+    assert fake_logger.ser.written == []
+
+
+def test_read_datetime(fake_logger):
+    assert fake_logger.read_datetime() == datetime(2020, 9, 4, 17, 20)
+
+
+def test_get_channel_info_fake(fake_logger):
+    info = fake_logger.get_channel_info('01')
+    assert info['channel_notation'] == 'LufttempMittel'
+    assert info['unit'] == '°C'
+    assert info['decimals'] == 1
+
+
+def test_read_logger_columns_array(fake_logger, fake_serial, monkeypatch):
+    monkeypatch.setattr(combilog, 'numpy', None)
+    logs = fake_logger.read_logger(pointer=1, output_type='columns')
+    assert list(logs) == ['timestamp', 'LufttempMittel', 'LuftfeuchteMittel']
+    exp_timestamps = array('q', [1599240000, 1599240030, 1599240060])
+    assert logs['timestamp'] == exp_timestamps
+    assert logs['LufttempMittel'] == array('d', [50.31, 50.31, 50.31])
+    assert logs['LuftfeuchteMittel'] == array('d', [0, 0, 0])
+    assert fake_serial.nr_opened == 1
+
+
+def test_read_logger_columns_fewer_events(
+        fake_logger, fake_serial, monkeypatch,
+):
+    monkeypatch.setattr(combilog, 'numpy', None)
+    fake_serial.replies[b'$01E\r'].pop()
+    logs = fake_logger.read_logger(pointer=1, output_type='columns')
+    assert logs['timestamp'] == array('q', [1599240000, 1599240030])
+    assert len(logs['LuftfeuchteMittel']) == 2
+
+
+def test_read_logger_columns_numpy(fake_logger):
+    numpy = pytest.importorskip('numpy')
+    logs = fake_logger.read_logger(pointer=1, output_type='columns')
+    assert logs['timestamp'].dtype == numpy.int64
+    assert logs['LufttempMittel'].dtype == numpy.float64
+    assert logs['LufttempMittel'].tolist() == [50.31, 50.31, 50.31]
+
+
+def test_read_event_decimals(fake_logger):
+    assert fake_logger.read_event(pointer=1, decimals=True) == {
+        '2020-09-04 17:20:00': [50.3, 0.0],
+    }
+
+
+@pytest.mark.parametrize('prefetch', (0, 2))
+def test_iter_events_decimals(fake_logger, prefetch):
+    events = fake_logger.iter_events(1, prefetch=prefetch, decimals=True)
+    assert [values for _, values in events] == [[50.3, 0.0]] * 3
+
+
+def test_read_logger_columns_decimals(fake_logger, monkeypatch):
+    monkeypatch.setattr(combilog, 'numpy', None)
+    logs = fake_logger.read_logger(
+        pointer=1, output_type='columns', decimals=True,
+    )
+    assert logs['LufttempMittel'] == array('d', [50.3, 50.3, 50.3])
+
+
+def test_read_logger_columns_batches(emulated, monkeypatch):
+    monkeypatch.setattr(combilog, '_BATCH_EVENTS', 16)
+    expected = emulated.read_logger(pointer=1, time_format='epoch')
+    emulated.pointer_to_start(1)
+    logs = emulated.read_logger(pointer=1, output_type='columns')
+    assert list(logs['timestamp']) == list(expected)
+    assert list(logs['Channel02']) == [i[1] for i in expected.values()]
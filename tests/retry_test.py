@@ -0,0 +1,110 @@
+import pytest
+
+from combilog import CallNotSuccessfullError
+from combilog import RetryPolicy
+from testing.emulator import emulated_logger
+
+NO_WAIT = RetryPolicy(backoff=0)
+
+
+@pytest.fixture
+def retrying(emulator):
+    return emulated_logger(emulator, timeout=0.01, retry=NO_WAIT)
+
+
+def test_retry_policy_delay():
+    policy = RetryPolicy(backoff=0.1, factor=2, max_backoff=0.3)
+    assert [policy.delay(i) for i in (1, 2, 3)] == [0.1, 0.2, 0.3]
+
+
+def test_retry_policy_attempts():
+    policy = RetryPolicy(attempts=2, commands={'E': 5})
+    assert policy.attempts_for('E') == 5
+    assert policy.attempts_for('B01') == 2
+    with pytest.raises(ValueError):
+        RetryPolicy(attempts=0)
+
+
+@pytest.mark.parametrize('fault', ('drop', 'truncate'))
+def test_retry_lost_reply(retrying, emulator, fault):
+    emulator.inject(fault, 2)
+    assert retrying.get_nr_events() == 50
+    assert emulator.telegrams == 3
+
+
+def test_retry_gives_up(retrying, emulator):
+    emulator.inject('drop', 3)
+    with pytest.raises(CallNotSuccessfullError) as excinfo:
+        retrying.get_nr_events()
+    assert str(excinfo.value) == 'no reply to "N" after 3 attempts'
+
+
+def test_no_retry_by_default(emulator):
+    logger = emulated_logger(emulator, timeout=0.01)
+    emulator.inject('drop')
+    with pytest.raises(ValueError):
+        logger.get_nr_events()
+    assert emulator.telegrams == 1
+
+
+def test_retry_nak_of_pointer(retrying, emulator):
+    emulator.inject('nak')
+    retrying.pointer_to_start(1)
+    assert emulator.telegrams == 2
+
+
+def test_no_retry_of_other_naks(retrying, emulator):
+    with pytest.raises(CallNotSuccessfullError):
+        retrying.write_channel('08', '10.0')
+    assert emulator.telegrams == 1
+
+
+@pytest.mark.parametrize('pointer', (1, 2))
+def test_retry_lost_event_is_read_again(retrying, emulator, pointer):
+    events = retrying.iter_events(pointer=pointer)
+    first = next(events)
+    # the reply to the second event is lost
+    emulator.inject('drop')
+    timestamps = [first[0]] + [i[0] for i in events]
+    # the lost event is neither skipped nor read from the other pointer
+    assert timestamps == [
+        f'{i[0]:%Y-%m-%d %H:%M:%S}' for i in emulator.memory
+    ]
+
+
+def test_reauthenticate(retrying, emulator):
+    emulator.channels['08'] = emulator.channels['08']._replace(host_input=0)
+    assert retrying.authenticate('12345678') is True
+    # the logger lost the authentication e.g. after a restart
+    emulator.authenticated = False
+    retrying.write_channel('08', '10.0')
+    assert emulator.channels['08'].value == 10.0
+
+
+def test_reauthenticate_disabled(emulator):
+    logger = emulated_logger(
+        emulator, retry=RetryPolicy(backoff=0, reauthenticate=False),
+    )
+    assert logger.authenticate('12345678') is True
+    emulator.authenticated = False
+    with pytest.raises(CallNotSuccessfullError):
+        logger.reset_channel('01')
+
+
+@pytest.mark.parametrize('fault', ('nak', 'drop'))
+def test_delete_memory_is_never_retried(retrying, emulator, fault):
+    assert retrying.authenticate('12345678') is True
+    telegrams = emulator.telegrams
+    emulator.inject(fault)
+    with pytest.raises(CallNotSuccessfullError):
+        retrying.delete_memory()
+    # the reply was lost or refused, the delete is not sent again
+    assert emulator.telegrams - telegrams == 1
+
+
+def test_delete_memory_is_not_reauthenticated(retrying, emulator):
+    assert retrying.authenticate('12345678') is True
+    emulator.authenticated = False
+    with pytest.raises(CallNotSuccessfullError):
+        retrying.delete_memory()
+    assert len(emulator.memory) == 50
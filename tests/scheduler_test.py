@@ -0,0 +1,118 @@
+import threading
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from combilog import Scheduler
+from testing.emulator import emulated_logger
+from testing.emulator import Emulator
+
+
+class FakeClock():
+    '''a host clock that only advances while sleeping'''
+
+    def __init__(self, extra=None):
+        self.now = time.time()
+        self.sleeps = []
+        # seconds a sleep oversleeps by the number of the sleep
+        self.extra = extra or {}
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds + self.extra.pop(len(self.sleeps), 0)
+
+
+@pytest.fixture
+def logger():
+    emulator = Emulator(realtime=False)
+    emulator.measuring_rate = 5
+    emulator.averaging_interval = 30
+    return emulated_logger(emulator)
+
+
+def _take(iterator, n):
+    return [next(iterator) for _ in range(n)]
+
+
+def test_scheduler_ticks(logger):
+    clock = FakeClock()
+    scheduler = Scheduler(logger, clock=clock, sleep=clock.sleep)
+    ticks = _take(iter(scheduler), 8)
+    values = [i for i in ticks if i.kind == 'values']
+    events = [i for i in ticks if i.kind == 'events']
+    assert len(events) == 1
+    # every tick is on the logger's measuring rate and on time
+    assert all(i.scheduled.second % 5 == 0 for i in values)
+    assert all(
+        b.scheduled - a.scheduled == timedelta(seconds=5)
+        for a, b in zip(values, values[1:])
+    )
+    assert events[0].scheduled.second % 30 == 0
+    assert all(i.lag == pytest.approx(0) for i in ticks)
+    assert all(i.missed == 0 for i in ticks)
+    assert len(values[0].values) == 18
+    assert values[0].values['02'].value == 1.0
+    # the port is kept open
+    assert logger.ser.nr_opened == 1
+
+
+def test_scheduler_wakes_after_the_booking(logger):
+    clock = FakeClock()
+    scheduler = Scheduler(
+        logger, read_values=False, delay=2.0, clock=clock, sleep=clock.sleep,
+    )
+    tick = next(iter(scheduler))
+    wake = tick.scheduled - datetime(1970, 1, 1)
+    assert clock.now + scheduler.offset == pytest.approx(
+        wake.total_seconds() + 2.0,
+    )
+
+
+def test_scheduler_new_events(logger):
+    emulator = logger.ser.emulators[0]
+    emulator.add_event([1.0] * 18, datetime(2020, 9, 4, 17, 20))
+    booked = datetime.now().replace(microsecond=0) + timedelta(seconds=10)
+    emulator.add_event([2.0] * 18, booked)
+    clock = FakeClock()
+    scheduler = Scheduler(
+        logger,
+        read_values=False,
+        time_format='datetime',
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    tick = next(iter(scheduler))
+    assert tick.events == [(booked, [2.0] * 18)]
+
+
+def test_scheduler_overrun(logger):
+    # the first wake up is 12 seconds late
+    clock = FakeClock(extra={1: 12})
+    scheduler = Scheduler(
+        logger, read_events=False, clock=clock, sleep=clock.sleep,
+    )
+    first, second = _take(iter(scheduler), 2)
+    assert first.missed == 2
+    assert 0 <= first.lag < 5
+    assert second.missed == 0
+    assert second.scheduled - first.scheduled == timedelta(seconds=5)
+
+
+def test_scheduler_run_stop(logger):
+    stop = threading.Event()
+    ticks = []
+
+    def on_values(tick):
+        ticks.append(tick)
+        stop.set()
+
+    scheduler = Scheduler(logger, read_events=False, delay=0)
+    logger.ser.emulators[0].measuring_rate = 1
+    scheduler.run(on_values=on_values, stop=stop)
+    assert len(ticks) == 1
+    assert not logger.is_open
@@ -0,0 +1,64 @@
+import sys
+import time
+
+import pytest
+
+from combilog import Combilog
+from testing.emulator import Emulator
+from testing.emulator import PtyServer
+from testing.emulator import synthetic_events
+
+
+def test_session_keeps_port_open(fake_logger, fake_serial):
+    with fake_logger as logger:
+        assert logger.is_open is True
+        logger.get_nr_events()
+        logger.read_datetime()
+        logger.read_event(pointer=1)
+    assert fake_logger.is_open is False
+    assert fake_serial.nr_opened == 1
+
+
+def test_open_close(fake_logger, fake_serial):
+    fake_logger.open()
+    fake_logger.read_datetime()
+    fake_logger.read_datetime()
+    assert fake_logger.is_open
+    fake_logger.close()
+    assert not fake_logger.is_open
+    assert fake_serial.nr_opened == 1
+
+
+def test_no_session_opens_port_per_call(fake_logger, fake_serial):
+    fake_logger.read_datetime()
+    fake_logger.read_datetime()
+    assert fake_logger.is_open is False
+    assert fake_serial.nr_opened == 2
+
+
+def test_read_logger_opens_port_once(fake_logger, fake_serial):
+    logs = fake_logger.read_logger(pointer=1)
+    assert len(logs) == 3
+    assert fake_serial.nr_opened == 1
+    assert fake_logger.is_open is False
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith('linux'),
+    reason='pseudo-terminals are only used on linux',
+)
+def test_late_reply_is_not_taken_for_the_next_command():
+    emulator = Emulator(
+        memory=synthetic_events(5), realtime=False, latency=0.5,
+    )
+    with PtyServer(emulator) as port:
+        logger = Combilog(logger_addr=1, port=port, timeout=0.3)
+        with logger:
+            assert logger._call('N') == b''
+            emulator.latency = 0.0
+            # the reply to "N" arrives now
+            time.sleep(0.4)
+            assert logger.get_rate() == {
+                'measuring_rate': 5, 'averaging_interval': 30,
+            }
+            assert logger.get_nr_events() == 5
@@ -0,0 +1,186 @@
+import io
+import json
+import sqlite3
+import threading
+from typing import List
+
+import pytest
+
+from combilog import _copy_escape
+from combilog import _copy_float
+from combilog import BatchWriter
+from combilog import CopyTextSink
+from combilog import Sink
+from combilog import SQLiteSink
+
+EVENTS = [
+    ('2020-09-04 17:20:00', [1.0, 2.5]),
+    ('2020-09-04 17:20:30', [1.5, float('nan')]),
+]
+
+
+class RecordingSink(Sink):
+    def __init__(self):
+        self.batches = []
+
+    def write_batch(self, serial_number, events):
+        self.batches.append((serial_number, list(events)))
+
+
+@pytest.fixture
+def sqlite_sink(tmpdir):
+    sink = SQLiteSink(str(tmpdir.join('logs.db')))
+    yield sink
+    sink.close()
+
+
+def _rows(sink):
+    return sink.conn.execute(
+        'SELECT serial_number, timestamp, channel_values FROM events '
+        'ORDER BY timestamp',
+    ).fetchall()
+
+
+def test_sqlite_sink(sqlite_sink):
+    sqlite_sink.write_batch(100005, EVENTS)
+    rows = _rows(sqlite_sink)
+    assert [i[:2] for i in rows] == [
+        (100005, '2020-09-04 17:20:00'), (100005, '2020-09-04 17:20:30'),
+    ]
+    assert json.loads(rows[0][2]) == [1.0, 2.5]
+
+
+def test_sqlite_sink_idempotent(sqlite_sink):
+    sqlite_sink.write_batch(100005, EVENTS)
+    sqlite_sink.write_batch(100005, [('2020-09-04 17:20:00', [3.0, 4.0])])
+    sqlite_sink.write_batch(100006, EVENTS[:1])
+    rows = _rows(sqlite_sink)
+    assert len(rows) == 3
+    assert json.loads(rows[0][2]) == [3.0, 4.0]
+
+
+def test_sqlite_sink_one_transaction_per_batch(sqlite_sink):
+    statements: List[str] = []
+    sqlite_sink.conn.set_trace_callback(statements.append)
+    sqlite_sink.write_batch(100005, EVENTS * 50)
+    assert len([i for i in statements if i.startswith('BEGIN')]) == 1
+    assert len([i for i in statements if i.startswith('COMMIT')]) == 1
+
+
+def test_sqlite_sink_invalid_table(tmpdir):
+    with pytest.raises(ValueError):
+        SQLiteSink(str(tmpdir.join('logs.db')), table='events; DROP')
+
+
+def test_copy_text_sink():
+    f = io.StringIO()
+    CopyTextSink(f).write_batch(100005, EVENTS)
+    assert f.getvalue() == (
+        '100005\t2020-09-04 17:20:00\t{1.0,2.5}\n'
+        '100005\t2020-09-04 17:20:30\t{1.5,NaN}\n'
+    )
+
+
+def test_copy_escape_and_float():
+    assert _copy_escape('a\tb\\c\nd') == 'a\\tb\\\\c\\nd'
+    assert _copy_float(float('inf')) == 'Infinity'
+    assert _copy_float(float('-inf')) == '-Infinity'
+    assert _copy_float(0.1) == '0.1'
+
+
+def test_batch_writer_batches():
+    sink = RecordingSink()
+    with BatchWriter(sink, 100005, batch_size=2) as writer:
+        for timestamp, values in EVENTS * 2 + EVENTS[:1]:
+            writer.write(timestamp, values)
+    assert [len(i[1]) for i in sink.batches] == [2, 2, 1]
+    assert sink.batches[0] == (100005, EVENTS)
+    assert writer.written == 5
+
+
+def test_batch_writer_from_logger(emulated, sqlite_sink):
+    with BatchWriter(sqlite_sink, 100005, batch_size=16) as writer:
+        for timestamp, values in emulated.iter_events(pointer=1):
+            writer.write(timestamp, values)
+    assert len(_rows(sqlite_sink)) == 50
+
+
+def test_batch_writer_backpressure():
+    release = threading.Event()
+
+    class SlowSink(RecordingSink):
+        def write_batch(self, serial_number, events):
+            release.wait()
+            super().write_batch(serial_number, events)
+
+    sink = SlowSink()
+    writer = BatchWriter(sink, 1, batch_size=1, max_pending=1)
+    # one batch is written, one waits in the queue
+    writer.write(*EVENTS[0])
+    writer.write(*EVENTS[0])
+    blocked = threading.Thread(target=writer.write, args=EVENTS[0])
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    release.set()
+    blocked.join()
+    writer.close()
+    assert len(sink.batches) == 3
+
+
+def test_batch_writer_error():
+    class FailingSink(Sink):
+        def write_batch(self, serial_number, events):
+            raise ValueError('database is gone')
+
+    writer = BatchWriter(FailingSink(), 1, batch_size=1)
+    writer.write(*EVENTS[0])
+    with pytest.raises(ValueError) as excinfo:
+        writer.close()
+    assert str(excinfo.value) == 'database is gone'
+
+
+def test_batch_writer_error_is_kept():
+    written = threading.Event()
+
+    class FailingSink(RecordingSink):
+        def write_batch(self, serial_number, events):
+            written.set()
+            raise ValueError('database is gone')
+
+    writer = BatchWriter(FailingSink(), 1, batch_size=2)
+    writer.write(*EVENTS[0])
+    writer.flush()
+    written.wait()
+    writer.write(*EVENTS[1])
+    # a pending error still stops the thread
+    with pytest.raises(ValueError):
+        writer.close()
+    assert not writer._thread.is_alive()
+    # later batches are not written around the gap
+    with pytest.raises(ValueError):
+        writer.flush()
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def test_batch_writer_invalid_batch_size():
+    with pytest.raises(ValueError):
+        BatchWriter(RecordingSink(), 1, batch_size=0)
+
+
+def test_sink_is_abstract():
+    with pytest.raises(TypeError):
+        Sink()  # type: ignore
+    RecordingSink().close()
+
+
+def test_sqlite_sink_threadsafe_usage(tmpdir):
+    path = str(tmpdir.join('logs.db'))
+    sink = SQLiteSink(path)
+    with BatchWriter(sink, 1) as writer:
+        writer.write(*EVENTS[0])
+    sink.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT count(*) FROM events').fetchone() == (1,)
+    conn.close()
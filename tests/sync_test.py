@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+from datetime import timedelta
+from typing import List
+
+import pytest
+
+from combilog import Checkpoint
+from combilog import CheckpointStore
+from combilog import IncrementalSync
+from combilog import Timestamp
+
+
+@pytest.fixture
+def store(tmpdir):
+    return CheckpointStore(str(tmpdir.join('checkpoints.json')))
+
+
+def test_store_roundtrip(store):
+    assert store.load(123) is None
+    checkpoint = Checkpoint(123, datetime(2020, 9, 4, 17, 20))
+    store.save(checkpoint)
+    store.save(Checkpoint(456, datetime(2021, 1, 1)))
+    assert store.load(123) == checkpoint
+    with open(store.path) as f:
+        assert json.load(f) == {
+            '123': '2020-09-04 17:20:00',
+            '456': '2021-01-01 00:00:00',
+        }
+
+
+def test_sync_reads_only_new_events(emulated, emulator, store):
+    sync = IncrementalSync(emulated, store, time_format='datetime')
+    with sync.batch() as events:
+        assert len(events) == 50
+    last = emulator.memory[-1][0]
+    assert store.load(emulator.serial_number).timestamp == last
+    with sync.batch() as events:
+        assert events == []
+    emulator.add_event([1.0] * 18, last + timedelta(seconds=30))
+    emulator.add_event([2.0] * 18, last + timedelta(seconds=60))
+    with sync.batch() as events:
+        assert [i[0] for i in events] == [
+            last + timedelta(seconds=30),
+            last + timedelta(seconds=60),
+        ]
+
+
+def test_sync_not_committed_on_error(emulated, emulator, store):
+    sync = IncrementalSync(emulated, store)
+    with pytest.raises(ValueError):
+        with sync.batch():
+            raise ValueError('insert failed')
+    assert store.load(emulator.serial_number) is None
+    # the same events are delivered again
+    with sync.batch() as events:
+        assert len(events) == 50
+        assert events[0][0] == '2020-09-04 17:20:00'
+
+
+def test_sync_max_events_and_resume(emulated, emulator, store):
+    sync = IncrementalSync(emulated, store, max_events=20, time_format='epoch')
+    seen: List[Timestamp] = []
+    for _ in range(3):
+        batch = sync.fetch()
+        seen.extend(i[0] for i in batch.events)
+        sync.commit(batch)
+    assert len(seen) == len(set(seen)) == 50
+    # a new sync object resumes from the file
+    sync = IncrementalSync(emulated, CheckpointStore(store.path))
+    assert sync.fetch().events == []
+
+
+def test_sync_start(emulated, emulator, store):
+    start = emulator.memory[40][0]
+    sync = IncrementalSync(emulated, store, start=start)
+    assert len(sync.fetch().events) == 10
+
+
+def test_sync_keeps_the_session_open(emulated, store):
+    IncrementalSync(emulated, store).fetch()
+    assert emulated.ser.nr_opened == 1